@@ -1,24 +1,212 @@
-import os
-import tempfile
+import base64
+import json
+import time
 import traceback
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Optional
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import Response, StreamingResponse, JSONResponse, PlainTextResponse
 
 from models.data_models import GameState, GeminiEvalRequest, ChatMessage, EvaluationLog
-from services.stt_service import transcribe_audio
-from services.azure_service import get_pronunciation_score
-from services.gemini_service import evaluate_and_respond, generate_opening_question
-from services.tts_service import get_mp3_base64
+from services import lifecycle
+from services.scheduler import (admit_request, run_in_stage, get_scheduler_stats, AdmissionRejectedError,
+                                PRIORITY_TURN, PRIORITY_NEW_SESSION)
+from services.stt_service import transcribe_audio_result
+from services.stt_engine import STT_ENGINE, get_stt_engine_stats
+from services.stream_stt import StreamingTranscriber
+from services.stt_backends import SttResult
+from services.azure_service import get_azure_stats
+from services.pronunciation_service import get_pronunciation_score, uses_local_scoring, get_pronunciation_stats
+from services.gemini_service import (evaluate_and_respond, attach_next_question, valid_next_question, get_gemini_stats,
+                                     save_eval_cache, EVAL_BATCHER)
+from services.tts_service import get_mp3_base64, get_tts_cache_stats, get_tts_stats, LOCAL_TTS_POOL
+from services.tts_backends import output_format
+from services.audio_store import publish_audio, get_audio_entry, parse_range, audio_url
+from services.session_store import SESSION_STORE, SessionRecord, SessionConflictError
+from services.opening_pack import get_opening_question, lookup_opening_question, get_opening_pack_stats
+from services.prefetch_service import start_question_prefetch, get_next_question, get_prefetch_stats
+from utils.audio_decode import SAMPLE_RATE, SUPPORTED_SAMPLE_RATES, decode_audio_bytes, is_supported_sample_rate
+from utils.vad import check_upload, get_vad_stats
+from utils.json_delta import make_patch
 from utils.text_correction import correct_heritage_names
-from utils.report_manager import save_heritage_report
+from utils.report_manager import REPORT_WRITER
+from utils.logger import UTTERANCE_LOG, log_valid_utterance, get_utterance_log_stats
+from utils.metrics import (span, begin_request_timings, current_request_timings, format_server_timing,
+                           render_metrics, HTTP_DURATION, HTTP_REQUESTS, HTTP_IN_FLIGHT)
 
-app = FastAPI()
+# gunicorn --preload -k uvicorn.workers.UvicornWorker 로 실행할 때 True:
+# 마스터 프로세스가 main 을 import 하면서 모델을 올리고, fork 된 워커들은 copy-on-write 로 공유
+# (uvicorn --workers 는 spawn 방식이라 워커마다 따로 로드하므로 효과 없음)
+PRELOAD_BEFORE_FORK = False
+
+if PRELOAD_BEFORE_FORK:
+    lifecycle.preload_models()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Whisper 워커 프로세스 기동 (모델 로드는 각 워커에서, 워밍업 추론으로 완료 대기)
+    if STT_ENGINE is not None:
+        STT_ENGINE.start()
+
+    # 리포트 세그먼트 백그라운드 작성기
+    REPORT_WRITER.start()
+
+    # 모델/클라이언트 로드 + 워밍업 (STARTUP_BLOCKING 이 아니면 백그라운드, /readyz 로 확인)
+    await lifecycle.start()
+
+    yield
+
+    await lifecycle.stop()
+
+    # 대기 중인 리포트 이벤트를 모두 기록
+    await REPORT_WRITER.close()
+    await run_in_stage("io", UTTERANCE_LOG.close)
+    await run_in_stage("io", save_eval_cache)
+    await EVAL_BATCHER.stop()
+
+    if STT_ENGINE is not None:
+        await STT_ENGINE.stop()
+    LOCAL_TTS_POOL.stop()
+
+
+app = FastAPI(lifespan=lifespan)
+
+NPC_PERSONA = "Foreign Friend"
+
+# 업로드에 말소리가 없을 때 (STT/발음 평가/Gemini 호출 없이 바로 응답, 재시도 횟수 유지)
+NO_SPEECH_RESPONSE = "Could you say that again?"
+NO_SPEECH_FEEDBACK = "목소리가 들리지 않았어요. 마이크 가까이에서 다시 말해 주세요."
+
+# NPC 음성 전달 방식
+# - "base64": 기존 방식 (JSON 안에 audio_base64로 MP3 전체 포함)
+# - "url": audio_id/audio_url만 내려주고, 클라이언트가 GET /audio/{audio_id}로 받아감
+AUDIO_MODE_BASE64 = "base64"
+AUDIO_MODE_URL = "url"
+# - "stream": /interact/stream 전용. 합성된 문장 단위 MP3 청크를 audio_chunk 이벤트(base64)로 바로 전송
+AUDIO_MODE_STREAM = "stream"
+AUDIO_CACHE_CONTROL = "public, max-age=86400"
+# 합성 중이거나 일부 문장이 빠진 음성은 브라우저/CDN 에 저장하지 않음
+AUDIO_INCOMPLETE_CACHE_CONTROL = "no-store"
+
+
+async def build_audio_fields(text: str, audio_mode: str) -> dict:
+    if audio_mode == AUDIO_MODE_URL:
+        # 합성은 백그라운드로 진행되고, 클라이언트는 준비되는 대로 스트리밍 받음
+        audio_id = publish_audio(text)
+        return {"audio_base64": "", "audio_id": audio_id, "audio_url": audio_url(audio_id)}
+
+    return {"audio_base64": await get_mp3_base64(text), "audio_format": output_format().name}
+
+
+async def load_game_state(request_data: Optional[str], session_id: Optional[str],
+                          state_version: Optional[int], use_session: bool):
+    """
+    요청에서 GameState를 가져옵니다.
+    - 기존(stateless) 모드: request_data 에 전체 상태(JSON)
+    - 세션 모드: session_id (+ state_version) 만 보내고 상태는 서버 저장소에서 읽음
+      (처음에는 request_data 와 use_session=true 로 세션 생성)
+    반환값: (game_state, session_record 또는 None)
+    """
+    if session_id:
+        with span("session"):
+            record = await SESSION_STORE.load(session_id)
+        if record is None:
+            raise HTTPException(status_code=404, detail="Session not found or expired")
+        if state_version is not None and state_version != record.version:
+            raise HTTPException(status_code=409, detail=f"State version mismatch (server: {record.version})")
+        return GameState.model_validate(record.state), record
+
+    if not request_data:
+        raise HTTPException(status_code=422, detail="request_data or session_id is required")
+
+    game_state = GameState.model_validate_json(request_data)
+    if use_session:
+        with span("session"):
+            return game_state, await SESSION_STORE.create(game_state.model_dump())
+    return game_state, None
+
+
+async def build_state_fields(game_state: GameState, record: Optional[SessionRecord]) -> dict:
+    """stateless 모드는 전체 상태를, 세션 모드는 저장 후 JSON-patch 형식의 변경분만 반환합니다."""
+    new_state = game_state.model_dump()
+    if record is None:
+        return {"updated_game_state": new_state}
+
+    try:
+        with span("session"):
+            saved = await SESSION_STORE.save(record.session_id, new_state, record.version)
+    except SessionConflictError:
+        raise HTTPException(status_code=409, detail="State was updated by another request")
+
+    return {
+        "session_id": saved.session_id,
+        "state_version": saved.version,
+        "state_delta": make_patch(record.state, new_state),
+    }
+
+
+def combined_next_question(gemini_req: GeminiEvalRequest, ai_result, next_k) -> Optional[str]:
+    """통합 모드 평가 결과에 담긴 다음 질문 (다음 키워드가 같고 검증을 통과한 경우만)"""
+    if gemini_req.next_keyword != next_k.keyword:
+        return None
+    return valid_next_question(gemini_req, ai_result)
+
+
+def report_session_key(game_state: GameState, record: Optional[SessionRecord]) -> str:
+    """
+    리포트 키 (세션 모드는 session_id, stateless 모드는 저장 슬롯 + 플레이어 이름)
+    stateless 모드는 세그먼트를 쓰지 않고, 완료 시 요청에 담긴 chat_history 로 리포트를 만들므로
+    이 키는 파일 이름 구분용으로만 사용됩니다.
+    """
+    if record is not None:
+        return record.session_id
+    if game_state.player_info is not None:
+        return f"{game_state.save_slot_name}_{game_state.player_info.name}"
+    return game_state.save_slot_name
+
+
+@app.middleware("http")
+async def record_timings(request: Request, call_next):
+    # 요청별 단계 시간을 모아 Server-Timing 헤더로 내려줌 (Unity 클라이언트가 턴별 분석에 사용)
+    timings = begin_request_timings()
+    started = time.perf_counter()
+    HTTP_IN_FLIGHT.inc()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        HTTP_IN_FLIGHT.dec()
+        elapsed = time.perf_counter() - started
+        # /audio/{audio_id} 처럼 경로 변수가 있는 경우 라우트 템플릿으로 집계
+        route = request.scope.get("route")
+        route_path = route.path if route is not None else "unmatched"
+        HTTP_DURATION.observe(elapsed, method=request.method, path=route_path)
+        HTTP_REQUESTS.inc(method=request.method, path=route_path, status=status)
+
+    response.headers["Server-Timing"] = format_server_timing(timings, elapsed * 1000)
+    return response
+
+
+@app.exception_handler(AdmissionRejectedError)
+async def on_admission_rejected(request: Request, exc: AdmissionRejectedError):
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.detail},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
 
 
 # [수정] start_conversation에서 강제 스킵 로직 제거 (클라이언트가 제어함)
 @app.post("/start_conversation")
-async def start_conversation(request_data: str = Form(...)):
+async def start_conversation(request_data: Optional[str] = Form(None), audio_mode: str = Form(AUDIO_MODE_BASE64),
+                             session_id: Optional[str] = Form(None), state_version: Optional[int] = Form(None),
+                             use_session: bool = Form(False)):
+    # 새 세션은 낮은 우선순위 (과부하 시 먼저 429)
+    admit_request(PRIORITY_NEW_SESSION)
     try:
-        game_state = GameState.model_validate_json(request_data)
+        game_state, session = await load_game_state(request_data, session_id, state_version, use_session)
 
         # 현재 인덱스의 문화재 정보 가져오기
         current_heritage = game_state.heritages[game_state.current_index]
@@ -32,49 +220,85 @@ async def start_conversation(request_data: str = Form(...)):
             npc_text = f"We have already finished touring {current_heritage.name}."
         else:
             # 오프닝 질문 생성
-            npc_text = await generate_opening_question(
-                "Foreign Friend",
+            npc_text = await get_opening_question(
+                NPC_PERSONA,
                 current_heritage.name,
                 target_keyword_obj.keyword,
                 target_keyword_obj.sample_question
             )
 
         game_state.chat_history.append(ChatMessage(role="npc", content=npc_text))
-        audio_base64 = await get_mp3_base64(npc_text)
+        if session is not None:
+            REPORT_WRITER.record_messages(
+                report_session_key(game_state, session), current_heritage.name, [{"role": "npc", "content": npc_text}]
+            )
+        audio_fields = await build_audio_fields(npc_text, audio_mode)
 
         return {
             "npc_response": npc_text,
-            "audio_base64": audio_base64,
-            "updated_game_state": game_state.model_dump()
+            **audio_fields,
+            **await build_state_fields(game_state, session)
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/interact")
-async def interact(audio_file: UploadFile = File(...), request_data: str = Form(...)):
-    user_wav_path = None
+def heritage_keywords(heritage) -> list:
+    return [k.keyword for k in heritage.keywords]
+
+
+async def turn_events(game_state: GameState, session: Optional[SessionRecord], user_audio, audio_mode: str,
+                      transcribe: Optional[Callable[[], Awaitable[SttResult]]] = None) -> AsyncIterator[tuple]:
+    """
+    한 턴의 처리 (VAD → STT → 발음 평가 → Gemini 평가 → 음성 → 상태 갱신)
+    단계가 끝날 때마다 (이벤트 이름, 응답 필드) 를 내보냅니다. user_audio 는 16kHz float32 PCM 입니다.
+    - "user_stt", "pronunciation_score", "reaction", "audio", "state" 순서 (state 는 항상 마지막)
+    transcribe 를 주면 STT 대신 그 결과를 사용합니다. (스트리밍 업로드 중 미리 전사한 경우)
+    """
+    prefetch = None
     try:
-        game_state = GameState.model_validate_json(request_data)
         current_heritage = game_state.heritages[game_state.current_index]
         target_keyword_obj = next((k for k in current_heritage.keywords if not k.isDone), None)
 
         if not target_keyword_obj:
-            return {"npc_response": "This area is clear.", "updated_game_state": game_state.model_dump()}
+            yield "reaction", {"npc_response": "This area is clear."}
+            yield "state", await build_state_fields(game_state, session)
+            return
 
-        # --- (STT, 평가, Gemini 호출 로직은 기존과 동일) ---
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp:
-            tmp.write(await audio_file.read())
-            user_wav_path = tmp.name
+        # 앞뒤 무음 제거, 말소리가 없으면 조기 종료
+        with span("vad"):
+            vad = check_upload(user_audio)
+        if not vad.has_speech:
+            yield "user_stt", {"user_stt": ""}
+            yield "pronunciation_score", {"pronunciation_score": 0.0}
+            yield "reaction", {"npc_response": NO_SPEECH_RESPONSE, "feedback": NO_SPEECH_FEEDBACK, "no_speech": True}
+            yield "audio", await build_audio_fields(NO_SPEECH_RESPONSE, audio_mode)
+            yield "state", await build_state_fields(game_state, session)
+            return
+        user_audio = vad.audio
 
-        raw_stt = await transcribe_audio(user_wav_path)
-        user_text = correct_heritage_names(raw_stt, current_heritage.name)
-        pron_score = await get_pronunciation_score(user_wav_path, user_text)
+        # 스트리밍 턴은 녹음 중에 이미 진행한 전사 결과를 사용
+        if transcribe is not None:
+            stt = await transcribe()
+        else:
+            stt = await transcribe_audio_result(user_audio, current_heritage.name,
+                                                heritage_keywords(current_heritage), uses_local_scoring())
+        with span("correction"):
+            user_text = correct_heritage_names(stt.text, current_heritage.name)
+        yield "user_stt", {"user_stt": user_text}
+
+        # 교정된 텍스트를 기준 문장으로 사용 (로컬 점수는 교정된 고유명사를 감점)
+        pron_score = await get_pronunciation_score(user_audio, user_text, stt)
+        yield "pronunciation_score", {"pronunciation_score": pron_score}
+        if user_text.strip():
+            log_valid_utterance(game_state, user_text, pron_score)
 
         gemini_req = GeminiEvalRequest(
-            npc_persona="Foreign Friend",
+            npc_persona=NPC_PERSONA,
             user_input=user_text,
             pronunciation_score=pron_score,
             target_keyword=target_keyword_obj.keyword,
@@ -82,6 +306,20 @@ async def interact(audio_file: UploadFile = File(...), request_data: str = Form(
             retry_count=game_state.retry_count
         )
 
+        # 이번 키워드가 끝나면(PASS 또는 마지막 FAIL) 물어볼 다음 키워드의 질문 준비
+        # - 사전 생성 번들에 있으면 그대로 사용
+        # - 통합 모드: 평가 호출에서 함께 생성 (Gemini 왕복 1회)
+        # - 그 외: 평가와 동시에 별도 호출로 선행 생성
+        upcoming_k = next((k for k in current_heritage.keywords if not k.isDone and k is not target_keyword_obj), None)
+        if upcoming_k:
+            packed = lookup_opening_question(NPC_PERSONA, current_heritage.name, upcoming_k.keyword,
+                                             upcoming_k.sample_question)
+            if packed is not None or not attach_next_question(
+                    gemini_req, current_heritage.name, upcoming_k.keyword, upcoming_k.sample_question):
+                prefetch = start_question_prefetch(
+                    NPC_PERSONA, current_heritage.name, upcoming_k.keyword, upcoming_k.sample_question
+                )
+
         ai_result = await evaluate_and_respond(gemini_req)
         # ------------------------------------------------------
 
@@ -97,14 +335,14 @@ async def interact(audio_file: UploadFile = File(...), request_data: str = Form(
             if remain_keywords:
                 # [A] 같은 문화재 내 다음 질문 (계속 진행)
                 next_k = remain_keywords[0]
-                next_q = await generate_opening_question(
-                    "Foreign Friend", current_heritage.name, next_k.keyword, next_k.sample_question
+                next_q = combined_next_question(gemini_req, ai_result, next_k) or await get_next_question(
+                    prefetch, NPC_PERSONA, current_heritage.name, next_k.keyword, next_k.sample_question
                 )
+                prefetch = None
                 final_npc_response = f"{ai_result.reaction} {next_q}"
             else:
                 # [B] 현재 문화재 완료 -> [수정] 여기서 끝냄 (다음 문화재로 안 넘어감)
                 current_heritage.completed = True
-                save_heritage_report(game_state, current_heritage.name)
 
                 # 종료 멘트만 생성
                 final_npc_response = f"{ai_result.reaction} We learned everything about {current_heritage.name}. Let's move to another place!"
@@ -123,35 +361,283 @@ async def interact(audio_file: UploadFile = File(...), request_data: str = Form(
                 remain_keywords = [k for k in current_heritage.keywords if not k.isDone]
                 if remain_keywords:
                     next_k = remain_keywords[0]
-                    next_q = await generate_opening_question("Friend", current_heritage.name, next_k.keyword,
-                                                             next_k.sample_question)
+                    next_q = combined_next_question(gemini_req, ai_result, next_k) or await get_next_question(
+                        prefetch, NPC_PERSONA, current_heritage.name, next_k.keyword, next_k.sample_question
+                    )
+                    prefetch = None
                     final_npc_response = f"The answer is {target_keyword_obj.keyword}. {next_q}"
                 else:
                     # 실패로 끝났지만 마지막 키워드였던 경우 -> 완료 처리
                     current_heritage.completed = True
-                    save_heritage_report(game_state, current_heritage.name)
                     final_npc_response = f"The answer is {target_keyword_obj.keyword}. That's all for here."
 
         # 상태 반환
         game_state.chat_history.append(ChatMessage(role="user", content=user_text))
         game_state.chat_history.append(ChatMessage(role="npc", content=final_npc_response))
-        audio_base64 = await get_mp3_base64(final_npc_response)
 
-        return {
-            "user_stt": user_text,
-            "pronunciation_score": pron_score,
-            "npc_response": final_npc_response,
-            "feedback": ai_result.feedback_korean,
-            "audio_base64": audio_base64,
-            "updated_game_state": game_state.model_dump()
-        }
+        # 리포트 이벤트 기록 (디스크 쓰기는 백그라운드 작성기가 처리)
+        report_key = report_session_key(game_state, session)
+        evaluation = EvaluationLog(
+            turn_index=len(game_state.chat_history) // 2,
+            user_input=user_text,
+            target_keyword=target_keyword_obj.keyword,
+            pronunciation_score=pron_score,
+            grammar_evaluation=ai_result.evaluation,
+            feedback=ai_result.feedback_korean
+        )
+        if session is not None:
+            REPORT_WRITER.record_messages(
+                report_key, current_heritage.name,
+                [{"role": "user", "content": user_text}, {"role": "npc", "content": final_npc_response}],
+                evaluation.model_dump()
+            )
+            if current_heritage.completed:
+                REPORT_WRITER.record_complete(report_key, current_heritage.name)
+        elif current_heritage.completed:
+            # stateless 모드: 서버에 이전 턴 기록이 없으므로 기존처럼 요청에 담긴 전체 대화로 리포트 작성
+            REPORT_WRITER.record_report(
+                report_key, current_heritage.name, list(game_state.chat_history),
+                list(game_state.evaluation_logs) + [evaluation]
+            )
+
+        yield "reaction", {"npc_response": final_npc_response, "feedback": ai_result.feedback_korean}
+        yield "audio", await build_audio_fields(final_npc_response, audio_mode)
+        yield "state", await build_state_fields(game_state, session)
+
+    finally:
+        # 사용되지 않은 선행 생성 결과는 캐시에 보관 (재시도 턴에서 재사용)
+        if prefetch is not None:
+            prefetch.discard()
+
+
+async def run_turn(game_state: GameState, session: Optional[SessionRecord], user_audio, audio_mode: str,
+                   transcribe: Optional[Callable[[], Awaitable[SttResult]]] = None) -> dict:
+    """turn_events 를 모두 모아 /interact 형식의 응답 하나로 만듭니다."""
+    result = {}
+    async for _, fields in turn_events(game_state, session, user_audio, audio_mode, transcribe):
+        result.update(fields)
+    return result
+
+
+@app.post("/interact")
+async def interact(audio_file: UploadFile = File(...), request_data: Optional[str] = Form(None),
+                   audio_mode: str = Form(AUDIO_MODE_BASE64), session_id: Optional[str] = Form(None),
+                   state_version: Optional[int] = Form(None), use_session: bool = Form(False)):
+    # 진행 중인 턴은 높은 우선순위 (대기열이 가득 찬 경우에만 503)
+    admit_request(PRIORITY_TURN)
+    try:
+        game_state, session = await load_game_state(request_data, session_id, state_version, use_session)
+
+        # 업로드된 음성을 한 번만 디코딩하여 Whisper/Azure 가 같은 PCM 버퍼를 사용
+        with span("decode"):
+            user_audio = await run_in_stage("stt", decode_audio_bytes, await audio_file.read())
 
+        return await run_turn(game_state, session, user_audio, audio_mode)
+
+    except HTTPException:
+        raise
     except Exception as e:
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if user_wav_path and os.path.exists(user_wav_path):
-            try:
-                os.remove(user_wav_path)
-            except:
-                pass
\ No newline at end of file
+
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.post("/interact/stream")
+async def interact_stream_events(audio_file: UploadFile = File(...), request_data: Optional[str] = Form(None),
+                                 audio_mode: str = Form(AUDIO_MODE_STREAM), session_id: Optional[str] = Form(None),
+                                 state_version: Optional[int] = Form(None), use_session: bool = Form(False)):
+    """
+    /interact 의 Server-Sent Events 버전. 단계가 끝날 때마다 이벤트를 보냅니다.
+    user_stt → pronunciation_score → reaction → audio (→ audio_chunk... → audio_end) → state → done
+    - audio_mode="stream" 이면 audio 이벤트(audio_id/audio_url) 뒤에 합성된 MP3 청크를 바로 이어서 전송
+    - 요청 검증/상태 로드 오류는 일반 HTTP 오류로, 이후 처리 중 오류는 error 이벤트로 알립니다.
+    """
+    admit_request(PRIORITY_TURN)
+    started = time.perf_counter()
+    game_state, session = await load_game_state(request_data, session_id, state_version, use_session)
+    with span("decode"):
+        user_audio = await run_in_stage("stt", decode_audio_bytes, await audio_file.read())
+    timings = current_request_timings()
+    turn_audio_mode = AUDIO_MODE_URL if audio_mode == AUDIO_MODE_STREAM else audio_mode
+
+    async def event_stream():
+        events = turn_events(game_state, session, user_audio, turn_audio_mode)
+        try:
+            async for event, fields in events:
+                yield sse_event(event, fields)
+                entry = get_audio_entry(fields.get("audio_id")) if event == "audio" else None
+                if entry is not None and audio_mode == AUDIO_MODE_STREAM:
+                    index = 0
+                    async for chunk in entry.stream():
+                        yield sse_event("audio_chunk", {"index": index, "data": base64.b64encode(chunk).decode("ascii")})
+                        index += 1
+                    yield sse_event("audio_end", {"chunks": index})
+            server_timing = format_server_timing(timings, (time.perf_counter() - started) * 1000)
+            yield sse_event("done", {"server_timing": server_timing})
+        except HTTPException as e:
+            yield sse_event("error", {"status": e.status_code, "detail": e.detail})
+        except Exception as e:
+            traceback.print_exc()
+            yield sse_event("error", {"status": 500, "detail": str(e)})
+        finally:
+            await events.aclose()
+
+    # 프록시가 이벤트를 모아서 보내지 않도록 버퍼링 해제
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=headers)
+
+
+@app.websocket("/ws/interact")
+async def interact_stream(websocket: WebSocket):
+    """
+    스트리밍 업로드 턴 (/interact 와 같은 처리, 녹음 중에 전사를 미리 진행)
+    1. 클라이언트 → {"type": "start", "request_data" | "session_id", "state_version", "use_session",
+                     "audio_mode", "sample_rate"}
+    2. 클라이언트 → 바이너리 PCM16 mono 청크 (말하는 동안 계속)
+       서버 → {"type": "partial", "text": ...} (쉼 단위로 전사가 끝날 때마다)
+    3. 클라이언트 → {"type": "end"}
+       서버 → {"type": "result", ...(/interact 응답과 같은 필드), "server_timing": ...} 후 종료
+    오류는 {"type": "error", "status", "detail"} 를 보낸 뒤 종료합니다.
+    """
+    await websocket.accept()
+    timings = begin_request_timings()
+    started = time.perf_counter()
+    streamer = None
+    try:
+        start = await websocket.receive_json()
+        if start.get("type") != "start":
+            raise HTTPException(status_code=422, detail="First message must be {\"type\": \"start\"}")
+        # 샘플링 레이트는 WAV 업로드와 같은 허용 목록만 (임의 값은 리샘플링 필터가 커짐)
+        sample_rate = start.get("sample_rate") or SAMPLE_RATE
+        if isinstance(sample_rate, str) and sample_rate.isdigit():
+            sample_rate = int(sample_rate)
+        if not is_supported_sample_rate(sample_rate):
+            raise HTTPException(status_code=422, detail=f"sample_rate must be one of {list(SUPPORTED_SAMPLE_RATES)}")
+
+        admit_request(PRIORITY_TURN)
+        game_state, session = await load_game_state(start.get("request_data"), start.get("session_id"),
+                                                    start.get("state_version"), bool(start.get("use_session")))
+        heritage = game_state.heritages[game_state.current_index]
+
+        partials = []
+        streamer = StreamingTranscriber(heritage.name, heritage_keywords(heritage),
+                                        sample_rate=sample_rate,
+                                        on_partial=partials.append, word_timestamps=uses_local_scoring())
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                streamer.cancel()
+                return
+            if message.get("bytes") is not None:
+                try:
+                    streamer.feed(message["bytes"])
+                except ValueError as e:
+                    raise HTTPException(status_code=413, detail=str(e))
+            elif message.get("text") is not None and json.loads(message["text"]).get("type") == "end":
+                break
+
+            # 그 사이 끝난 구간이 있으면 가장 최신 부분 전사만 전송
+            if partials:
+                text = partials[-1]
+                partials.clear()
+                await websocket.send_json({"type": "partial", "text": text})
+
+        result = await run_turn(game_state, session, streamer.audio, start.get("audio_mode", AUDIO_MODE_BASE64),
+                                transcribe=streamer.finish)
+        server_timing = format_server_timing(timings, (time.perf_counter() - started) * 1000)
+        await websocket.send_json({"type": "result", **result, "server_timing": server_timing})
+        await websocket.close()
+
+    except WebSocketDisconnect:
+        if streamer is not None:
+            streamer.cancel()
+    except (HTTPException, AdmissionRejectedError) as e:
+        error = {"type": "error", "status": e.status_code, "detail": e.detail}
+        if isinstance(e, AdmissionRejectedError):
+            error["retry_after"] = e.retry_after
+        await websocket.send_json(error)
+        await websocket.close()
+    except Exception as e:
+        traceback.print_exc()
+        if streamer is not None:
+            streamer.cancel()
+        await websocket.send_json({"type": "error", "status": 500, "detail": str(e)})
+        await websocket.close()
+
+
+@app.get("/audio/{audio_id}")
+async def get_audio(audio_id: str, request: Request):
+    entry = get_audio_entry(audio_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Audio not found")
+
+    headers = {"Cache-Control": AUDIO_INCOMPLETE_CACHE_CONTROL, "Accept-Ranges": "bytes"}
+    if entry.complete:
+        # ETag/장기 캐시는 모든 문장이 합성된 리소스에만 (실패하거나 대체된 음성이 캐시에 고정되지 않도록)
+        headers.update({"ETag": entry.etag, "Cache-Control": AUDIO_CACHE_CONTROL})
+        if request.headers.get("if-none-match") == entry.etag:
+            return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get("range")
+
+    # 합성이 아직 진행 중이고 전체를 요청한 경우: 준비된 문장부터 바로 스트리밍 (완료 여부를 모르므로 no-store)
+    if not entry.finished and not range_header:
+        return StreamingResponse(entry.stream(), media_type=entry.media_type, headers=headers)
+
+    data = await entry.wait_finished()
+    if not data:
+        raise HTTPException(status_code=404, detail="Audio synthesis failed")
+    if entry.complete:
+        headers.update({"ETag": entry.etag, "Cache-Control": AUDIO_CACHE_CONTROL})
+
+    try:
+        byte_range = parse_range(range_header, len(data))
+    except ValueError:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{len(data)}"})
+
+    if byte_range is None:
+        return Response(content=data, media_type=entry.media_type, headers=headers)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+    return Response(content=data[start:end + 1], status_code=206, media_type=entry.media_type, headers=headers)
+
+
+@app.get("/healthz")
+async def healthz():
+    # 프로세스/이벤트 루프가 살아 있는지만 확인 (재시작 판단용)
+    return {"status": "ok", "phase": lifecycle.get_readiness()["phase"]}
+
+
+@app.get("/readyz")
+async def readyz():
+    # 모델 로드/워밍업이 끝나 트래픽을 받을 수 있는지 (로드 밸런서 투입 판단용)
+    readiness = lifecycle.get_readiness()
+    return JSONResponse(status_code=200 if readiness["ready"] else 503, content=readiness)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    # Prometheus 텍스트 형식 (단계별 히스토그램, 오류 수, 실행 중 개수)
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/stats")
+async def stats():
+    return {
+        "question_prefetch": get_prefetch_stats(),
+        "tts": get_tts_stats(),
+        "tts_cache": get_tts_cache_stats(),
+        "opening_pack": get_opening_pack_stats(),
+        "stt_engine": get_stt_engine_stats(),
+        "azure": get_azure_stats(),
+        "pronunciation": get_pronunciation_stats(),
+        "gemini": get_gemini_stats(),
+        "scheduler": get_scheduler_stats(),
+        "utterance_log": get_utterance_log_stats(),
+        "vad": get_vad_stats(),
+        "lifecycle": lifecycle.get_readiness(),
+    }
@@ -63,6 +63,11 @@ class GeminiEvalRequest(BaseModel):
     sample_question: str
     retry_count: int
 
+    # 통합 모드: 평가와 함께 다음 키워드 질문까지 한 번에 생성 (없으면 평가만)
+    heritage_name: Optional[str] = None
+    next_keyword: Optional[str] = None
+    next_sample_question: Optional[str] = None
+
 
 class GeminiEvalResponse(BaseModel):
     evaluation: str = Field(description="PASS 또는 FAIL")
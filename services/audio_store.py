@@ -0,0 +1,154 @@
+import asyncio
+from collections import OrderedDict
+from typing import Optional
+
+from services.tts_service import begin_fallback_tracking, iter_mp3_chunks, primary_voice, tts_media_type, tts_variant
+from utils.audio_cache import audio_cache_key
+from utils.metrics import span, count_error
+
+# 메모리에 보관할 NPC 음성 리소스 개수 (클라이언트가 URL로 받아갈 때까지 유지)
+AUDIO_STORE_MAX_ITEMS = 512
+AUDIO_URL_PREFIX = "/audio"
+
+
+class AudioEntry:
+    """
+    하나의 NPC 음성 리소스.
+    합성이 끝나기 전에도 준비된 문장 단위 청크부터 스트리밍할 수 있습니다.
+    """
+
+    def __init__(self, audio_id: str, media_type: str = "audio/mpeg"):
+        self.audio_id = audio_id
+        self.media_type = media_type
+        self.chunks = []
+        self.finished = False
+        self.failed = False      # 합성 실패 또는 일부 문장 누락 (캐시/재사용하지 않음)
+        self.fallback = False    # 헤지로 오프라인 음성이 섞임 (audio_id 의 음성 엔진과 다르므로 캐시/재사용하지 않음)
+        self._changed = asyncio.Condition()
+        self._data: Optional[bytes] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.audio_id}"'
+
+    @property
+    def complete(self) -> bool:
+        """모든 문장이 요청한 음성 엔진으로 합성된 경우만 True (이때만 공유 캐시에 맡겨도 됨)"""
+        return self.finished and not self.failed and not self.fallback
+
+    async def _append(self, chunk: bytes):
+        async with self._changed:
+            self.chunks.append(chunk)
+            self._changed.notify_all()
+
+    async def _finish(self):
+        async with self._changed:
+            self.finished = True
+            self._changed.notify_all()
+
+    async def wait_finished(self) -> bytes:
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.finished)
+        return self.data
+
+    @property
+    def data(self) -> bytes:
+        if self._data is None and self.finished:
+            self._data = b"".join(self.chunks)
+        return self._data if self._data is not None else b"".join(self.chunks)
+
+    async def stream(self):
+        """준비된 청크를 순서대로 내보내고, 합성이 끝날 때까지 다음 청크를 기다립니다."""
+        index = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: len(self.chunks) > index or self.finished)
+                pending = self.chunks[index:]
+                finished = self.finished
+            for chunk in pending:
+                yield chunk
+            index += len(pending)
+            if finished and index >= len(self.chunks):
+                return
+
+
+_entries: "OrderedDict[str, AudioEntry]" = OrderedDict()
+
+
+@span("tts")
+async def _synthesize(entry: AudioEntry, text: str, lang: str):
+    fallbacks = begin_fallback_tracking()
+    try:
+        async for chunk in iter_mp3_chunks(text, lang, skip_empty=False):
+            if chunk:
+                await entry._append(chunk)
+            else:
+                # 실패한 문장은 건너뛰고 이어서 재생하되, 리소스는 불완전으로 표시
+                entry.failed = True
+    except Exception as e:
+        print(f"[AudioStore] Synthesis failed: {e}")
+        count_error("tts")
+        entry.failed = True
+    finally:
+        entry.fallback = bool(fallbacks)
+        await entry._finish()
+
+
+def publish_audio(text: str, lang: str = "en") -> str:
+    """
+    NPC 음성 합성을 백그라운드로 시작하고 audio_id를 바로 반환합니다.
+    같은 (text, lang, 음성 엔진/출력 형식)은 같은 audio_id를 가지므로 이미 있는 리소스를 재사용합니다.
+    (합성에 실패했거나 문장이 빠졌거나 오프라인 음성으로 대체된 리소스는 버리고 다시 합성)
+    """
+    audio_id = audio_cache_key(text, lang, tts_variant(primary_voice()))
+
+    entry = _entries.get(audio_id)
+    if entry is not None and not (entry.finished and not entry.complete):
+        _entries.move_to_end(audio_id)
+        return audio_id
+    _entries.pop(audio_id, None)
+
+    entry = AudioEntry(audio_id, tts_media_type())
+    _entries[audio_id] = entry
+    entry.task = asyncio.create_task(_synthesize(entry, text, lang))
+
+    while len(_entries) > AUDIO_STORE_MAX_ITEMS:
+        _entries.popitem(last=False)
+
+    return audio_id
+
+
+def get_audio_entry(audio_id: str) -> Optional[AudioEntry]:
+    return _entries.get(audio_id)
+
+
+def parse_range(range_header: str, size: int) -> Optional[tuple]:
+    """
+    "bytes=start-end" 형식의 Range 헤더를 (start, end) 로 변환합니다. (단일 구간만 지원)
+    범위가 파일 크기를 벗어나면 ValueError를 발생시킵니다.
+    """
+    if not range_header or not range_header.startswith("bytes="):
+        return None
+
+    spec = range_header[len("bytes="):].split(",")[0].strip()
+    start_s, _, end_s = spec.partition("-")
+
+    if not start_s:
+        # "bytes=-500" : 마지막 500바이트
+        length = int(end_s)
+        if length <= 0:
+            raise ValueError(range_header)
+        start, end = max(size - length, 0), size - 1
+    else:
+        start = int(start_s)
+        end = int(end_s) if end_s else size - 1
+        end = min(end, size - 1)
+
+    if start >= size or start > end:
+        raise ValueError(range_header)
+    return start, end
+
+
+def audio_url(audio_id: str) -> str:
+    return f"{AUDIO_URL_PREFIX}/{audio_id}"
@@ -1,39 +1,192 @@
 import azure.cognitiveservices.speech as speechsdk
 import asyncio
+import threading
+import time
+from collections import OrderedDict
 
+from services.scheduler import run_in_stage
+from utils.audio_decode import SAMPLE_RATE, to_pcm16_bytes
+from utils.metrics import span, count_error
 
+AZURE_SPEECH_KEY = "YOUR_AZURE_SPEECH_KEY"
+AZURE_REGION = "koreacentral"
 
-def blocking_assess_pronunciation(audio_path: str, reference_text: str) -> float:
-    if "YOUR" in AZURE_SPEECH_KEY or not reference_text:
-        return 0.0
+# 동시에 진행할 수 있는 발음 평가 수 / 호출당 제한 시간
+# (실제 스레드는 scheduler 의 "azure" 단계 풀을 사용)
+AZURE_MAX_CONCURRENCY = 8
+AZURE_TIMEOUT_SECONDS = 10.0
 
-    try:
-        speech_config = speechsdk.SpeechConfig(subscription=AZURE_SPEECH_KEY, region=AZURE_REGION)
-        audio_config = speechsdk.audio.AudioConfig(filename=audio_path)
-
-        # Pronunciation Assessment 설정
-        pronunciation_config = speechsdk.PronunciationAssessmentConfig(
-            reference_text=reference_text,
-            grading_system=speechsdk.PronunciationAssessmentGradingSystem.HundredMark,
-            granularity=speechsdk.PronunciationAssessmentGranularity.Phoneme
+# 같은 참조 문장에 대한 PronunciationAssessmentConfig 재사용 개수
+AZURE_PRON_CONFIG_CACHE_SIZE = 256
+
+
+class AzurePronunciationClient:
+    """
+    Azure 발음 평가 클라이언트
+    - SpeechConfig 는 한 번만 만들고 계속 재사용
+    - 참조 문장별 PronunciationAssessmentConfig 를 LRU로 재사용
+    - "azure" 단계 스레드 풀 + 동시 실행 수 제한 + 호출별 타임아웃
+    sdk 인자에 utils.fake_speechsdk 를 넘기면 네트워크 없이 같은 인터페이스로 테스트할 수 있습니다.
+    """
+
+    def __init__(self, key: str = AZURE_SPEECH_KEY, region: str = AZURE_REGION, sdk=speechsdk,
+                 max_concurrency: int = AZURE_MAX_CONCURRENCY, timeout: float = AZURE_TIMEOUT_SECONDS):
+        self.key = key
+        self.region = region
+        self.sdk = sdk
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+
+        self._speech_config = None
+        self._pron_configs = OrderedDict()
+        self._config_lock = threading.Lock()
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+        self.stats = {
+            "requests": 0,
+            "success": 0,
+            "failures": 0,
+            "timeouts": 0,
+            "skipped": 0,
+            "in_flight": 0,
+            "total_latency_ms": 0.0,
+            "max_latency_ms": 0.0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.key) and "YOUR" not in self.key
+
+    def _get_speech_config(self):
+        if self._speech_config is None:
+            with self._config_lock:
+                if self._speech_config is None:
+                    self._speech_config = self.sdk.SpeechConfig(subscription=self.key, region=self.region)
+        return self._speech_config
+
+    def _get_pronunciation_config(self, reference_text: str):
+        with self._config_lock:
+            config = self._pron_configs.get(reference_text)
+            if config is not None:
+                self._pron_configs.move_to_end(reference_text)
+                return config
+
+            config = self.sdk.PronunciationAssessmentConfig(
+                reference_text=reference_text,
+                grading_system=self.sdk.PronunciationAssessmentGradingSystem.HundredMark,
+                granularity=self.sdk.PronunciationAssessmentGranularity.Phoneme
+            )
+            self._pron_configs[reference_text] = config
+            while len(self._pron_configs) > AZURE_PRON_CONFIG_CACHE_SIZE:
+                self._pron_configs.popitem(last=False)
+            return config
+
+    def build_audio_config(self, audio):
+        """
+        파일 경로면 기존처럼 파일에서 읽고, 16kHz float32 PCM 배열이면
+        push stream으로 메모리에서 바로 전달합니다. (임시 파일/재디코딩 없음)
+        """
+        if isinstance(audio, str):
+            return self.sdk.audio.AudioConfig(filename=audio)
+
+        stream_format = self.sdk.audio.AudioStreamFormat(
+            samples_per_second=SAMPLE_RATE, bits_per_sample=16, channels=1
         )
+        push_stream = self.sdk.audio.PushAudioInputStream(stream_format=stream_format)
+        push_stream.write(to_pcm16_bytes(audio))
+        push_stream.close()
+        return self.sdk.audio.AudioConfig(stream=push_stream)
 
-        recognizer = speechsdk.SpeechRecognizer(speech_config=speech_config, audio_config=audio_config)
-        pronunciation_config.apply_to(recognizer)
+    def blocking_assess(self, audio, reference_text: str) -> float:
+        """실제 평가 호출. 실패 시 예외를 그대로 올립니다."""
+        audio_config = self.build_audio_config(audio)
+        recognizer = self.sdk.SpeechRecognizer(speech_config=self._get_speech_config(), audio_config=audio_config)
+        self._get_pronunciation_config(reference_text).apply_to(recognizer)
 
         result = recognizer.recognize_once()
 
-        if result.reason == speechsdk.ResultReason.RecognizedSpeech:
-            pronunciation_result = speechsdk.PronunciationAssessmentResult(result)
+        if result.reason == self.sdk.ResultReason.RecognizedSpeech:
+            pronunciation_result = self.sdk.PronunciationAssessmentResult(result)
             return pronunciation_result.pronunciation_score
-        else:
-            print(f"Azure Recognition Failed: {result.reason}")
+        raise RuntimeError(f"Azure Recognition Failed: {result.reason}")
+
+    def _release_slot(self, future):
+        # 슬롯은 스레드 작업이 실제로 끝날 때 반환 (타임아웃 후에도 진행 중인 호출까지 동시 실행 수에 포함)
+        self.stats["in_flight"] -= 1
+        self._slots.release()
+        if not future.cancelled():
+            future.exception()
+
+    async def assess(self, audio, reference_text: str) -> float:
+        if not self.enabled or not reference_text:
+            self.stats["skipped"] += 1
             return 0.0
 
+        self.stats["requests"] += 1
+        started = time.perf_counter()
+
+        try:
+            # 빈 슬롯을 기다리는 시간도 제한 시간에 포함 (Azure 가 느려 슬롯이 모두 찬 경우에도 대체 점수로 진행)
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.timeout)
+            self.stats["in_flight"] += 1
+
+            future = run_in_stage("azure", self.blocking_assess, audio, reference_text)
+            future.add_done_callback(self._release_slot)
+
+            remaining = max(0.0, self.timeout - (time.perf_counter() - started))
+            score = await asyncio.wait_for(asyncio.shield(future), timeout=remaining)
+            self.stats["success"] += 1
+            return score
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            print(f"Azure Assessment Timeout ({self.timeout}s)")
+            count_error("azure")
+            return 0.0
+        except Exception as e:
+            self.stats["failures"] += 1
+            print(f"Azure Assessment Exception: {e}")
+            count_error("azure")
+            return 0.0  # 에러 발생 시 0점 반환
+        finally:
+            latency_ms = (time.perf_counter() - started) * 1000
+            self.stats["total_latency_ms"] += latency_ms
+            self.stats["max_latency_ms"] = round(max(self.stats["max_latency_ms"], latency_ms), 1)
+
+    def get_stats(self) -> dict:
+        requests = self.stats["requests"]
+        return {
+            **self.stats,
+            "enabled": self.enabled,
+            "max_concurrency": self.max_concurrency,
+            "avg_latency_ms": round(self.stats["total_latency_ms"] / requests, 1) if requests else 0.0,
+            "failure_rate": round((self.stats["failures"] + self.stats["timeouts"]) / requests, 4) if requests else 0.0,
+        }
+
+
+AZURE_CLIENT = AzurePronunciationClient()
+
+
+def set_azure_client(client: AzurePronunciationClient):
+    """테스트/벤치마크에서 스텁 SDK를 사용하는 클라이언트로 교체할 때 사용"""
+    global AZURE_CLIENT
+    AZURE_CLIENT = client
+
+
+def blocking_assess_pronunciation(audio, reference_text: str) -> float:
+    if not AZURE_CLIENT.enabled or not reference_text:
+        return 0.0
+
+    try:
+        return AZURE_CLIENT.blocking_assess(audio, reference_text)
     except Exception as e:
         print(f"Azure Assessment Exception: {e}")
         return 0.0  # 에러 발생 시 0점 반환
 
 
-async def get_pronunciation_score(audio_path: str, reference_text: str) -> float:
-    return await asyncio.to_thread(blocking_assess_pronunciation, audio_path, reference_text)
\ No newline at end of file
+@span("azure")
+async def get_pronunciation_score(audio, reference_text: str) -> float:
+    return await AZURE_CLIENT.assess(audio, reference_text)
+
+
+def get_azure_stats() -> dict:
+    return AZURE_CLIENT.get_stats()
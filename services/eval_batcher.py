@@ -0,0 +1,116 @@
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+
+class EvalBatcherStoppedError(RuntimeError):
+    """배처가 종료되어 처리하지 못한 요청 (호출부는 기존 대체 응답 사용)"""
+
+
+def _fail_pending(batch: list):
+    for _, future in batch:
+        if not future.done():
+            future.set_exception(EvalBatcherStoppedError("Eval batcher stopped"))
+
+
+class EvalBatcher:
+    """
+    여러 세션에서 동시에 들어온 평가 요청을 짧은 시간 동안 모아 한 번에 처리합니다.
+    - 첫 요청이 들어온 뒤 window 동안 (최대 max_batch_size 개) 추가 요청을 모음
+    - handler(items) 는 items 와 같은 순서로 결과(또는 예외 객체) 목록을 반환
+    - 배치끼리는 동시에 실행 (느린 배치가 다음 배치를 막지 않도록)
+    """
+
+    def __init__(self, handler: Callable[[list], Awaitable[list]], batch_window_ms: int, max_batch_size: int):
+        self.handler = handler
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch_size = max_batch_size
+
+        self._queue: asyncio.Queue = None
+        self._dispatcher: asyncio.Task = None
+        self._batch_tasks = set()
+
+        self.stats = {
+            "requests": 0,
+            "batches": 0,
+            "batched_items": 0,
+            "max_batch_size": 0,
+            "in_flight_batches": 0,
+        }
+
+    def start(self):
+        if self._dispatcher is not None and not self._dispatcher.done():
+            return
+        self._queue = asyncio.Queue()
+        self._dispatcher = asyncio.create_task(self._dispatch_loop())
+
+    async def stop(self):
+        """종료. 대기열에 남은 요청은 EvalBatcherStoppedError 로 끝냄 (이미 실행 중인 배치는 그대로 완료)"""
+        if self._dispatcher is None:
+            return
+        self._dispatcher.cancel()
+        self._dispatcher = None
+        pending = []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        _fail_pending(pending)
+
+    async def submit(self, item):
+        self.start()
+        self.stats["requests"] += 1
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _collect_batch(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.batch_window
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+            except asyncio.CancelledError:
+                # 모으는 중에 종료되면 이미 꺼낸 요청도 대기열에 없으므로 여기서 끝냄
+                _fail_pending(batch)
+                raise
+        return batch
+
+    async def _dispatch_loop(self):
+        while True:
+            batch = await self._collect_batch()
+            task = asyncio.create_task(self._run_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _run_batch(self, batch: list):
+        self.stats["in_flight_batches"] += 1
+        self.stats["batches"] += 1
+        self.stats["batched_items"] += len(batch)
+        self.stats["max_batch_size"] = max(self.stats["max_batch_size"], len(batch))
+        try:
+            results = await self.handler([item for item, _ in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+        finally:
+            self.stats["in_flight_batches"] -= 1
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def get_stats(self) -> dict:
+        batches = self.stats["batches"]
+        return {
+            **self.stats,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "avg_batch_size": round(self.stats["batched_items"] / batches, 2) if batches else 0.0,
+        }
@@ -0,0 +1,186 @@
+import asyncio
+import random
+import time
+
+# 호출 제한 시간 / 재시도 / 동시 실행 수
+GEMINI_TIMEOUT_SECONDS = 8.0
+GEMINI_MAX_RETRIES = 2
+GEMINI_RETRY_BASE_DELAY = 0.2
+GEMINI_RETRY_MAX_DELAY = 2.0
+GEMINI_MAX_CONCURRENCY = 16
+
+# 재시도 예산: 최근 요청 수 대비 재시도 비율 제한 (장애 시 재시도가 부하를 키우지 않도록)
+GEMINI_RETRY_BUDGET_RATIO = 0.2
+GEMINI_RETRY_BUDGET_MIN = 5.0
+
+# 서킷 브레이커: 연속 실패가 쌓이면 일정 시간 호출 없이 바로 대체 응답 사용
+GEMINI_CIRCUIT_FAILURE_THRESHOLD = 5
+GEMINI_CIRCUIT_RESET_SECONDS = 30.0
+
+
+class CircuitOpenError(Exception):
+    """서킷이 열려 있어 Gemini 를 호출하지 않은 경우"""
+
+
+class RetryBudget:
+    """요청마다 ratio 만큼 토큰이 쌓이고, 재시도할 때 1개씩 사용합니다."""
+
+    def __init__(self, ratio: float, minimum: float):
+        self.ratio = ratio
+        self.maximum = max(minimum, 10.0)
+        self.tokens = minimum
+
+    def deposit(self):
+        self.tokens = min(self.maximum, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.open_count = 0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN and not self._probe_in_flight:
+            # 반개방 상태에서는 시험 호출 1개만 허용
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def release_probe(self):
+        """시험 호출이 결과 없이 끝난 경우 (취소 등). 상태는 그대로 두고 다음 호출이 다시 시험하도록"""
+        self._probe_in_flight = False
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.open_count += 1
+                print(f"[GeminiClient] Circuit opened after {self.consecutive_failures} failures")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+        self._probe_in_flight = False
+
+
+class GeminiClient:
+    """
+    SDK의 비동기 생성(generate_content_async)을 사용하는 Gemini 호출 계층
+    - 호출별 제한 시간, 지터를 준 지수 백오프 재시도 + 재시도 예산
+    - 동시 실행 수 제한
+    - 서킷 브레이커 (열리면 CircuitOpenError → 호출부에서 기존 대체 응답 사용)
+    model 에는 generate_content_async(prompt, generation_config=...) 를 가진 객체면 무엇이든
+    (utils.fake_gemini.FakeGeminiModel 등) 넘길 수 있습니다.
+    """
+
+    def __init__(self, model, timeout: float = GEMINI_TIMEOUT_SECONDS, max_retries: int = GEMINI_MAX_RETRIES,
+                 max_concurrency: int = GEMINI_MAX_CONCURRENCY):
+        self.model = model
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.max_concurrency = max_concurrency
+
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self.retry_budget = RetryBudget(GEMINI_RETRY_BUDGET_RATIO, GEMINI_RETRY_BUDGET_MIN)
+        self.breaker = CircuitBreaker(GEMINI_CIRCUIT_FAILURE_THRESHOLD, GEMINI_CIRCUIT_RESET_SECONDS)
+
+        self.stats = {
+            "requests": 0,
+            "success": 0,
+            "failures": 0,
+            "timeouts": 0,
+            "retries": 0,
+            "retry_budget_exhausted": 0,
+            "short_circuited": 0,
+            "in_flight": 0,
+        }
+
+    async def _call_once(self, prompt, generation_config) -> str:
+        kwargs = {"generation_config": generation_config} if generation_config is not None else {}
+        response = await asyncio.wait_for(self.model.generate_content_async(prompt, **kwargs), timeout=self.timeout)
+        text = response.text
+        if not text:
+            raise ValueError("Empty response")
+        return text
+
+    async def generate(self, prompt, generation_config=None) -> str:
+        self.stats["requests"] += 1
+
+        if not self.breaker.allow():
+            self.stats["short_circuited"] += 1
+            raise CircuitOpenError("Gemini circuit is open")
+
+        is_probe = self.breaker.state == CircuitBreaker.HALF_OPEN
+        try:
+            return await self._generate(prompt, generation_config)
+        except asyncio.CancelledError:
+            # 클라이언트 연결 종료/상위 제한 시간으로 취소된 시험 호출은 기록되지 않으므로 직접 해제
+            # (해제하지 않으면 반개방 상태에서 이후 모든 호출이 거부됨)
+            if is_probe:
+                self.breaker.release_probe()
+            raise
+
+    async def _generate(self, prompt, generation_config) -> str:
+        self.retry_budget.deposit()
+
+        async with self._slots:
+            self.stats["in_flight"] += 1
+            try:
+                attempt = 0
+                while True:
+                    try:
+                        text = await self._call_once(prompt, generation_config)
+                        self.breaker.record_success()
+                        self.stats["success"] += 1
+                        return text
+                    except Exception as e:
+                        if isinstance(e, asyncio.TimeoutError):
+                            self.stats["timeouts"] += 1
+
+                        can_retry = attempt < self.max_retries and self.breaker.state == CircuitBreaker.CLOSED
+                        if can_retry and not self.retry_budget.withdraw():
+                            self.stats["retry_budget_exhausted"] += 1
+                            can_retry = False
+
+                        if not can_retry:
+                            self.stats["failures"] += 1
+                            self.breaker.record_failure()
+                            raise
+
+                        # full jitter 백오프
+                        delay = random.uniform(0, min(GEMINI_RETRY_MAX_DELAY, GEMINI_RETRY_BASE_DELAY * (2 ** attempt)))
+                        attempt += 1
+                        self.stats["retries"] += 1
+                        await asyncio.sleep(delay)
+            finally:
+                self.stats["in_flight"] -= 1
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "circuit_state": self.breaker.state,
+            "circuit_open_count": self.breaker.open_count,
+            "retry_tokens": round(self.retry_budget.tokens, 2),
+        }
@@ -1,20 +1,94 @@
 import google.generativeai as genai
-import asyncio
 from google.generativeai.types import GenerationConfig
+from typing import Optional
 from models.data_models import GeminiEvalRequest, GeminiEvalResponse
+import asyncio
+import hashlib
+import json
+from services.eval_batcher import EvalBatcher
+from services.gemini_client import GeminiClient
+from utils.eval_cache import EvaluationCache
+from utils.metrics import span, count_error
 
 
 GEMINI_API_KEY = ""
-genai.configure(api_key=GEMINI_API_KEY)
-GEMINI_MODEL = genai.GenerativeModel('gemini-2.0-flash')
+GEMINI_MODEL_NAME = "gemini-2.0-flash"
+
+# import 시점에는 SDK 설정/모델 생성을 하지 않음 (init_gemini: 서버 시작 시 또는 첫 호출 시)
+GEMINI_MODEL = None
+GEMINI_CLIENT: GeminiClient = None
+
+EVAL_GENERATION_CONFIG = GenerationConfig(response_mime_type="application/json")
+
+# 통합 모드: 평가 JSON 의 next_question 에 다음 키워드 질문까지 받아서 PASS 턴의 두 번째 호출을 생략
+# 검증에 실패하면 기존처럼 선행 생성/별도 호출로 대체
+COMBINED_EVAL_MODE = True
+NEXT_QUESTION_MAX_CHARS = 300
+
+# 답변 평가 캐시 (같은 키워드에 대한 거의 같은 답변은 Gemini 호출 생략)
+EVAL_CACHE_ENABLED = True
+EVAL_CACHE_PATH = "cache/eval_cache.json"   # None 이면 메모리만 사용
+EVAL_CACHE_MAX_ENTRIES = 20000
+EVAL_CACHE_TTL_SECONDS = 7 * 24 * 3600
+EVAL_CACHE_SCORE_BUCKET = 10.0              # 발음 점수 구간 (70점 기준이 구간 경계가 되도록)
+EVAL_CACHE_SIMILARITY = 0.9                 # 정규화된 답변의 difflib 유사도 기준 (1.0 = 완전 일치만)
+
+# 세션 간 평가 마이크로 배치: 짧은 시간 동안 모인 평가 요청을 프롬프트 하나로 묶어 호출 수/쿼터 절약
+# 응답 배열에서 빠졌거나 검증에 실패한 항목만 개별 호출로 다시 평가
+EVAL_BATCH_ENABLED = False
+EVAL_BATCH_WINDOW_MS = 50
+EVAL_BATCH_MAX_SIZE = 8
+
+_combined_stats = {
+    "requested": 0,
+    "used": 0,
+    "rejected": 0,
+}
+
+_batch_stats = {
+    "batch_calls": 0,
+    "batch_items": 0,
+    "batch_failures": 0,
+    "single_fallbacks": 0,
+}
+
+
+def set_gemini_model(model):
+    """테스트/벤치마크에서 가짜 모델(utils.fake_gemini.FakeGeminiModel 등)로 교체할 때 사용"""
+    global GEMINI_MODEL, GEMINI_CLIENT
+    GEMINI_MODEL = model
+    GEMINI_CLIENT = GeminiClient(model)
+
+
+def init_gemini() -> GeminiClient:
+    """SDK 설정 + 모델 생성 (이미 설정되었거나 가짜 모델로 교체된 경우 그대로 사용)"""
+    if GEMINI_CLIENT is None:
+        genai.configure(api_key=GEMINI_API_KEY)
+        set_gemini_model(genai.GenerativeModel(GEMINI_MODEL_NAME))
+    return GEMINI_CLIENT
+
+
+def _model():
+    init_gemini()
+    return GEMINI_MODEL
 
 
 # =================================================================
 # [1] 유저 답변 평가 및 반응 (JSON 반환)
 # =================================================================
-def blocking_evaluate_and_respond(req: GeminiEvalRequest) -> GeminiEvalResponse:
-    try:
-        system_prompt = f"""
+def build_next_question_rule(req: GeminiEvalRequest) -> str:
+    if not req.next_keyword:
+        return """4. "next_question": Leave empty "". (Logic handles this separately)."""
+
+    return f"""4. "next_question": The NEXT question to ask after this keyword is finished.
+           - Ask about "{req.next_keyword}"{f' at {req.heritage_name}' if req.heritage_name else ''}.
+           - Reference Question: "{req.next_sample_question}"
+           - Do NOT mention the answer "{req.next_keyword}" in the question.
+           - Keep it simple (1-2 sentences). Write it even if evaluation is FAIL."""
+
+
+def build_eval_prompt(req: GeminiEvalRequest) -> str:
+    return f"""
         You are {req.npc_persona}, a friendly guide.
 
         Current Goal: User needs to explain "{req.target_keyword}".
@@ -33,15 +107,163 @@ def blocking_evaluate_and_respond(req: GeminiEvalRequest) -> GeminiEvalResponse:
         2. "reason": Internal reasoning.
         3. "reaction": NPC's VERBAL response. (e.g., "Exactly!", "Hmm...").
            - Keep it short (max 1 sentence). Do NOT include the next question here.
-        4. "next_question": Leave empty "". (Logic handles this separately).
+        {build_next_question_rule(req)}
         5. "feedback_korean": Educational feedback.
            - If PASS but grammar error: Point it out gently.
            - If FAIL: Explain why without spoilers if possible.
         """
 
-        response = GEMINI_MODEL.generate_content(
-            system_prompt,
-            generation_config=GenerationConfig(response_mime_type="application/json")
+
+def build_batch_eval_prompt(items: list) -> str:
+    """items: [(요청 ID, GeminiEvalRequest)]. 각 요청을 단일 프롬프트와 같은 규칙으로 평가하도록 합니다."""
+    blocks = []
+    for request_id, req in items:
+        if req.next_keyword:
+            heritage = f" at {req.heritage_name}" if req.heritage_name else ""
+            next_lines = f"""
+        Next Keyword: "{req.next_keyword}"{heritage}
+        Next Reference Question: "{req.next_sample_question}\""""
+        else:
+            next_lines = """
+        Next Keyword: (none)"""
+        blocks.append(f"""
+        Request "{request_id}":
+        Persona: {req.npc_persona}
+        Current Goal: User needs to explain "{req.target_keyword}".
+        Reference Answer: "{req.sample_question}"
+        User Input: "{req.user_input}"
+        Pronunciation Score: {req.pronunciation_score} (Threshold: 70){next_lines}""")
+
+    return f"""
+        You are a friendly guide evaluating several independent user answers.
+        Evaluate each request separately. Do not mix information between requests.
+        {"".join(blocks)}
+
+        Task (for each request):
+        1. Evaluate Meaning (PASS/FAIL).
+           - PASS if user input conveys the meaning of the request's goal keyword.
+        2. Evaluate Grammar.
+
+        [IMPORTANT Output Rules]
+        Return a JSON array with exactly one object per request, each with these keys:
+        0. "id": The request ID (e.g., "{items[0][0]}").
+        1. "evaluation": "PASS" or "FAIL"
+        2. "reason": Internal reasoning.
+        3. "reaction": NPC's VERBAL response in that request's persona. (e.g., "Exactly!", "Hmm...").
+           - Keep it short (max 1 sentence). Do NOT include the next question here.
+        4. "next_question": If the request has a Next Keyword, the NEXT question to ask about it.
+           - Based on its Next Reference Question. Do NOT mention the Next Keyword itself.
+           - Keep it simple (1-2 sentences). Write it even if evaluation is FAIL.
+           - If Next Keyword is (none), leave empty "".
+        5. "feedback_korean": Educational feedback.
+           - If PASS but grammar error: Point it out gently.
+           - If FAIL: Explain why without spoilers if possible.
+        """
+
+
+def parse_batch_eval_response(text: str) -> dict:
+    """배치 응답(JSON 배열)을 {요청 ID: GeminiEvalResponse} 로 나눕니다. 잘못된 항목은 제외"""
+    data = json.loads(text)
+    if isinstance(data, dict):
+        # {"results": [...]} 처럼 감싸서 오는 경우
+        data = next((v for v in data.values() if isinstance(v, list)), [])
+
+    results = {}
+    for item in data if isinstance(data, list) else []:
+        if not isinstance(item, dict) or "id" not in item:
+            continue
+        try:
+            response = GeminiEvalResponse.model_validate(item)
+        except ValueError:
+            continue
+        if response.evaluation in ("PASS", "FAIL"):
+            results[str(item["id"])] = response
+    return results
+
+
+def attach_next_question(req: GeminiEvalRequest, heritage, keyword, sample_q) -> bool:
+    """통합 모드이면 평가 요청에 다음 키워드를 붙입니다. (붙이지 않았으면 False)"""
+    if not COMBINED_EVAL_MODE:
+        return False
+    req.heritage_name = heritage
+    req.next_keyword = keyword
+    req.next_sample_question = sample_q
+    return True
+
+
+def eval_prompt_version() -> str:
+    """
+    평가 프롬프트 템플릿의 지문. 프롬프트를 수정하면 값이 바뀌어 이전 캐시 항목이 무효화됩니다.
+    """
+    probe = GeminiEvalRequest(
+        npc_persona="<persona>", user_input="<input>", pronunciation_score=0.0,
+        target_keyword="<keyword>", sample_question="<question>", retry_count=0,
+        heritage_name="<heritage>", next_keyword="<next>", next_sample_question="<next question>"
+    )
+    templates = build_eval_prompt(probe) + build_eval_prompt(probe.model_copy(update={"next_keyword": None}))
+    templates += build_batch_eval_prompt([("<id>", probe), ("<id2>", probe.model_copy(update={"next_keyword": None}))])
+    return hashlib.sha256(templates.encode("utf-8")).hexdigest()[:12]
+
+
+EVAL_CACHE = EvaluationCache(
+    max_entries=EVAL_CACHE_MAX_ENTRIES, ttl_seconds=EVAL_CACHE_TTL_SECONDS, score_bucket=EVAL_CACHE_SCORE_BUCKET,
+    similarity=EVAL_CACHE_SIMILARITY, path=EVAL_CACHE_PATH, version=eval_prompt_version()
+)
+
+
+def load_eval_cache() -> int:
+    """저장된 평가 캐시를 읽습니다. (서버 시작 시, 블로킹)"""
+    if not EVAL_CACHE_ENABLED:
+        return 0
+    loaded = EVAL_CACHE.load()
+    print(f"[EvalCache] Loaded {loaded} entries (prompt version {EVAL_CACHE.version})")
+    return loaded
+
+
+def save_eval_cache():
+    """평가 캐시를 파일에 저장합니다. (서버 종료 시, 블로킹)"""
+    if EVAL_CACHE_ENABLED:
+        EVAL_CACHE.save()
+
+
+def invalidate_eval_cache():
+    """프롬프트 외의 이유(모델 교체 등)로 캐시를 비워야 할 때 사용"""
+    EVAL_CACHE.invalidate(eval_prompt_version())
+
+
+def valid_next_question(req: GeminiEvalRequest, resp: GeminiEvalResponse) -> Optional[str]:
+    """
+    통합 모드에서 받은 next_question 을 검증합니다. 사용할 수 없으면 None.
+    (비어 있음 / 너무 김 / 질문이 아님 / 정답 키워드 노출)
+    """
+    if not req.next_keyword:
+        return None
+
+    question = (resp.next_question or "").strip()
+    if (not question or len(question) > NEXT_QUESTION_MAX_CHARS or "?" not in question
+            or req.next_keyword.lower() in question.lower()):
+        _combined_stats["rejected"] += 1
+        return None
+
+    _combined_stats["used"] += 1
+    return question
+
+
+def fallback_eval_response(error) -> GeminiEvalResponse:
+    return GeminiEvalResponse(
+        evaluation="FAIL",
+        reason=f"Error: {error}",
+        reaction="Sorry, I couldn't hear that clearly.",
+        next_question="",
+        feedback_korean="오류가 발생했습니다."
+    )
+
+
+def blocking_evaluate_and_respond(req: GeminiEvalRequest) -> GeminiEvalResponse:
+    try:
+        response = _model().generate_content(
+            build_eval_prompt(req),
+            generation_config=EVAL_GENERATION_CONFIG
         )
 
         if not response.text:
@@ -51,21 +273,14 @@ def blocking_evaluate_and_respond(req: GeminiEvalRequest) -> GeminiEvalResponse:
 
     except Exception as e:
         print(f"Gemini Eval Error: {e}")
-        return GeminiEvalResponse(
-            evaluation="FAIL",
-            reason=f"Error: {e}",
-            reaction="Sorry, I couldn't hear that clearly.",
-            next_question="",
-            feedback_korean="오류가 발생했습니다."
-        )
+        return fallback_eval_response(e)
 
 
 # =================================================================
 # [2] 오프닝 질문 생성 (첫 만남 / 같은 문화재 내 다음 질문)
 # =================================================================
-def blocking_generate_opening(persona, heritage, keyword, sample_q):
-    try:
-        prompt = f"""
+def build_opening_prompt(persona, heritage, keyword, sample_q) -> str:
+    return f"""
         Role: You are {persona} at {heritage}.
         Task: Ask a question about "{keyword}".
 
@@ -76,7 +291,11 @@ def blocking_generate_opening(persona, heritage, keyword, sample_q):
         2. The user must say "{keyword}" to answer.
         3. Keep it simple (1-2 sentences).
         """
-        response = GEMINI_MODEL.generate_content(prompt)
+
+
+def blocking_generate_opening(persona, heritage, keyword, sample_q):
+    try:
+        response = _model().generate_content(build_opening_prompt(persona, heritage, keyword, sample_q))
         return response.text.strip()
     except:
         return sample_q
@@ -85,9 +304,8 @@ def blocking_generate_opening(persona, heritage, keyword, sample_q):
 # =================================================================
 # [3] 전환 질문 생성 (다른 문화재로 이동 시 - Hello 금지)
 # =================================================================
-def blocking_generate_transition(persona, prev_heritage, curr_heritage, keyword, sample_q):
-    try:
-        prompt = f"""
+def build_transition_prompt(persona, prev_heritage, curr_heritage, keyword, sample_q) -> str:
+    return f"""
         Role: You are {persona}.
         Context: We just finished touring {prev_heritage} and moved to {curr_heritage}.
 
@@ -101,7 +319,13 @@ def blocking_generate_transition(persona, prev_heritage, curr_heritage, keyword,
         - Do NOT say "Hello" or "Nice to meet you". We are already talking.
         - Do NOT mention the answer "{keyword}" in your question.
         """
-        response = GEMINI_MODEL.generate_content(prompt)
+
+
+def blocking_generate_transition(persona, prev_heritage, curr_heritage, keyword, sample_q):
+    try:
+        response = _model().generate_content(
+            build_transition_prompt(persona, prev_heritage, curr_heritage, keyword, sample_q)
+        )
         return response.text.strip()
     except:
         return f"Now let's look at {curr_heritage}. {sample_q}"
@@ -109,14 +333,98 @@ def blocking_generate_transition(persona, prev_heritage, curr_heritage, keyword,
 
 # =================================================================
 # [Async Wrappers]
+# SDK의 비동기 호출 + 제한 시간/재시도/서킷 브레이커 (GeminiClient)
+# 실패하거나 서킷이 열려 있으면 위와 같은 대체 응답을 사용
 # =================================================================
+async def request_evaluation(req: GeminiEvalRequest) -> GeminiEvalResponse:
+    """단일 평가 호출 (실패 시 예외)"""
+    text = await init_gemini().generate(build_eval_prompt(req), generation_config=EVAL_GENERATION_CONFIG)
+    return GeminiEvalResponse.model_validate_json(text)
+
+
+async def evaluate_batch(reqs: list) -> list:
+    """
+    EVAL_BATCHER 의 처리 함수. 여러 요청을 프롬프트 하나로 평가하고,
+    응답에서 빠졌거나 잘못된 항목만 개별 호출로 다시 평가합니다. (결과 또는 예외 객체 목록)
+    """
+    if len(reqs) == 1:
+        return await asyncio.gather(request_evaluation(reqs[0]), return_exceptions=True)
+
+    items = [(f"r{i}", req) for i, req in enumerate(reqs)]
+    _batch_stats["batch_calls"] += 1
+    _batch_stats["batch_items"] += len(reqs)
+    try:
+        text = await init_gemini().generate(build_batch_eval_prompt(items), generation_config=EVAL_GENERATION_CONFIG)
+        parsed = parse_batch_eval_response(text)
+    except Exception as e:
+        print(f"Gemini Batch Eval Error: {e!r}")
+        _batch_stats["batch_failures"] += 1
+        parsed = {}
+
+    missing = [i for i, (request_id, _) in enumerate(items) if request_id not in parsed]
+    _batch_stats["single_fallbacks"] += len(missing)
+    retried = await asyncio.gather(*(request_evaluation(reqs[i]) for i in missing), return_exceptions=True)
+
+    results = [parsed.get(request_id) for request_id, _ in items]
+    for i, result in zip(missing, retried):
+        results[i] = result
+    return results
+
+
+EVAL_BATCHER = EvalBatcher(evaluate_batch, EVAL_BATCH_WINDOW_MS, EVAL_BATCH_MAX_SIZE)
+
+
+@span("gemini_eval")
 async def evaluate_and_respond(req):
-    return await asyncio.to_thread(blocking_evaluate_and_respond, req)
+    if req.next_keyword:
+        _combined_stats["requested"] += 1
+
+    if EVAL_CACHE_ENABLED:
+        cached = EVAL_CACHE.get(req)
+        if cached is not None:
+            return GeminiEvalResponse.model_validate(cached)
+
+    try:
+        if EVAL_BATCH_ENABLED:
+            response = await EVAL_BATCHER.submit(req)
+        else:
+            response = await request_evaluation(req)
+        # 대체 응답(오류)은 저장하지 않음
+        if EVAL_CACHE_ENABLED:
+            EVAL_CACHE.put(req, response.model_dump())
+        return response
+    except Exception as e:
+        print(f"Gemini Eval Error: {e!r}")
+        count_error("gemini_eval")
+        return fallback_eval_response(e)
 
 
+@span("gemini_question")
 async def generate_opening_question(persona, heritage, keyword, sample_q):
-    return await asyncio.to_thread(blocking_generate_opening, persona, heritage, keyword, sample_q)
+    try:
+        text = await init_gemini().generate(build_opening_prompt(persona, heritage, keyword, sample_q))
+        return text.strip()
+    except Exception as e:
+        print(f"Gemini Opening Error: {e!r}")
+        count_error("gemini_question")
+        return sample_q
 
 
+@span("gemini_question")
 async def generate_transition_question(persona, prev_h, curr_h, keyword, sample_q):
-    return await asyncio.to_thread(blocking_generate_transition, persona, prev_h, curr_h, keyword, sample_q)
\ No newline at end of file
+    try:
+        text = await init_gemini().generate(build_transition_prompt(persona, prev_h, curr_h, keyword, sample_q))
+        return text.strip()
+    except Exception as e:
+        print(f"Gemini Transition Error: {e!r}")
+        count_error("gemini_question")
+        return f"Now let's look at {curr_h}. {sample_q}"
+
+
+def get_gemini_stats() -> dict:
+    return {
+        **init_gemini().get_stats(),
+        "combined_eval": {"enabled": COMBINED_EVAL_MODE, **_combined_stats},
+        "eval_cache": {"enabled": EVAL_CACHE_ENABLED, **EVAL_CACHE.get_stats()},
+        "eval_batch": {"enabled": EVAL_BATCH_ENABLED, **_batch_stats, **EVAL_BATCHER.get_stats()},
+    }
@@ -0,0 +1,113 @@
+import asyncio
+import time
+import traceback
+from typing import Optional
+
+import numpy as np
+
+from services.gemini_service import init_gemini, load_eval_cache
+from services.opening_pack import load_opening_pack
+from services.scheduler import run_in_stage
+from services.stt_service import load_stt_model, transcribe_audio
+from utils.audio_decode import SAMPLE_RATE
+from utils.text_correction import init_text_correction
+
+# 서버 시작 준비 (모델/클라이언트 로드 → 워밍업 → ready)
+# - STARTUP_BLOCKING=True: lifespan 에서 준비가 끝날 때까지 기다린 뒤 요청을 받음
+# - False: 바로 요청을 받고 준비는 백그라운드로 진행 (로드 밸런서는 /readyz 로 트래픽 투입 시점을 판단)
+STARTUP_BLOCKING = False
+WARMUP_ENABLED = True
+WARMUP_AUDIO_SECONDS = 1.0
+
+_state = {
+    "phase": "starting",   # starting → loading → warming → ready (실패 시 failed, 종료 시 stopping)
+    "started_at": time.time(),
+    "ready_at": None,
+    "error": None,
+    "steps_ms": {},
+}
+_task: Optional[asyncio.Task] = None
+
+
+def preload_models():
+    """
+    블로킹 로드. 워커를 fork 하기 전에 호출하면 (gunicorn --preload) 워커들이 모델 메모리를
+    copy-on-write 로 공유합니다. 워밍업 추론은 fork 이후 각 워커의 prepare() 에서 실행됩니다.
+    """
+    init_text_correction()
+    init_gemini()
+    load_stt_model()
+
+
+async def _step(name: str, fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    if asyncio.iscoroutine(result) or isinstance(result, asyncio.Future):
+        result = await result
+    _state["steps_ms"][name] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+def _warmup_audio() -> np.ndarray:
+    # 무음이 아닌 짧은 신호 (디코더까지 한 번 실행되도록)
+    t = np.arange(int(SAMPLE_RATE * WARMUP_AUDIO_SECONDS)) / SAMPLE_RATE
+    return (0.1 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+async def prepare():
+    try:
+        _state["phase"] = "loading"
+        # 사전 생성된 오프닝 질문/음성 번들 (없으면 실시간 생성)
+        await _step("opening_pack", run_in_stage, "io", load_opening_pack)
+        # 문화재 이름 교정 엔진 (카탈로그 기반, 1회 생성)
+        await _step("text_correction", init_text_correction)
+        await _step("gemini", init_gemini)
+        # 저장된 답변 평가 캐시 (프롬프트 버전이 같을 때만)
+        await _step("eval_cache", run_in_stage, "io", load_eval_cache)
+        if not await _step("stt_model", run_in_stage, "stt", load_stt_model):
+            raise RuntimeError("STT model failed to load")
+
+        if WARMUP_ENABLED:
+            _state["phase"] = "warming"
+            # 첫 추론의 지연(커널/스레드 풀 초기화, 워커 프로세스 모델 로드)을 요청 전에 처리
+            await _step("stt_warmup", transcribe_audio, _warmup_audio())
+
+        _state["phase"] = "ready"
+        _state["ready_at"] = time.time()
+        print(f"[Lifecycle] Ready in {_state['ready_at'] - _state['started_at']:.1f}s {_state['steps_ms']}")
+    except Exception as e:
+        traceback.print_exc()
+        _state["phase"] = "failed"
+        _state["error"] = str(e)
+
+
+async def start():
+    """lifespan 시작 시 호출"""
+    global _task
+    _state["started_at"] = time.time()
+    if STARTUP_BLOCKING:
+        await prepare()
+    else:
+        _task = asyncio.create_task(prepare())
+
+
+async def stop():
+    """lifespan 종료 시 호출 (이후 /readyz 는 503)"""
+    _state["phase"] = "stopping"
+    if _task is not None and not _task.done():
+        _task.cancel()
+
+
+def is_ready() -> bool:
+    return _state["phase"] == "ready"
+
+
+def get_readiness() -> dict:
+    return {
+        "ready": is_ready(),
+        "phase": _state["phase"],
+        "uptime_s": round(time.time() - _state["started_at"], 1),
+        "startup_s": round(_state["ready_at"] - _state["started_at"], 1) if _state["ready_at"] else None,
+        "steps_ms": dict(_state["steps_ms"]),
+        "error": _state["error"],
+    }
@@ -0,0 +1,89 @@
+import json
+import os
+import random
+from typing import Optional
+
+from services.gemini_service import generate_opening_question
+from services.tts_service import TTS_CACHE
+
+# 사전 생성된 오프닝 질문 번들 위치
+# OPENING_PACK_DIR/CURRENT 파일에 사용할 버전 폴더 이름이 기록되어 있음
+OPENING_PACK_ENABLED = True
+OPENING_PACK_DIR = "assets/opening_pack"
+
+_pack = {
+    "version": None,
+    "entries": {},  # (persona, heritage, keyword, sample_question) -> [질문 변형, ...]
+}
+
+_stats = {
+    "hits": 0,
+    "misses": 0,
+}
+
+
+def pack_key(persona, heritage, keyword, sample_q) -> str:
+    return "\t".join([persona, heritage, keyword, sample_q or ""])
+
+
+def load_opening_pack(pack_dir: str = OPENING_PACK_DIR, version: Optional[str] = None) -> bool:
+    """
+    번들의 manifest.json 을 읽고, 번들 음성 폴더를 TTS 캐시의 읽기 전용 저장소로 등록합니다.
+    번들이 없으면 False를 반환하고 기존처럼 실시간 생성으로 동작합니다.
+    """
+    if not OPENING_PACK_ENABLED:
+        return False
+
+    try:
+        if version is None:
+            with open(os.path.join(pack_dir, "CURRENT"), "r", encoding="utf-8") as f:
+                version = f.read().strip()
+
+        bundle_dir = os.path.join(pack_dir, version)
+        with open(os.path.join(bundle_dir, "manifest.json"), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        print(f"[OpeningPack] No bundle found in {pack_dir}. Using live generation.")
+        return False
+    except Exception as e:
+        print(f"[OpeningPack] Failed to load bundle: {e}")
+        return False
+
+    _pack["version"] = manifest.get("version", version)
+    _pack["entries"] = {
+        pack_key(e["persona"], e["heritage"], e["keyword"], e["sample_question"]): e["variants"]
+        for e in manifest.get("entries", [])
+        if e.get("variants")
+    }
+
+    # 번들 음성은 TTS 캐시와 같은 (sha256 키) 구조이므로 그대로 조회됨
+    TTS_CACHE.add_fallback_dir(os.path.join(bundle_dir, "audio"))
+
+    print(f"[OpeningPack] Loaded bundle {_pack['version']} ({len(_pack['entries'])} keywords)")
+    return True
+
+
+def lookup_opening_question(persona, heritage, keyword, sample_q) -> Optional[str]:
+    variants = _pack["entries"].get(pack_key(persona, heritage, keyword, sample_q))
+    if not variants:
+        return None
+    return random.choice(variants)
+
+
+async def get_opening_question(persona, heritage, keyword, sample_q) -> str:
+    """번들에 있으면 바로 반환하고, 없으면 Gemini로 실시간 생성합니다."""
+    question = lookup_opening_question(persona, heritage, keyword, sample_q)
+    if question is not None:
+        _stats["hits"] += 1
+        return question
+
+    _stats["misses"] += 1
+    return await generate_opening_question(persona, heritage, keyword, sample_q)
+
+
+def get_opening_pack_stats() -> dict:
+    return {
+        **_stats,
+        "version": _pack["version"],
+        "keywords": len(_pack["entries"]),
+    }
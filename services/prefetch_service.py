@@ -0,0 +1,124 @@
+import asyncio
+from collections import OrderedDict
+from typing import Optional
+
+from services.gemini_service import generate_opening_question
+from services.opening_pack import lookup_opening_question, get_opening_question
+from utils.metrics import span
+
+# 평가(Gemini)와 동시에 다음 질문을 미리 생성할지 여부
+SPECULATIVE_PREFETCH_ENABLED = True
+
+# 사용되지 않은 선행 생성 결과를 보관할 최대 개수 (다음 턴/다른 유저가 재사용)
+PREFETCH_CACHE_SIZE = 256
+
+_prefetch_cache: "OrderedDict[tuple, str]" = OrderedDict()
+
+_stats = {
+    "started": 0,      # 선행 생성 시작 횟수 (실제 Gemini 호출)
+    "hits": 0,         # 선행 생성 결과를 그대로 사용한 횟수
+    "cache_hits": 0,   # 이전에 버려졌던 결과를 캐시에서 재사용한 횟수
+    "misses": 0,       # 다음 질문이 필요했지만 선행 생성이 없었던 횟수
+    "wasted": 0,       # 사용되지 않고 버려진 선행 생성 횟수
+}
+
+
+def _cache_key(persona, heritage, keyword, sample_q) -> tuple:
+    return (persona, heritage, keyword, sample_q)
+
+
+def _store_result(key: tuple, task: asyncio.Task):
+    """완료된 선행 생성 결과를 캐시에 보관합니다."""
+    if task.cancelled() or task.exception() is not None:
+        return
+    _prefetch_cache[key] = task.result()
+    _prefetch_cache.move_to_end(key)
+    while len(_prefetch_cache) > PREFETCH_CACHE_SIZE:
+        _prefetch_cache.popitem(last=False)
+
+
+class QuestionPrefetch:
+    """다음 키워드 질문을 평가와 병렬로 생성하는 작업 핸들"""
+
+    def __init__(self, persona, heritage, keyword, sample_q):
+        self.key = _cache_key(persona, heritage, keyword, sample_q)
+        self.task: Optional[asyncio.Task] = None
+
+        if self.key in _prefetch_cache:
+            return
+
+        self.task = asyncio.create_task(generate_opening_question(persona, heritage, keyword, sample_q))
+        _stats["started"] += 1
+
+    def matches(self, persona, heritage, keyword, sample_q) -> bool:
+        return self.key == _cache_key(persona, heritage, keyword, sample_q)
+
+    async def take(self) -> str:
+        """선행 생성(또는 캐시) 결과를 꺼내 사용합니다."""
+        cached = _prefetch_cache.pop(self.key, None)
+        if cached is not None:
+            _stats["cache_hits"] += 1
+            if self.task is not None:
+                # 캐시에서 이미 꺼냈으므로 이번 생성 결과는 다음 요청을 위해 보관
+                self.discard()
+            return cached
+
+        task, self.task = self.task, None
+        if task is None:
+            # 캐시 항목을 다른 요청이 먼저 가져간 경우
+            _stats["misses"] += 1
+            return await generate_opening_question(*self.key)
+
+        _stats["hits"] += 1
+        return await task
+
+    def discard(self):
+        """결과를 사용하지 않는 경우: 완료 시점에 캐시에 보관합니다."""
+        if self.task is None:
+            return
+        _stats["wasted"] += 1
+        # 이미 보낸 Gemini 호출을 취소하는 대신, 결과를 캐시에 남겨 재시도 턴에서 재사용
+        self.task.add_done_callback(lambda t, key=self.key: _store_result(key, t))
+        self.task = None
+
+
+def start_question_prefetch(persona, heritage, keyword, sample_q) -> Optional[QuestionPrefetch]:
+    if not SPECULATIVE_PREFETCH_ENABLED:
+        return None
+    # 사전 생성 번들에 있는 질문은 네트워크 호출이 필요 없으므로 선행 생성하지 않음
+    if lookup_opening_question(persona, heritage, keyword, sample_q) is not None:
+        return None
+    return QuestionPrefetch(persona, heritage, keyword, sample_q)
+
+
+@span("next_question")
+async def get_next_question(prefetch: Optional[QuestionPrefetch], persona, heritage, keyword, sample_q) -> str:
+    """
+    다음 질문을 반환합니다. 선행 생성 결과가 있으면 사용하고, 없으면 새로 생성합니다.
+    """
+    if prefetch is not None and prefetch.matches(persona, heritage, keyword, sample_q):
+        return await prefetch.take()
+
+    if prefetch is not None:
+        prefetch.discard()
+
+    cached = _prefetch_cache.pop(_cache_key(persona, heritage, keyword, sample_q), None)
+    if cached is not None:
+        _stats["cache_hits"] += 1
+        return cached
+
+    if SPECULATIVE_PREFETCH_ENABLED and lookup_opening_question(persona, heritage, keyword, sample_q) is None:
+        _stats["misses"] += 1
+    return await get_opening_question(persona, heritage, keyword, sample_q)
+
+
+def get_prefetch_stats() -> dict:
+    used = _stats["hits"] + _stats["cache_hits"]
+    needed = used + _stats["misses"]
+    return {
+        **_stats,
+        "enabled": SPECULATIVE_PREFETCH_ENABLED,
+        "cached": len(_prefetch_cache),
+        "hit_rate": round(used / needed, 4) if needed else 0.0,
+        "waste_rate": round(_stats["wasted"] / _stats["started"], 4) if _stats["started"] else 0.0,
+    }
@@ -0,0 +1,123 @@
+import difflib
+import math
+import re
+from typing import Optional
+
+from services import azure_service
+from services.stt_backends import SttResult
+
+# 발음 점수 백엔드
+# - "azure": 기존 방식 (매 턴 Azure 발음 평가 호출)
+# - "local": Whisper 디코딩 신뢰도(avg_logprob, no_speech_prob, 단어 확률)로 계산 (추가 호출 없음)
+# - "hybrid": 로컬 점수를 먼저 계산하고, 합격 기준(70점) 근처일 때만 Azure 로 다시 평가
+PRONUNCIATION_BACKEND = "azure"
+
+# Gemini 평가 프롬프트의 발음 점수 기준 (Threshold: 70)
+PRONUNCIATION_THRESHOLD = 70.0
+HYBRID_MARGIN = 10.0          # 로컬 점수가 기준 ± 이 범위 안이면 Azure 호출
+
+# 로컬 점수 계산 (0~1 신뢰도 → 0~100점)
+LOCAL_WORD_WEIGHT = 0.6       # 기준 문장과 정렬한 단어 확률 평균
+LOCAL_LOGPROB_WEIGHT = 0.4    # 세그먼트 평균 로그 확률 (exp)
+LOCAL_CONFIDENCE_FLOOR = 0.35  # 이 이하 신뢰도는 0점
+LOCAL_CONFIDENCE_CEIL = 0.95   # 이 이상 신뢰도는 100점
+
+_WORD = re.compile(r"[\w']+")
+
+_stats = {
+    "local": 0,
+    "azure": 0,
+    "hybrid_escalated": 0,
+    "local_unavailable": 0,
+}
+
+
+def uses_local_scoring() -> bool:
+    """STT 단계에서 단어별 확률(word_timestamps)을 받아야 하는지"""
+    return PRONUNCIATION_BACKEND in ("local", "hybrid")
+
+
+def _tokens(text: str) -> list:
+    return _WORD.findall((text or "").lower())
+
+
+def _hypothesis_words(stt: SttResult) -> list:
+    """[(정규화된 단어, 확률)]. 단어 확률이 없으면 세그먼트 평균 확률을 단어마다 사용"""
+    words = []
+    for segment in stt.segments:
+        if segment["words"]:
+            for w in segment["words"]:
+                words.extend((token, w["probability"]) for token in _tokens(w["word"]))
+        else:
+            probability = math.exp(min(0.0, segment["avg_logprob"]))
+            words.extend((token, probability) for token in _tokens(segment["text"]))
+    return words
+
+
+def _alignment_confidence(reference: list, hypothesis: list) -> float:
+    """
+    기준 단어마다 정렬된 인식 단어의 확률을 더합니다.
+    - 일치: 확률 그대로 / 치환: 철자 유사도만큼 감점 / 누락: 0
+    (기준 문장이 교정된 텍스트이면, 교정된 고유명사는 치환으로 잡혀 감점됨)
+    """
+    hyp_tokens = [token for token, _ in hypothesis]
+    matcher = difflib.SequenceMatcher(None, reference, hyp_tokens, autojunk=False)
+    credit = 0.0
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            credit += sum(probability for _, probability in hypothesis[j1:j2])
+        elif tag == "replace":
+            for ref_word, (hyp_word, probability) in zip(reference[i1:i2], hypothesis[j1:j2]):
+                credit += probability * difflib.SequenceMatcher(None, ref_word, hyp_word).ratio()
+    return credit / len(reference)
+
+
+def score_from_stt(stt: SttResult, reference_text: str) -> Optional[float]:
+    """Whisper 디코딩 결과로 0~100 발음 점수를 계산합니다. 신뢰도 정보가 없으면 None"""
+    if stt is None or not stt.segments:
+        return None
+    hypothesis = _hypothesis_words(stt)
+    if not hypothesis:
+        return 0.0
+
+    reference = _tokens(reference_text) or [token for token, _ in hypothesis]
+    word_confidence = _alignment_confidence(reference, hypothesis)
+
+    # 세그먼트 길이(글자 수) 가중 평균
+    weights = [max(1, len(segment["text"])) for segment in stt.segments]
+    total = sum(weights)
+    avg_logprob = sum(w * s["avg_logprob"] for w, s in zip(weights, stt.segments)) / total
+    no_speech = sum(w * s["no_speech_prob"] for w, s in zip(weights, stt.segments)) / total
+
+    confidence = (LOCAL_WORD_WEIGHT * word_confidence
+                  + LOCAL_LOGPROB_WEIGHT * math.exp(min(0.0, avg_logprob))) * (1.0 - no_speech)
+    scaled = (confidence - LOCAL_CONFIDENCE_FLOOR) / (LOCAL_CONFIDENCE_CEIL - LOCAL_CONFIDENCE_FLOOR)
+    return round(min(1.0, max(0.0, scaled)) * 100, 1)
+
+
+async def get_pronunciation_score(audio, reference_text: str, stt: SttResult = None) -> float:
+    """
+    PRONUNCIATION_BACKEND 에 따라 로컬 점수 또는 Azure 점수를 반환합니다.
+    로컬 점수를 계산할 수 없으면 (디코딩 신뢰도가 없는 STT 등) Azure 를 사용합니다.
+    """
+    local_score = score_from_stt(stt, reference_text) if uses_local_scoring() else None
+    if uses_local_scoring() and local_score is None:
+        _stats["local_unavailable"] += 1
+
+    if local_score is not None:
+        near_threshold = abs(local_score - PRONUNCIATION_THRESHOLD) < HYBRID_MARGIN
+        if PRONUNCIATION_BACKEND == "local" or not near_threshold or not azure_service.AZURE_CLIENT.enabled:
+            _stats["local"] += 1
+            return local_score
+
+        _stats["hybrid_escalated"] += 1
+        azure_score = await azure_service.get_pronunciation_score(audio, reference_text)
+        # Azure 는 실패 시 0.0 을 반환하므로 이 경우 로컬 점수 유지
+        return azure_score if azure_score > 0.0 else local_score
+
+    _stats["azure"] += 1
+    return await azure_service.get_pronunciation_score(audio, reference_text)
+
+
+def get_pronunciation_stats() -> dict:
+    return {"backend": PRONUNCIATION_BACKEND, **_stats}
@@ -0,0 +1,213 @@
+import asyncio
+import contextvars
+import itertools
+import math
+import queue
+import threading
+import time
+
+from utils.metrics import Gauge
+
+# 턴 파이프라인 단계별 전용 스레드 풀 크기
+# 기본 executor 하나를 같이 쓰면 느린 네트워크 호출(gTTS/Azure)이 STT(CPU)를 굶기게 되므로 분리
+STAGE_WORKERS = {
+    "stt": 2,     # Whisper 추론 + 업로드 음성 디코딩 (CPU)
+    "azure": 8,   # Azure 발음 평가 (네트워크)
+    "tts": 8,     # gTTS 합성 (네트워크)
+    "tts_local": 2,   # 오프라인 TTS 스텁 (실제 엔진은 자체 프로세스 풀). 느린 gTTS 대기열 뒤에 서지 않도록 분리
+    "io": 4,      # 디스크/DB (TTS 캐시, 세션 저장소, 리포트)
+}
+
+# 우선순위 (작을수록 먼저 처리)
+PRIORITY_TURN = 0         # 이미 대화 중인 유저의 /interact
+PRIORITY_NEW_SESSION = 1  # 새 /start_conversation
+
+# 승인 제어: 단계별 대기열 합계가 기준을 넘으면 요청을 받지 않고 Retry-After 와 함께 거절
+# 새 세션은 더 낮은 기준에서 먼저 거절하여, 진행 중인 유저의 턴이 우선 처리되도록 함
+ADMISSION_MAX_QUEUE_TURN = 64
+ADMISSION_MAX_QUEUE_NEW_SESSION = 16
+ADMISSION_RETRY_AFTER_MIN_SECONDS = 1
+
+
+class AdmissionRejectedError(Exception):
+    """과부하로 요청을 받지 않은 경우 (main 에서 429/503 + Retry-After 응답으로 변환)"""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+request_priority: contextvars.ContextVar = contextvars.ContextVar("request_priority", default=PRIORITY_TURN)
+
+
+def _resolve(future: asyncio.Future, result, error):
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class StageExecutor:
+    """우선순위 큐를 사용하는 단계 전용 스레드 풀"""
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self._queue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._threads = []
+        self._lock = threading.Lock()
+
+        self.in_flight = 0
+        self.stats = {
+            "completed": 0,
+            "failed": 0,
+            "total_wait_ms": 0.0,
+            "total_run_ms": 0.0,
+        }
+
+    def _ensure_started(self):
+        if self._threads:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"{self.name}-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, priority: int, fn, *args) -> asyncio.Future:
+        self._ensure_started()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        context = contextvars.copy_context()
+        self._queue.put((priority, next(self._seq), time.perf_counter(), context, fn, args, future, loop))
+        return future
+
+    def _worker(self):
+        while True:
+            _, _, queued_at, context, fn, args, future, loop = self._queue.get()
+            if future.cancelled():
+                continue
+
+            started = time.perf_counter()
+            # 워커 스레드 여러 개가 함께 갱신하므로 (+= 는 원자적이지 않음) 잠금 안에서 변경
+            with self._lock:
+                self.in_flight += 1
+            result, error = None, None
+            try:
+                result = context.run(fn, *args)
+            except BaseException as e:
+                error = e
+            finally:
+                with self._lock:
+                    self.in_flight -= 1
+
+            finished = time.perf_counter()
+            with self._lock:
+                self.stats["completed" if error is None else "failed"] += 1
+                self.stats["total_wait_ms"] += (started - queued_at) * 1000
+                self.stats["total_run_ms"] += (finished - started) * 1000
+
+            try:
+                loop.call_soon_threadsafe(_resolve, future, result, error)
+            except RuntimeError:
+                # 이벤트 루프가 이미 종료된 경우
+                pass
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            in_flight = self.in_flight
+        done = stats["completed"] + stats["failed"]
+        return {
+            "workers": self.workers,
+            "queue_depth": self.queue_depth,
+            "in_flight": in_flight,
+            "completed": stats["completed"],
+            "failed": stats["failed"],
+            "avg_wait_ms": round(stats["total_wait_ms"] / done, 1) if done else 0.0,
+            "avg_run_ms": round(stats["total_run_ms"] / done, 1) if done else 0.0,
+        }
+
+
+STAGES = {name: StageExecutor(name, workers) for name, workers in STAGE_WORKERS.items()}
+
+STAGE_QUEUE_DEPTH = Gauge(
+    "heritage_stage_queue_depth", "Jobs waiting in each stage thread pool.", ("stage",),
+    callback=lambda: {(name,): stage.queue_depth for name, stage in STAGES.items()}
+)
+
+_admission_stats = {
+    "admitted": 0,
+    "rejected_turn": 0,
+    "rejected_new_session": 0,
+}
+# admit_request 는 동기 엔드포인트(스레드)에서 호출될 수도 있음
+_admission_lock = threading.Lock()
+
+# 단계 스레드 풀 외의 대기열 (예: Whisper 워커 프로세스 엔진)
+_extra_queue_sources = []
+
+
+def run_in_stage(stage: str, fn, *args) -> asyncio.Future:
+    """fn(*args) 를 해당 단계 스레드 풀에서 현재 요청의 우선순위로 실행합니다. (await 가능)"""
+    return STAGES[stage].submit(request_priority.get(), fn, *args)
+
+
+def register_queue_source(fn):
+    """승인 제어 시 함께 고려할 대기열 길이 함수를 등록합니다."""
+    _extra_queue_sources.append(fn)
+
+
+def total_queue_depth() -> int:
+    depth = sum(stage.queue_depth for stage in STAGES.values())
+    return depth + sum(source() for source in _extra_queue_sources)
+
+
+def admit_request(priority: int):
+    """
+    요청 승인 여부를 판단합니다. 거절 시 AdmissionRejectedError 를 발생시킵니다.
+    - 진행 중인 턴: 대기열이 ADMISSION_MAX_QUEUE_TURN 을 넘으면 503
+    - 새 세션: 대기열이 ADMISSION_MAX_QUEUE_NEW_SESSION 을 넘으면 429
+    승인되면 이후 단계 작업은 이 우선순위로 처리됩니다.
+    """
+    depth = total_queue_depth()
+    limit = ADMISSION_MAX_QUEUE_TURN if priority == PRIORITY_TURN else ADMISSION_MAX_QUEUE_NEW_SESSION
+
+    if depth >= limit:
+        # 대기열이 스레드 수만큼 빠진다고 보고 대략적인 대기 시간을 안내
+        workers = sum(stage.workers for stage in STAGES.values())
+        retry_after = max(ADMISSION_RETRY_AFTER_MIN_SECONDS, math.ceil(depth / max(1, workers)))
+
+        if priority == PRIORITY_TURN:
+            counter, status_code, detail = "rejected_turn", 503, "Server is busy. Please retry shortly."
+        else:
+            counter, status_code, detail = "rejected_new_session", 429, "Too many new sessions. Please retry shortly."
+        with _admission_lock:
+            _admission_stats[counter] += 1
+
+        raise AdmissionRejectedError(status_code, detail, retry_after)
+
+    with _admission_lock:
+        _admission_stats["admitted"] += 1
+    request_priority.set(priority)
+
+
+def get_scheduler_stats() -> dict:
+    with _admission_lock:
+        admission = dict(_admission_stats)
+    return {
+        **admission,
+        "queue_depth": total_queue_depth(),
+        "stages": {name: stage.get_stats() for name, stage in STAGES.items()},
+    }
@@ -0,0 +1,162 @@
+import json
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Optional
+
+from services.scheduler import run_in_stage
+
+# 세션 모드에서 GameState를 서버에 보관하는 저장소
+# - "memory": 프로세스 내 딕셔너리 (단일 워커)
+# - "sqlite": 같은 노드의 여러 워커가 공유하는 로컬 파일 DB (공유 저장소 대용)
+SESSION_STORE_BACKEND = "memory"
+SESSION_SQLITE_PATH = "sessions.db"
+SESSION_TTL_SECONDS = 6 * 60 * 60
+
+
+@dataclass
+class SessionRecord:
+    session_id: str
+    version: int
+    state: dict
+
+
+class SessionConflictError(Exception):
+    """클라이언트가 가진 버전과 서버의 버전이 다를 때 발생"""
+
+
+class SessionStore:
+    """저장소 인터페이스. save 는 expected_version 이 일치할 때만 저장합니다. (낙관적 잠금)"""
+
+    async def create(self, state: dict) -> SessionRecord:
+        raise NotImplementedError
+
+    async def load(self, session_id: str) -> Optional[SessionRecord]:
+        raise NotImplementedError
+
+    async def save(self, session_id: str, state: dict, expected_version: int) -> SessionRecord:
+        raise NotImplementedError
+
+    async def delete(self, session_id: str):
+        raise NotImplementedError
+
+
+class InMemorySessionStore(SessionStore):
+    def __init__(self, ttl_seconds: int = SESSION_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._sessions = {}  # session_id -> (version, state, expires_at)
+
+    def _purge_expired(self):
+        now = time.time()
+        expired = [sid for sid, (_, _, expires_at) in self._sessions.items() if expires_at < now]
+        for sid in expired:
+            del self._sessions[sid]
+
+    async def create(self, state: dict) -> SessionRecord:
+        self._purge_expired()
+        session_id = uuid.uuid4().hex
+        self._sessions[session_id] = (0, state, time.time() + self.ttl_seconds)
+        return SessionRecord(session_id, 0, state)
+
+    async def load(self, session_id: str) -> Optional[SessionRecord]:
+        entry = self._sessions.get(session_id)
+        if entry is None or entry[2] < time.time():
+            return None
+        return SessionRecord(session_id, entry[0], entry[1])
+
+    async def save(self, session_id: str, state: dict, expected_version: int) -> SessionRecord:
+        entry = self._sessions.get(session_id)
+        if entry is None or entry[0] != expected_version:
+            raise SessionConflictError(session_id)
+        version = expected_version + 1
+        self._sessions[session_id] = (version, state, time.time() + self.ttl_seconds)
+        return SessionRecord(session_id, version, state)
+
+    async def delete(self, session_id: str):
+        self._sessions.pop(session_id, None)
+
+
+class SqliteSessionStore(SessionStore):
+    def __init__(self, path: str = SESSION_SQLITE_PATH, ttl_seconds: int = SESSION_TTL_SECONDS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, version INTEGER NOT NULL, "
+                "state TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._initialized = True
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connect()
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _blocking_create(self, state: dict) -> SessionRecord:
+        session_id = uuid.uuid4().hex
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM sessions WHERE expires_at < ?", (time.time(),))
+            conn.execute(
+                "INSERT INTO sessions VALUES (?, 0, ?, ?)",
+                (session_id, json.dumps(state, ensure_ascii=False), time.time() + self.ttl_seconds),
+            )
+        return SessionRecord(session_id, 0, state)
+
+    def _blocking_load(self, session_id: str) -> Optional[SessionRecord]:
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT version, state FROM sessions WHERE session_id = ? AND expires_at >= ?",
+                (session_id, time.time()),
+            ).fetchone()
+        if row is None:
+            return None
+        return SessionRecord(session_id, row[0], json.loads(row[1]))
+
+    def _blocking_save(self, session_id: str, state: dict, expected_version: int) -> SessionRecord:
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE sessions SET version = version + 1, state = ?, expires_at = ? "
+                "WHERE session_id = ? AND version = ?",
+                (json.dumps(state, ensure_ascii=False), time.time() + self.ttl_seconds, session_id, expected_version),
+            )
+        if cursor.rowcount != 1:
+            raise SessionConflictError(session_id)
+        return SessionRecord(session_id, expected_version + 1, state)
+
+    def _blocking_delete(self, session_id: str):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    async def create(self, state: dict) -> SessionRecord:
+        return await run_in_stage("io", self._blocking_create, state)
+
+    async def load(self, session_id: str) -> Optional[SessionRecord]:
+        return await run_in_stage("io", self._blocking_load, session_id)
+
+    async def save(self, session_id: str, state: dict, expected_version: int) -> SessionRecord:
+        return await run_in_stage("io", self._blocking_save, session_id, state, expected_version)
+
+    async def delete(self, session_id: str):
+        await run_in_stage("io", self._blocking_delete, session_id)
+
+
+def create_session_store(backend: str = SESSION_STORE_BACKEND) -> SessionStore:
+    if backend == "sqlite":
+        return SqliteSessionStore()
+    return InMemorySessionStore()
+
+
+SESSION_STORE = create_session_store()
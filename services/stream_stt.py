@@ -0,0 +1,139 @@
+import asyncio
+from typing import Callable, Optional
+
+import numpy as np
+
+from services.stt_backends import SttResult
+from services.stt_service import transcribe_audio_result
+from utils.audio_decode import SAMPLE_RATE, Resampler
+from utils.vad import VAD_FRAME_MS, VAD_MIN_DBFS, frame_dbfs
+
+# 스트리밍 업로드 중 구간 단위 전사 설정
+# 말하는 동안 쉼(무음)이 나오면 그 앞 구간을 바로 전사해 두고, 발화가 끝나면 마지막 구간만 전사
+STREAM_SILENCE_MS = 400          # 이만큼 무음이 이어지면 구간을 닫음
+STREAM_MIN_SEGMENT_SEC = 1.0     # 너무 짧은 구간은 닫지 않음 (앞뒤 문맥 부족)
+STREAM_MAX_SEGMENT_SEC = 10.0    # 쉼이 없어도 이 길이가 되면 강제로 닫음
+STREAM_MAX_SECONDS = 60          # 한 턴에 받을 최대 음성 길이
+STREAM_INITIAL_BUFFER_SEC = 4    # 처음 확보할 버퍼 길이 (부족하면 두 배씩 늘림)
+
+
+class StreamingTranscriber:
+    """
+    PCM16 청크를 받아 누적하고, 닫힌 구간은 백그라운드에서 바로 전사합니다.
+    (전사는 기존 transcribe_audio_result 경로 = 같은 Whisper 모델/단계 스레드 풀 또는 워커 엔진)
+    """
+
+    def __init__(self, heritage_name: str = None, keywords: list = (), sample_rate: int = SAMPLE_RATE,
+                 on_partial: Optional[Callable[[str], None]] = None, word_timestamps: bool = False):
+        self.heritage_name = heritage_name
+        self.keywords = list(keywords)
+        self.sample_rate = sample_rate
+        self.on_partial = on_partial
+        self.word_timestamps = word_timestamps
+        # 청크 경계에서도 같은 필터가 이어지도록 리샘플러 상태를 유지
+        self._resampler = Resampler(sample_rate, SAMPLE_RATE) if sample_rate != SAMPLE_RATE else None
+
+        # 미리 확보한 버퍼에 이어 쓰기 (청크마다 전체를 다시 이어 붙이지 않도록)
+        self._buffer = np.zeros(SAMPLE_RATE * STREAM_INITIAL_BUFFER_SEC, dtype=np.float32)
+        self._length = 0
+        self._segment_start = 0      # 아직 전사하지 않은 구간의 시작 (16kHz 샘플 위치)
+        self._scanned = 0            # 무음 검사를 마친 위치
+        self._silence_frames = 0
+        self._segments = []          # [(start, end, task)]
+        self._frame_len = SAMPLE_RATE * VAD_FRAME_MS // 1000
+
+    @property
+    def audio(self) -> np.ndarray:
+        return self._buffer[:self._length]
+
+    @property
+    def duration(self) -> float:
+        return self._length / SAMPLE_RATE
+
+    def feed(self, pcm16: bytes):
+        """PCM16 little-endian mono 청크 추가"""
+        if len(pcm16) % 2:
+            pcm16 = pcm16[:-1]
+        chunk = np.frombuffer(pcm16, dtype="<i2").astype(np.float32) / 32768.0
+        if self._resampler is not None:
+            chunk = self._resampler.process(chunk)
+        self._append(chunk)
+
+    def _append(self, chunk: np.ndarray):
+        if self.duration + len(chunk) / SAMPLE_RATE > STREAM_MAX_SECONDS:
+            raise ValueError(f"Utterance longer than {STREAM_MAX_SECONDS}s")
+
+        end = self._length + len(chunk)
+        if end > len(self._buffer):
+            capacity = min(max(end, len(self._buffer) * 2), SAMPLE_RATE * STREAM_MAX_SECONDS)
+            grown = np.zeros(capacity, dtype=np.float32)
+            grown[:self._length] = self._buffer[:self._length]
+            self._buffer = grown
+        self._buffer[self._length:end] = chunk
+        self._length = end
+        self._scan()
+
+    def _scan(self):
+        """마지막 검사 이후 새로 채워진 프레임만 검사합니다."""
+        end = (self._length // self._frame_len) * self._frame_len
+        if end <= self._scanned:
+            return
+
+        levels = frame_dbfs(self._buffer[self._scanned:end], self._frame_len)
+        for i, level in enumerate(levels):
+            frame_end = self._scanned + (i + 1) * self._frame_len
+            self._silence_frames = self._silence_frames + 1 if level <= VAD_MIN_DBFS else 0
+
+            segment_sec = (frame_end - self._segment_start) / SAMPLE_RATE
+            closed_by_pause = (self._silence_frames * VAD_FRAME_MS >= STREAM_SILENCE_MS
+                               and segment_sec >= STREAM_MIN_SEGMENT_SEC)
+            if closed_by_pause or segment_sec >= STREAM_MAX_SEGMENT_SEC:
+                self._close_segment(frame_end)
+        self._scanned = end
+
+    def _close_segment(self, end: int):
+        start, self._segment_start = self._segment_start, end
+        # 버퍼는 계속 늘어나므로 전사할 구간은 복사해서 넘김
+        segment = self._buffer[start:end].copy()
+        # 구간 전체가 무음이면 전사하지 않음
+        levels = frame_dbfs(segment, self._frame_len)
+        if len(levels) == 0 or (levels <= VAD_MIN_DBFS).all():
+            return
+
+        task = asyncio.create_task(
+            transcribe_audio_result(segment, self.heritage_name, self.keywords, self.word_timestamps)
+        )
+        if self.on_partial is not None:
+            task.add_done_callback(lambda _: self._notify_partial())
+        self._segments.append((start, end, task))
+
+    def _notify_partial(self):
+        done = []
+        for _, _, task in self._segments:
+            if not task.done():
+                break
+            if not task.cancelled() and task.exception() is None:
+                done.append(task.result().text)
+        text = " ".join(t for t in done if t)
+        if text:
+            self.on_partial(text)
+
+    @property
+    def pending_segments(self) -> int:
+        return sum(1 for _, _, task in self._segments if not task.done())
+
+    async def finish(self) -> SttResult:
+        """발화 종료. 남은 구간을 전사하고 전체 전사 결과를 순서대로 이어 붙여 반환합니다."""
+        if self._resampler is not None:
+            tail = self._resampler.process(np.zeros(0, dtype=np.float32), flush=True)
+            self._append(tail[:SAMPLE_RATE * STREAM_MAX_SECONDS - self._length])
+            self._resampler = None
+        if self._length > self._segment_start:
+            self._close_segment(self._length)
+        results = await asyncio.gather(*(task for _, _, task in self._segments), return_exceptions=True)
+        results = [r for r in results if isinstance(r, SttResult) and r.text]
+        return SttResult(" ".join(r.text for r in results).strip(), [s for r in results for s in r.segments])
+
+    def cancel(self):
+        for _, _, task in self._segments:
+            task.cancel()
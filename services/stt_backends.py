@@ -0,0 +1,221 @@
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+# STT 백엔드 선택
+# - "whisper": openai-whisper (PyTorch, fp32 CPU)
+# - "faster_whisper": CTranslate2 기반 Whisper (int8 양자화 CPU 추론, pip install faster-whisper)
+STT_BACKEND = "whisper"
+STT_MODEL_NAME = "base"
+STT_COMPUTE_TYPE = "int8"      # faster_whisper 전용 (int8, int8_float32, float32 ...)
+
+# 디코딩 옵션
+STT_LANGUAGE = "en"            # None 이면 언어 자동 감지 (첫 30초 추가 디코딩 발생)
+STT_BEAM_SIZE = 1              # 1 = greedy, 2 이상 = 빔 서치
+STT_TEMPERATURE = 0.0
+STT_PROMPT_ENABLED = True      # 현재 문화재 이름/키워드를 initial_prompt 로 전달 (고유명사 인식률 향상)
+STT_PROMPT_MAX_CHARS = 200
+
+
+@dataclass(frozen=True)
+class SttOptions:
+    language: Optional[str] = STT_LANGUAGE
+    beam_size: int = STT_BEAM_SIZE
+    temperature: float = STT_TEMPERATURE
+    initial_prompt: Optional[str] = None
+    word_timestamps: bool = False  # 단어별 확률이 필요할 때 (로컬 발음 점수). 배치 디코딩 대신 개별 처리
+
+
+@dataclass
+class SttResult:
+    """
+    전사 텍스트 + 디코딩 신뢰도 (로컬 발음 점수에 사용)
+    segments: [{"text", "avg_logprob", "no_speech_prob", "words": [{"word", "probability"}]}]
+    """
+    text: str = ""
+    segments: list = field(default_factory=list)
+
+
+def _field(obj, name: str, default=None):
+    # openai-whisper 는 dict, faster-whisper 는 객체로 세그먼트/단어를 돌려줌
+    return obj.get(name, default) if isinstance(obj, dict) else getattr(obj, name, default)
+
+
+def segment_info(segment) -> dict:
+    return {
+        "text": _field(segment, "text", ""),
+        "avg_logprob": float(_field(segment, "avg_logprob", 0.0)),
+        "no_speech_prob": float(_field(segment, "no_speech_prob", 0.0)),
+        "words": [
+            {"word": _field(w, "word", ""), "probability": float(_field(w, "probability", 0.0))}
+            for w in _field(segment, "words", None) or []
+        ],
+    }
+
+
+def build_initial_prompt(heritage_name: str, keywords: list) -> Optional[str]:
+    """
+    Whisper initial_prompt 용 어휘 힌트 ("Gyeongbokgung, 1395, King Taejo.")
+    디코더가 앞 문맥으로 보므로 철자가 그대로 나오기 쉬워집니다.
+    """
+    if not STT_PROMPT_ENABLED:
+        return None
+    terms = [t for t in [heritage_name, *keywords] if t]
+    prompt = ", ".join(dict.fromkeys(terms))
+    return (prompt[:STT_PROMPT_MAX_CHARS] + ".") if prompt else None
+
+
+def stt_options(heritage_name: str = None, keywords: list = (), word_timestamps: bool = False) -> SttOptions:
+    return SttOptions(initial_prompt=build_initial_prompt(heritage_name, list(keywords)) if heritage_name else None,
+                      word_timestamps=word_timestamps)
+
+
+class SttBackend:
+    """STT 백엔드 공통 인터페이스. audio 는 파일 경로 또는 16kHz float32 ndarray"""
+    name = ""
+
+    def load(self):
+        raise NotImplementedError
+
+    def transcribe(self, audio, options: SttOptions) -> SttResult:
+        raise NotImplementedError
+
+    def transcribe_batch(self, items: list) -> list:
+        """items: [(audio, SttOptions)] -> [SttResult]. 기본 구현은 하나씩 처리"""
+        results = []
+        for audio, options in items:
+            try:
+                results.append(self.transcribe(audio, options))
+            except Exception as e:
+                print(f"STT Error: {e}")
+                results.append(SttResult())
+        return results
+
+
+class WhisperBackend(SttBackend):
+    name = "whisper"
+
+    def __init__(self, model_name: str = STT_MODEL_NAME, model=None):
+        self.model_name = model_name
+        self.model = model   # 이미 로드된 모델(또는 테스트용 스텁)을 직접 넘길 수 있음
+
+    def load(self):
+        if self.model is None:
+            import whisper
+            self.model = whisper.load_model(self.model_name)
+        return self
+
+    def transcribe(self, audio, options: SttOptions) -> SttResult:
+        result = self.model.transcribe(
+            audio,
+            language=options.language,
+            beam_size=options.beam_size if options.beam_size > 1 else None,
+            temperature=options.temperature,
+            initial_prompt=options.initial_prompt,
+            word_timestamps=options.word_timestamps,
+            condition_on_previous_text=False,
+            fp16=False,
+        )
+        return SttResult(result["text"].strip(), [segment_info(s) for s in result.get("segments", [])])
+
+    def transcribe_batch(self, items: list) -> list:
+        """
+        30초 이하 발화는 같은 디코딩 옵션끼리 패딩한 mel 배치로 한 번에 디코딩하고,
+        긴 발화, 단어별 확률이 필요한 요청(또는 배치 실패)은 개별 transcribe 로 처리합니다.
+        """
+        import torch
+        import whisper
+
+        results = [SttResult() for _ in items]
+        audios = []
+        for audio, _ in items:
+            try:
+                audios.append(whisper.load_audio(audio) if isinstance(audio, str) else audio)
+            except Exception as e:
+                print(f"STT Load Error: {e}")
+                audios.append(None)
+
+        groups, single = {}, []
+        for i, audio in enumerate(audios):
+            if audio is None:
+                continue
+            if len(audio) <= whisper.audio.N_SAMPLES and not items[i][1].word_timestamps:
+                groups.setdefault(items[i][1], []).append(i)
+            else:
+                single.append(i)
+
+        for options, indices in groups.items():
+            try:
+                mel = torch.stack([
+                    whisper.log_mel_spectrogram(whisper.pad_or_trim(audios[i]), n_mels=self.model.dims.n_mels)
+                    for i in indices
+                ]).to(self.model.device)
+                decode_options = whisper.DecodingOptions(
+                    language=options.language,
+                    beam_size=options.beam_size if options.beam_size > 1 else None,
+                    temperature=options.temperature,
+                    prompt=options.initial_prompt,
+                    fp16=False,
+                )
+                for i, result in zip(indices, whisper.decode(self.model, mel, decode_options)):
+                    results[i] = SttResult(result.text.strip(), [segment_info(result)])
+            except Exception as e:
+                print(f"STT Batch Error: {e}")
+                single.extend(indices)
+
+        for i in sorted(single):
+            try:
+                results[i] = self.transcribe(audios[i], items[i][1])
+            except Exception as e:
+                print(f"STT Error: {e}")
+        return results
+
+
+class FasterWhisperBackend(SttBackend):
+    name = "faster_whisper"
+
+    def __init__(self, model_name: str = STT_MODEL_NAME, compute_type: str = STT_COMPUTE_TYPE,
+                 cpu_threads: int = 0):
+        self.model_name = model_name
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.model = None
+
+    def load(self):
+        if self.model is None:
+            from faster_whisper import WhisperModel
+            self.model = WhisperModel(self.model_name, device="cpu", compute_type=self.compute_type,
+                                      cpu_threads=self.cpu_threads)
+        return self
+
+    def transcribe(self, audio, options: SttOptions) -> SttResult:
+        segments, _ = self.model.transcribe(
+            audio,
+            language=options.language,
+            beam_size=max(1, options.beam_size),
+            temperature=options.temperature,
+            initial_prompt=options.initial_prompt,
+            word_timestamps=options.word_timestamps,
+            condition_on_previous_text=False,
+        )
+        segments = [segment_info(segment) for segment in segments]
+        return SttResult("".join(segment["text"] for segment in segments).strip(), segments)
+
+
+STT_BACKENDS = {
+    WhisperBackend.name: WhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+}
+
+
+def create_stt_backend(name: str = STT_BACKEND, model_name: str = STT_MODEL_NAME, **kwargs) -> SttBackend:
+    if name not in STT_BACKENDS:
+        raise ValueError(f"Unknown STT backend: {name} (available: {', '.join(STT_BACKENDS)})")
+    return STT_BACKENDS[name](model_name, **kwargs)
+
+
+def load_stt_backend(name: str = STT_BACKEND, model_name: str = STT_MODEL_NAME, **kwargs) -> SttBackend:
+    started = time.perf_counter()
+    backend = create_stt_backend(name, model_name, **kwargs).load()
+    print(f"[STT] Loaded {name} backend (model={model_name}) in {time.perf_counter() - started:.1f}s")
+    return backend
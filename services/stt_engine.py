@@ -0,0 +1,223 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from services.scheduler import register_queue_source
+from services.stt_backends import STT_BACKEND, STT_MODEL_NAME, SttOptions, SttResult, load_stt_backend
+from utils.metrics import count_error
+
+# Whisper 전용 워커 프로세스 설정
+# - 워커마다 자신의 모델을 갖고 있으므로 GIL/모델 공유 문제 없이 CPU 코어를 나눠 씀
+# - 0이면 엔진을 사용하지 않고 기존 방식("stt" 단계 스레드 풀 + 전역 모델)으로 동작
+STT_WORKER_PROCESSES = 0
+
+# 동시에 들어온 발화를 묶어 한 번에 디코딩 (마이크로 배치)
+STT_BATCH_WINDOW_MS = 30
+STT_MAX_BATCH_SIZE = 8
+
+
+class SttEngineStoppedError(RuntimeError):
+    """엔진이 종료되어 처리하지 못한 요청"""
+
+
+# =================================================================
+# [1] 워커 프로세스 쪽 코드
+# =================================================================
+_worker_backend = None
+
+
+def _init_worker(backend_name: str, model_name: str, torch_threads: int):
+    global _worker_backend
+    import torch
+
+    # 워커끼리 코어를 나눠 쓰도록 스레드 수 제한
+    torch.set_num_threads(max(1, torch_threads))
+    kwargs = {"cpu_threads": torch_threads} if backend_name == "faster_whisper" else {}
+    _worker_backend = load_stt_backend(backend_name, model_name, **kwargs)
+
+
+def _transcribe_batch(items: list) -> tuple:
+    """
+    워커 프로세스에서 실행. items는 (파일 경로 또는 16kHz float32 ndarray, SttOptions) 목록입니다.
+    반환값: (SttResult 목록, 처리 시간(초))
+    """
+    started = time.perf_counter()
+    results = _worker_backend.transcribe_batch(items)
+    return results, time.perf_counter() - started
+
+
+# =================================================================
+# [2] 이벤트 루프 쪽 디스패처
+# =================================================================
+class SttEngine:
+    def __init__(self, workers: int, backend_name: str, model_name: str, batch_window_ms: int, max_batch_size: int):
+        self.workers = workers
+        self.backend_name = backend_name
+        self.model_name = model_name
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch_size = max_batch_size
+
+        self._queue: asyncio.Queue = None
+        self._pool: ProcessPoolExecutor = None
+        self._slots: asyncio.Semaphore = None
+        self._dispatcher: asyncio.Task = None
+        self._batch_tasks = set()
+
+        self.stats = {
+            "requests": 0,
+            "batches": 0,
+            "batched_items": 0,
+            "in_flight_batches": 0,
+            "last_batch_size": 0,
+            "last_batch_ms": 0.0,
+            "total_batch_ms": 0.0,
+            "max_batch_ms": 0.0,
+            "pool_restarts": 0,
+        }
+
+    def _create_pool(self) -> ProcessPoolExecutor:
+        torch_threads = (os.cpu_count() or 1) // self.workers
+        # torch 스레드 상태가 fork로 복제되지 않도록 spawn 사용
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.backend_name, self.model_name, torch_threads),
+        )
+
+    def _restart_pool(self, broken: ProcessPoolExecutor):
+        """워커가 죽으면(BrokenProcessPool) 풀 전체를 쓸 수 없으므로 새로 만듦 (동시에 실패한 배치는 한 번만)"""
+        if self._pool is not broken or self._dispatcher is None:
+            return
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._pool = self._create_pool()
+        self.stats["pool_restarts"] += 1
+        print(f"[SttEngine] Worker pool broken. Restarted ({self.stats['pool_restarts']})")
+
+    def start(self):
+        if self._dispatcher is not None:
+            return
+
+        self._pool = self._create_pool()
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.workers)
+        self._dispatcher = asyncio.create_task(self._dispatch_loop())
+        print(f"[SttEngine] Started {self.workers} workers ({self.backend_name}, model={self.model_name})")
+
+    async def stop(self):
+        """종료. 대기열에 남은 요청과 처리 중인 배치는 SttEngineStoppedError 로 끝냄"""
+        if self._dispatcher is None:
+            return
+        self._dispatcher.cancel()
+        self._dispatcher = None
+        for task in list(self._batch_tasks):
+            task.cancel()
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(SttEngineStoppedError("STT engine stopped"))
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    async def transcribe(self, audio, options: SttOptions = None) -> SttResult:
+        self.start()
+        self.stats["requests"] += 1
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(((audio, options or SttOptions()), future))
+        return await future
+
+    async def _collect_batch(self) -> list:
+        """첫 요청이 들어온 뒤 batch_window 동안 (최대 max_batch_size개) 추가 요청을 모읍니다."""
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.batch_window
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _dispatch_loop(self):
+        while True:
+            # 빈 워커가 생길 때까지 기다린 뒤 배치를 모음 (기다리는 동안 큐에 요청이 더 쌓임)
+            await self._slots.acquire()
+            try:
+                batch = await self._collect_batch()
+            except asyncio.CancelledError:
+                self._slots.release()
+                raise
+            task = asyncio.create_task(self._run_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _submit_batch(self, items: list) -> tuple:
+        """워커 풀에서 배치 실행. 풀이 깨져 있으면 새로 만든 뒤 한 번만 다시 시도"""
+        loop = asyncio.get_running_loop()
+        pool = self._pool
+        try:
+            return await loop.run_in_executor(pool, _transcribe_batch, items)
+        except BrokenProcessPool as e:
+            print(f"STT Engine Error: {e!r}. Retrying on a new worker pool")
+            count_error("stt")
+            self._restart_pool(pool)
+            return await loop.run_in_executor(self._pool, _transcribe_batch, items)
+
+    async def _run_batch(self, batch: list):
+        self.stats["in_flight_batches"] += 1
+        try:
+            results, elapsed = await self._submit_batch([a for a, _ in batch])
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+            batch_ms = elapsed * 1000
+            self.stats["batches"] += 1
+            self.stats["batched_items"] += len(batch)
+            self.stats["last_batch_size"] = len(batch)
+            self.stats["last_batch_ms"] = round(batch_ms, 1)
+            self.stats["total_batch_ms"] += batch_ms
+            self.stats["max_batch_ms"] = round(max(self.stats["max_batch_ms"], batch_ms), 1)
+        except asyncio.CancelledError:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(SttEngineStoppedError("STT engine stopped"))
+            raise
+        except Exception as e:
+            print(f"STT Engine Error: {e}")
+            count_error("stt")
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(SttResult())
+        finally:
+            self.stats["in_flight_batches"] -= 1
+            self._slots.release()
+
+    def get_stats(self) -> dict:
+        batches = self.stats["batches"]
+        return {
+            **self.stats,
+            "workers": self.workers,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "avg_batch_size": round(self.stats["batched_items"] / batches, 2) if batches else 0.0,
+            "avg_batch_ms": round(self.stats["total_batch_ms"] / batches, 1) if batches else 0.0,
+        }
+
+
+STT_ENGINE = SttEngine(STT_WORKER_PROCESSES, STT_BACKEND, STT_MODEL_NAME, STT_BATCH_WINDOW_MS, STT_MAX_BATCH_SIZE) \
+    if STT_WORKER_PROCESSES > 0 else None
+
+if STT_ENGINE is not None:
+    # 워커 프로세스 대기열도 승인 제어 기준에 포함
+    register_queue_source(lambda: STT_ENGINE._queue.qsize() if STT_ENGINE._queue is not None else 0)
+
+
+def get_stt_engine_stats() -> dict:
+    if STT_ENGINE is None:
+        return {"enabled": False}
+    return {"enabled": True, **STT_ENGINE.get_stats()}
@@ -1,27 +1,66 @@
-import whisper
-import asyncio
+import threading
 
-# 서버 시작 시 모델 로드 (CPU 부하를 줄이기 위해 1회만 실행)
-try:
-    WHISPER_MODEL = whisper.load_model("base")
-except Exception as e:
-    print(f"CRITICAL: Whisper Model failed to load. {e}")
-    WHISPER_MODEL = None
+from services.scheduler import run_in_stage
+from services.stt_backends import (STT_BACKEND, STT_MODEL_NAME, SttOptions, SttResult, WhisperBackend,
+                                   load_stt_backend, stt_options)
+from services.stt_engine import STT_ENGINE
+from utils.metrics import span, count_error
+
+# 모델은 import 시점이 아니라 load_stt_model() 에서 1회 로드 (서버 시작 시 또는 첫 요청 시)
+# 워커 프로세스 엔진을 사용하는 경우 모델은 각 워커가 로드하므로 여기서는 로드하지 않음
+STT_MODEL = None
+_load_lock = threading.Lock()
+_load_failed = False
+
+
+def set_whisper_model(model):
+    """테스트/벤치마크에서 Whisper 모델을 스텁(utils.fake_whisper)으로 교체할 때 사용"""
+    global STT_MODEL
+    STT_MODEL = WhisperBackend(model=model)
+
+
+def load_stt_model() -> bool:
+    """모델 로드 (블로킹, 여러 번 호출해도 1회만 로드). 실패하면 이후 요청은 빈 전사 결과"""
+    global STT_MODEL, _load_failed
+    if STT_ENGINE is not None or STT_MODEL is not None:
+        return True
+    with _load_lock:
+        if STT_MODEL is None and not _load_failed:
+            try:
+                STT_MODEL = load_stt_backend(STT_BACKEND, STT_MODEL_NAME)
+            except Exception as e:
+                print(f"CRITICAL: STT Model ({STT_BACKEND}) failed to load. {e}")
+                _load_failed = True
+    return STT_MODEL is not None
 
 
 # STT 처리는 시간이 걸리는 블로킹 작업이므로, 비동기로 실행될 수 있도록 함수 정의
-def blocking_transcribe(audio_path: str) -> str:
-    if WHISPER_MODEL is None:
-        return ""
+# audio는 파일 경로 또는 16kHz float32 PCM 배열 (utils.audio_decode.decode_audio_bytes 결과)
+def blocking_transcribe(audio, options: SttOptions = None) -> SttResult:
+    if not load_stt_model():
+        return SttResult()
 
     try:
         # 실제 Whisper API/모델 호출
-        result = WHISPER_MODEL.transcribe(audio_path)
-        return result["text"].strip()
+        return STT_MODEL.transcribe(audio, options or SttOptions())
     except Exception as e:
         print(f"STT Error: {e}")
-        return ""
+        count_error("stt")
+        return SttResult()
+
+
+@span("stt")
+async def transcribe_audio_result(audio, heritage_name: str = None, keywords: list = (),
+                                  word_timestamps: bool = False) -> SttResult:
+    """
+    heritage_name/keywords 를 주면 initial_prompt 로 넘겨 고유명사 인식을 돕습니다.
+    word_timestamps=True 이면 단어별 확률까지 받아옵니다. (로컬 발음 점수용, 디코딩 비용 증가)
+    """
+    options = stt_options(heritage_name, keywords, word_timestamps)
+    if STT_ENGINE is not None:
+        return await STT_ENGINE.transcribe(audio, options)
+    return await run_in_stage("stt", blocking_transcribe, audio, options)
 
 
-async def transcribe_audio(audio_path: str) -> str:
-    return await asyncio.to_thread(blocking_transcribe, audio_path)
\ No newline at end of file
+async def transcribe_audio(audio, heritage_name: str = None, keywords: list = ()) -> str:
+    return (await transcribe_audio_result(audio, heritage_name, keywords)).text
@@ -0,0 +1,162 @@
+import asyncio
+import io
+import multiprocessing
+import subprocess
+import wave
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+# NPC 음성 출력 형식
+# - "mp3": 기존 형식 (gTTS 결과 그대로, 변환 없음)
+# - "opus": Ogg Opus (같은 음질에서 MP3보다 작음, 모든 합성 결과를 ffmpeg로 변환)
+TTS_OUTPUT_FORMAT = "mp3"
+TTS_MP3_BITRATE = "32k"
+TTS_OPUS_BITRATE = "24k"
+
+# 오프라인 합성 엔진 ("espeak": espeak-ng CLI, "piper": piper-tts 음성 모델)
+TTS_LOCAL_ENGINE = "espeak"
+TTS_LOCAL_PROCESSES = 2
+TTS_ESPEAK_VOICES = {"en": "en-us", "ko": "ko"}
+TTS_ESPEAK_SPEED = 160                         # 분당 단어 수
+TTS_PIPER_MODEL_PATH = "assets/piper/en_US-lessac-medium.onnx"
+
+
+@dataclass(frozen=True)
+class TtsFormat:
+    name: str
+    suffix: str
+    media_type: str
+    ffmpeg_args: tuple
+
+
+TTS_FORMATS = {
+    "mp3": TtsFormat("mp3", ".mp3", "audio/mpeg", ("-f", "mp3", "-acodec", "libmp3lame", "-b:a", TTS_MP3_BITRATE)),
+    "opus": TtsFormat("opus", ".opus", "audio/ogg",
+                      ("-f", "ogg", "-acodec", "libopus", "-b:a", TTS_OPUS_BITRATE, "-application", "voip")),
+}
+
+
+def output_format() -> TtsFormat:
+    return TTS_FORMATS[TTS_OUTPUT_FORMAT]
+
+
+def transcode(data: bytes, fmt: str) -> bytes:
+    """
+    ffmpeg 로 출력 형식에 맞게 변환합니다. (stdin/stdout, 임시 파일 없음)
+    문장별 결과를 이어 붙여 재생하므로 MP3 는 프레임, Opus 는 Ogg 스트림 단위로 연결됩니다.
+    """
+    cmd = ["ffmpeg", "-nostdin", "-loglevel", "error", "-i", "pipe:0", "-ac", "1",
+           *TTS_FORMATS[fmt].ffmpeg_args, "pipe:1"]
+    return subprocess.run(cmd, input=data, capture_output=True, check=True).stdout
+
+
+# =================================================================
+# [1] 합성 엔진
+# =================================================================
+class TtsBackend:
+    """합성 엔진 공통 인터페이스. native_format 형식의 바이트를 반환 (변환은 호출하는 쪽에서)"""
+    name = ""
+    native_format = ""
+
+    def load(self):
+        return self
+
+    def synthesize(self, text: str, lang: str) -> bytes:
+        raise NotImplementedError
+
+    def synthesize_as(self, text: str, lang: str, fmt: str) -> bytes:
+        data = self.synthesize(text, lang)
+        if not data or fmt == self.native_format:
+            return data
+        return transcode(data, fmt)
+
+
+class GttsBackend(TtsBackend):
+    name = "gtts"
+    native_format = "mp3"
+
+    def synthesize(self, text: str, lang: str) -> bytes:
+        from gtts import gTTS
+
+        mp3_fp = io.BytesIO()
+        gTTS(text=text, lang=lang).write_to_fp(mp3_fp)
+        return mp3_fp.getvalue()
+
+
+class EspeakBackend(TtsBackend):
+    name = "espeak"
+    native_format = "wav"
+
+    def synthesize(self, text: str, lang: str) -> bytes:
+        cmd = ["espeak-ng", "-v", TTS_ESPEAK_VOICES.get(lang, lang), "-s", str(TTS_ESPEAK_SPEED), "--stdout", text]
+        return subprocess.run(cmd, capture_output=True, check=True).stdout
+
+
+class PiperBackend(TtsBackend):
+    name = "piper"
+    native_format = "wav"
+
+    def __init__(self, model_path: str = TTS_PIPER_MODEL_PATH):
+        self.model_path = model_path
+        self.voice = None
+
+    def load(self):
+        if self.voice is None:
+            from piper import PiperVoice
+            self.voice = PiperVoice.load(self.model_path)
+        return self
+
+    def synthesize(self, text: str, lang: str) -> bytes:
+        wav_fp = io.BytesIO()
+        with wave.open(wav_fp, "wb") as wav_file:
+            self.voice.synthesize(text, wav_file)
+        return wav_fp.getvalue()
+
+
+LOCAL_TTS_ENGINES = {
+    EspeakBackend.name: EspeakBackend,
+    PiperBackend.name: PiperBackend,
+}
+
+
+# =================================================================
+# [2] 오프라인 엔진 워커 프로세스 (음성 모델을 워커마다 1회 로드, GIL 과 분리)
+# =================================================================
+_worker_backend: TtsBackend = None
+
+
+def _init_worker(engine: str):
+    global _worker_backend
+    _worker_backend = LOCAL_TTS_ENGINES[engine]().load()
+
+
+def _synthesize_in_worker(text: str, lang: str, fmt: str) -> bytes:
+    return _worker_backend.synthesize_as(text, lang, fmt)
+
+
+class LocalTtsPool:
+    def __init__(self, engine: str = TTS_LOCAL_ENGINE, processes: int = TTS_LOCAL_PROCESSES):
+        if engine not in LOCAL_TTS_ENGINES:
+            raise ValueError(f"Unknown local TTS engine: {engine} (available: {', '.join(LOCAL_TTS_ENGINES)})")
+        self.engine = engine
+        self.processes = processes
+        self._pool: ProcessPoolExecutor = None
+
+    def start(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.engine,),
+            )
+            print(f"[LocalTTS] Started {self.processes} workers ({self.engine})")
+
+    def stop(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def synthesize(self, text: str, lang: str, fmt: str) -> bytes:
+        self.start()
+        return await asyncio.get_running_loop().run_in_executor(self._pool, _synthesize_in_worker, text, lang, fmt)
@@ -1,27 +1,256 @@
-from gtts import gTTS
 import asyncio
-import io
+import contextvars
+import re
 import base64
 
+from services import tts_backends
+from services.scheduler import run_in_stage
+from services.tts_backends import GttsBackend, LocalTtsPool, output_format
+from utils.audio_cache import AudioCache, audio_cache_key
+from utils.metrics import span, count_error
 
-def blocking_generate_mp3_bytes(text: str) -> bytes:
+# TTS 백엔드
+# - "gtts": 기존 방식 (문장마다 gTTS HTTP 호출)
+# - "local": 오프라인 엔진만 사용 (tts_backends.TTS_LOCAL_ENGINE, 워커 프로세스 풀)
+# - "hedged": gTTS 를 먼저 요청하고, TTS_HEDGE_AFTER_MS 안에 답이 없거나 실패하면 오프라인 엔진도 시작해
+#             먼저 끝난 결과를 사용 (늦게 도착한 gTTS 결과는 캐시에만 저장하여 다음부터 사용)
+TTS_BACKEND = "gtts"
+TTS_HEDGE_AFTER_MS = 800
+
+# TTS 결과 캐시 설정 (메모리 LRU + 디스크 내용 주소 저장소)
+TTS_CACHE_ENABLED = True
+TTS_CACHE_DIR = "cache/tts"
+TTS_CACHE_MAX_MEMORY_BYTES = 32 * 1024 * 1024
+
+TTS_CACHE = AudioCache(TTS_CACHE_DIR, TTS_CACHE_MAX_MEMORY_BYTES, suffix=output_format().suffix)
+
+# gTTS / 오프라인 엔진 대신 사용할 합성 함수 (text, lang) -> 출력 형식 bytes. 테스트/벤치마크용 (utils.fake_tts)
+TTS_SYNTHESIZER = None
+LOCAL_TTS_SYNTHESIZER = None
+
+GTTS_BACKEND = GttsBackend()
+LOCAL_TTS_POOL = LocalTtsPool()
+
+# 헤지에서 오프라인 음성으로 대체된 문장을 기록할 리스트 (audio_store 가 리소스 단위로 설정)
+_fallback_sentences: contextvars.ContextVar = contextvars.ContextVar("tts_fallback_sentences", default=None)
+
+_stats = {
+    "primary": 0,
+    "local": 0,
+    "hedged": 0,
+    "hedge_local_wins": 0,
+    "late_primary_cached": 0,
+    "failures": 0,
+}
+
+# 문장 단위 분리 (". ", "! ", "? " 뒤에서 자름)
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+
+
+def split_sentences(text: str) -> list:
+    """
+    합성된 NPC 응답("Exactly! Who built it?")을 문장 단위로 나눕니다.
+    고정 문장("Could you say that again?")은 캐시에서 재사용하고 새 문장만 합성하기 위함입니다.
+    """
+    return [s for s in (part.strip() for part in _SENTENCE_SPLIT.split(text or "")) if s]
+
+
+def set_tts_synthesizer(synthesizer):
+    """테스트/벤치마크에서 gTTS 를 스텁으로 교체할 때 사용 (None 이면 gTTS)"""
+    global TTS_SYNTHESIZER
+    TTS_SYNTHESIZER = synthesizer
+
+
+def set_local_tts_synthesizer(synthesizer):
+    """테스트/벤치마크에서 오프라인 엔진(워커 프로세스 풀)을 스텁으로 교체할 때 사용"""
+    global LOCAL_TTS_SYNTHESIZER
+    LOCAL_TTS_SYNTHESIZER = synthesizer
+
+
+def tts_variant(voice: str) -> str:
+    """캐시 키/audio_id 구분값. gTTS MP3 는 기존 키("")를 그대로 사용"""
+    fmt = output_format().name
+    return "" if voice == "gtts" and fmt == "mp3" else f"{voice}/{fmt}"
+
+
+def primary_voice() -> str:
+    return tts_backends.TTS_LOCAL_ENGINE if TTS_BACKEND == "local" else "gtts"
+
+
+def tts_media_type() -> str:
+    return output_format().media_type
+
+
+def blocking_generate_mp3_bytes(text: str, lang: str = "en") -> bytes:
+    """gTTS MP3 (출력 형식과 무관, 사전 생성 번들용)"""
     if not text:
         return b""  # 텍스트가 없으면 빈 바이트 반환
 
     try:
-        tts = gTTS(text=text, lang='en')
-        mp3_fp = io.BytesIO()
-        tts.write_to_fp(mp3_fp)
-        mp3_fp.seek(0)
-        return mp3_fp.read()
+        if TTS_SYNTHESIZER is not None:
+            return TTS_SYNTHESIZER(text, lang)
+        return GTTS_BACKEND.synthesize(text, lang)
     except Exception as e:
         print(f"gTTS Error: {e}")
+        count_error("tts")
         return b""  # 오류 발생 시 빈 바이트 반환
 
 
-async def get_mp3_base64(text: str) -> str:
-    mp3_bytes = await asyncio.to_thread(blocking_generate_mp3_bytes, text)
+def blocking_generate_audio_bytes(text: str, lang: str = "en") -> bytes:
+    """gTTS 결과를 출력 형식으로 (MP3 면 변환 없음)"""
+    if not text:
+        return b""
+
+    try:
+        if TTS_SYNTHESIZER is not None:
+            return TTS_SYNTHESIZER(text, lang)
+        return GTTS_BACKEND.synthesize_as(text, lang, output_format().name)
+    except Exception as e:
+        print(f"gTTS Error: {e}")
+        count_error("tts")
+        return b""
+
+
+async def generate_local_audio_bytes(text: str, lang: str = "en") -> bytes:
+    """오프라인 엔진 합성 (출력 형식). 실패 시 빈 바이트"""
+    if not text:
+        return b""
+
+    try:
+        if LOCAL_TTS_SYNTHESIZER is not None:
+            # gTTS 와 같은 단계를 쓰면 헤징 대상(느린 gTTS 호출) 뒤에 줄을 서게 되므로 별도 단계
+            return await run_in_stage("tts_local", LOCAL_TTS_SYNTHESIZER, text, lang)
+        return await LOCAL_TTS_POOL.synthesize(text, lang, output_format().name)
+    except Exception as e:
+        print(f"Local TTS Error: {e!r}")
+        count_error("tts")
+        return b""
+
+
+async def _cache_put(key: str, data: bytes):
+    if TTS_CACHE_ENABLED and data:
+        await run_in_stage("io", TTS_CACHE.put, key, data)
+
+
+def _cache_late_primary(primary: asyncio.Future, key: str):
+    """오프라인 엔진이 먼저 끝난 경우, 나중에 도착한 gTTS 결과를 캐시에 저장 (다음 요청부터 사용)"""
+    def on_done(future):
+        if not future.cancelled() and future.exception() is None and future.result():
+            _stats["late_primary_cached"] += 1
+            asyncio.ensure_future(_cache_put(key, future.result()))
+
+    primary.add_done_callback(on_done)
+
+
+async def synthesize_sentence(sentence: str, lang: str, key: str) -> bytes:
+    """TTS_BACKEND 에 따라 한 문장을 합성합니다. (출력 형식 bytes, 실패 시 빈 바이트)"""
+    if TTS_BACKEND == "local":
+        _stats["local"] += 1
+        data = await generate_local_audio_bytes(sentence, lang)
+        await _cache_put(key, data)
+        return data
+
+    _stats["primary"] += 1
+    primary = run_in_stage("tts", blocking_generate_audio_bytes, sentence, lang)
+    if TTS_BACKEND != "hedged":
+        data = await primary
+        await _cache_put(key, data)
+        return data
+
+    # 예산 안에 gTTS 가 성공하면 그대로 사용
+    done, _ = await asyncio.wait({primary}, timeout=TTS_HEDGE_AFTER_MS / 1000)
+    if done and primary.result():
+        await _cache_put(key, primary.result())
+        return primary.result()
+
+    # 늦거나 실패 → 오프라인 엔진을 함께 시작하고 먼저 성공한 결과를 사용
+    _stats["hedged"] += 1
+    local = asyncio.ensure_future(generate_local_audio_bytes(sentence, lang))
+    pending = {local} if done else {primary, local}
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        if primary in done and primary.result():
+            local.cancel()
+            await _cache_put(key, primary.result())
+            return primary.result()
+        if local in done and local.result():
+            _stats["hedge_local_wins"] += 1
+            fallbacks = _fallback_sentences.get()
+            if fallbacks is not None:
+                fallbacks.append(sentence)
+            # 오프라인 음성은 gTTS 키로 저장하지 않음 (다음 요청은 캐시된 gTTS 또는 다시 gTTS 시도)
+            if not primary.done():
+                _cache_late_primary(primary, key)
+            return local.result()
+
+    _stats["failures"] += 1
+    return b""
+
+
+def begin_fallback_tracking() -> list:
+    """
+    이후 (같은 컨텍스트에서 시작된) 합성 중 헤지로 오프라인 음성을 사용한 문장이 반환된 리스트에 기록됩니다.
+    그런 음성은 요청한 음성 엔진(audio_id/캐시 키)의 결과가 아니므로 캐시하면 안 됨
+    """
+    fallbacks = []
+    _fallback_sentences.set(fallbacks)
+    return fallbacks
+
+
+async def get_sentence_mp3_bytes(sentence: str, lang: str = "en") -> bytes:
+    """
+    한 문장의 음성(출력 형식, 기본 MP3)을 캐시에서 가져오거나, 없으면 합성 후 캐시에 저장합니다.
+    캐시 키에는 음성 엔진/출력 형식이 포함됩니다.
+    """
+    key = audio_cache_key(sentence, lang, tts_variant(primary_voice()))
+    if TTS_CACHE_ENABLED:
+        cached = await run_in_stage("io", TTS_CACHE.get, key)
+        if cached is not None:
+            return cached
+
+    return await synthesize_sentence(sentence, lang, key)
+
+
+async def iter_mp3_chunks(text: str, lang: str = "en", skip_empty: bool = True):
+    """
+    문장별 음성(출력 형식)을 순서대로 내보냅니다. 모든 문장의 합성은 동시에 시작하고,
+    앞 문장이 준비되는 대로 바로 전달하므로 스트리밍 재생에 사용할 수 있습니다.
+    skip_empty=False 면 합성에 실패한 문장도 빈 바이트로 내보냅니다. (누락 여부 확인용)
+    """
+    tasks = [asyncio.create_task(get_sentence_mp3_bytes(s, lang)) for s in split_sentences(text)]
+    try:
+        for task in tasks:
+            chunk = await task
+            if chunk or not skip_empty:
+                yield chunk
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+@span("tts")
+async def get_mp3_bytes(text: str, lang: str = "en") -> bytes:
+    # MP3 프레임 / Ogg Opus 스트림은 이어 붙여도 재생 가능하므로 문장별 결과를 순서대로 연결
+    return b"".join([chunk async for chunk in iter_mp3_chunks(text, lang)])
+
+
+async def get_mp3_base64(text: str, lang: str = "en") -> str:
+    mp3_bytes = await get_mp3_bytes(text, lang)
     if not mp3_bytes:
         return ""
 
-    return base64.b64encode(mp3_bytes).decode("utf-8")
\ No newline at end of file
+    return base64.b64encode(mp3_bytes).decode("utf-8")
+
+
+def get_tts_cache_stats() -> dict:
+    return {"enabled": TTS_CACHE_ENABLED, **TTS_CACHE.get_stats()}
+
+
+def get_tts_stats() -> dict:
+    return {
+        "backend": TTS_BACKEND,
+        "format": output_format().name,
+        "local_engine": tts_backends.TTS_LOCAL_ENGINE,
+        "hedge_after_ms": TTS_HEDGE_AFTER_MS,
+        **_stats,
+    }
@@ -0,0 +1,63 @@
+import io
+import wave
+
+import numpy as np
+import pytest
+
+from utils.audio_decode import SAMPLE_RATE, Resampler, _decode_wav, is_supported_sample_rate, resample
+
+
+def _wav_bytes(rate: int, samples: int = 1600) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(rate)
+        wav_file.writeframes(np.zeros(samples, dtype="<i2").tobytes())
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("rate, expected", [
+    (16000, True),
+    (44100, True),
+    (999983, False),
+    (0, False),
+    (-16000, False),
+    (16000.0, False),
+    ("16000", False),
+    (True, False),
+])
+def test_is_supported_sample_rate(rate, expected):
+    assert is_supported_sample_rate(rate) is expected
+
+
+@pytest.mark.parametrize("src, dst", [(999983, SAMPLE_RATE), (SAMPLE_RATE, 999983), (16001, 16000)])
+def test_resampler_rejects_unsupported_rates(src, dst):
+    with pytest.raises(ValueError):
+        Resampler(src, dst)
+    with pytest.raises(ValueError):
+        resample(np.zeros(10, dtype=np.float32), src, dst)
+
+
+def test_decode_wav_rejects_unsupported_rate_before_reading_frames():
+    with pytest.raises(ValueError, match="sample rate"):
+        _decode_wav(_wav_bytes(999983))
+
+
+def test_decode_wav_resamples_to_model_rate():
+    audio = _decode_wav(_wav_bytes(48000, samples=4800))
+    assert audio.dtype == np.float32
+    assert abs(len(audio) - SAMPLE_RATE // 10) <= 1
+
+
+def test_streaming_resampler_matches_one_shot():
+    signal = np.sin(np.linspace(0, 200 * np.pi, 44100)).astype(np.float32)
+    expected = resample(signal, 44100, SAMPLE_RATE)
+
+    resampler = Resampler(44100, SAMPLE_RATE)
+    chunks = [resampler.process(part) for part in np.array_split(signal, 7)]
+    chunks.append(resampler.process(np.zeros(0, dtype=np.float32), flush=True))
+    streamed = np.concatenate(chunks)
+
+    assert len(streamed) == len(expected)
+    assert np.allclose(streamed, expected, atol=1e-5)
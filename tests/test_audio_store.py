@@ -0,0 +1,68 @@
+import asyncio
+import time
+
+import pytest
+
+from services import tts_service
+from services.audio_store import get_audio_entry, parse_range, publish_audio
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("", None),
+    ("items=0-1", None),
+    ("bytes=0-99", (0, 99)),
+    ("bytes=10-", (10, 99)),
+    ("bytes=50-1000", (50, 99)),   # 끝이 크기를 넘으면 마지막 바이트까지
+    ("bytes=-30", (70, 99)),
+    ("bytes=-500", (0, 99)),       # 접미사 길이가 크기보다 크면 전체
+    ("bytes=0-9, 20-29", (0, 9)),  # 여러 구간은 첫 구간만
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 100) == expected
+
+
+@pytest.mark.parametrize("header, size", [
+    ("bytes=100-", 100),    # 시작이 크기 이상
+    ("bytes=100-200", 100),
+    ("bytes=20-10", 100),   # 시작 > 끝
+    ("bytes=-0", 100),      # 길이 0인 접미사
+    ("bytes=0-0", 0),       # 빈 응답에는 만족 가능한 구간이 없음
+    ("bytes=abc-", 100),
+    ("bytes=-", 100),
+])
+def test_unsatisfiable_range_raises(header, size):
+    # /audio 는 ValueError 를 416 으로 응답
+    with pytest.raises(ValueError):
+        parse_range(header, size)
+
+
+def test_hedge_fallback_audio_is_not_cacheable(monkeypatch):
+    monkeypatch.setattr(tts_service, "TTS_BACKEND", "hedged")
+    monkeypatch.setattr(tts_service, "TTS_HEDGE_AFTER_MS", 20)
+    monkeypatch.setattr(tts_service, "TTS_CACHE_ENABLED", False)
+    gtts_delay = {"seconds": 0.3}
+
+    def slow_gtts(text, lang):
+        time.sleep(gtts_delay["seconds"])
+        return b"G" + text.encode()
+
+    monkeypatch.setattr(tts_service, "TTS_SYNTHESIZER", slow_gtts)
+    monkeypatch.setattr(tts_service, "LOCAL_TTS_SYNTHESIZER", lambda text, lang: b"L" + text.encode())
+
+    async def scenario():
+        audio_id = publish_audio("Hedge test. Who built it?")
+        entry = get_audio_entry(audio_id)
+        assert await entry.wait_finished() == b"LHedge test.LWho built it?"
+        # 오프라인 음성이 gTTS audio_id 로 캐시(ETag)되면 안 됨
+        assert entry.fallback and not entry.complete
+
+        # 다음 요청은 같은 audio_id 로 다시 합성
+        gtts_delay["seconds"] = 0.0
+        assert publish_audio("Hedge test. Who built it?") == audio_id
+        retry = get_audio_entry(audio_id)
+        assert retry is not entry
+        assert await retry.wait_finished() == b"GHedge test.GWho built it?"
+        assert retry.complete
+
+    asyncio.run(scenario())
@@ -0,0 +1,22 @@
+import asyncio
+import time
+
+from services.azure_service import AzurePronunciationClient
+from utils import fake_speechsdk
+
+
+def test_waiting_for_a_slot_counts_towards_the_timeout(monkeypatch):
+    monkeypatch.setitem(fake_speechsdk.PROFILE, "latency", 1.0)
+    monkeypatch.setitem(fake_speechsdk.PROFILE, "jitter", 0.0)
+    client = AzurePronunciationClient(key="stub", sdk=fake_speechsdk, max_concurrency=1, timeout=0.2)
+
+    async def scenario():
+        started = time.perf_counter()
+        # 첫 호출이 슬롯을 잡고 있는 동안 두 번째 호출도 제한 시간 안에 대체 점수로 끝나야 함
+        scores = await asyncio.gather(client.assess("a.wav", "Hello"), client.assess("b.wav", "Hello"))
+        return scores, time.perf_counter() - started
+
+    scores, elapsed = asyncio.run(scenario())
+    assert scores == [0.0, 0.0]
+    assert elapsed < 0.6
+    assert client.stats["timeouts"] == 2
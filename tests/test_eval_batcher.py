@@ -0,0 +1,48 @@
+import asyncio
+
+from services.eval_batcher import EvalBatcher, EvalBatcherStoppedError
+
+
+def test_batches_concurrent_requests():
+    async def handler(items):
+        return [item * 2 for item in items]
+
+    async def scenario():
+        batcher = EvalBatcher(handler, batch_window_ms=20, max_batch_size=8)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+        await batcher.stop()
+        return results, batcher.stats
+
+    results, stats = asyncio.run(scenario())
+    assert results == [0, 2, 4, 6, 8]
+    assert stats["batches"] == 1
+
+
+async def _echo(items):
+    return items
+
+
+def test_stop_fails_requests_still_in_queue():
+    async def scenario():
+        batcher = EvalBatcher(_echo, batch_window_ms=10, max_batch_size=8)
+        batcher.start()
+        # 디스패처가 꺼내기 전에 종료
+        future = asyncio.get_running_loop().create_future()
+        batcher._queue.put_nowait(("queued", future))
+        await batcher.stop()
+        return future
+
+    future = asyncio.run(scenario())
+    assert isinstance(future.exception(), EvalBatcherStoppedError)
+
+
+def test_stop_fails_requests_being_collected():
+    async def scenario():
+        batcher = EvalBatcher(_echo, batch_window_ms=1000, max_batch_size=8)
+        tasks = [asyncio.create_task(batcher.submit(i)) for i in range(3)]
+        await asyncio.sleep(0.05)
+        await batcher.stop()
+        return await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), timeout=1.0)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, EvalBatcherStoppedError) for r in results)
@@ -0,0 +1,41 @@
+from models.data_models import GeminiEvalRequest
+from utils.eval_cache import EvaluationCache, answer_signature, normalize_answer
+
+
+def _request(user_input: str, keyword: str = "1395", score: float = 85.0) -> GeminiEvalRequest:
+    return GeminiEvalRequest(
+        npc_persona="Foreign Friend",
+        user_input=user_input,
+        pronunciation_score=score,
+        target_keyword=keyword,
+        sample_question="When was it built?",
+        retry_count=0,
+        heritage_name="Gyeongbokgung",
+    )
+
+
+def test_normalize_answer_drops_fillers_and_punctuation():
+    assert normalize_answer("Um, the palace was built in 1395!") == "palace was built in 1395"
+
+
+def test_signature_separates_numbers_and_keyword():
+    assert answer_signature("built in 1395", "1395") != answer_signature("built in 1359", "1395")
+    assert answer_signature("built in 1395", "1395") == answer_signature("it was built in 1395", "1395")
+
+
+def test_similar_answer_with_different_number_misses():
+    cache = EvaluationCache(similarity=0.8)
+    cache.put(_request("It was built in 1395"), {"evaluation": "PASS"})
+
+    # 문자열 유사도는 기준 이상이지만 숫자가 다르므로 캐시된 PASS 를 쓰면 안 됨
+    assert cache.get(_request("It was built in 1359")) is None
+    assert cache.get(_request("It was built in the 1395")) == {"evaluation": "PASS"}
+    assert cache.get(_request("It was built in year 1395")) == {"evaluation": "PASS"}
+    assert cache.stats["similar_hits"] == 1
+
+
+def test_score_bucket_is_part_of_the_key():
+    cache = EvaluationCache()
+    cache.put(_request("1395", score=85.0), {"evaluation": "PASS"})
+    assert cache.get(_request("1395", score=55.0)) is None
+    assert cache.get(_request("1395", score=81.0)) == {"evaluation": "PASS"}
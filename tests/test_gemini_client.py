@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from services.gemini_client import CircuitBreaker, CircuitOpenError, GeminiClient
+from utils.fake_gemini import FakeGeminiModel
+
+
+def _half_open_client(model) -> GeminiClient:
+    client = GeminiClient(model, timeout=5.0, max_retries=0)
+    client.breaker.reset_seconds = 0.0
+    client.breaker.state = CircuitBreaker.OPEN
+    return client
+
+
+def test_cancelled_probe_releases_half_open_slot():
+    async def scenario():
+        client = _half_open_client(FakeGeminiModel(latency=1.0, jitter=0.0))
+        probe = asyncio.create_task(client.generate("probe"))
+        await asyncio.sleep(0.05)
+        assert client.breaker.state == CircuitBreaker.HALF_OPEN
+
+        # 시험 호출이 진행 중이면 다른 호출은 거부
+        with pytest.raises(CircuitOpenError):
+            await client.generate("rejected")
+
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+        # 취소된 시험 호출이 슬롯을 반환해야 다음 호출이 다시 시험할 수 있음
+        client.model.latency = 0.0
+        assert await client.generate("next probe")
+        assert client.breaker.state == CircuitBreaker.CLOSED
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_non_probe_call_keeps_probe_slot():
+    async def scenario():
+        client = GeminiClient(FakeGeminiModel(latency=1.0, jitter=0.0), timeout=5.0, max_retries=0)
+        # 서킷이 닫혀 있을 때 시작된 호출
+        old_call = asyncio.create_task(client.generate("old"))
+        await asyncio.sleep(0.05)
+
+        client.breaker.reset_seconds = 0.0
+        client.breaker.state = CircuitBreaker.OPEN
+        probe = asyncio.create_task(client.generate("probe"))
+        await asyncio.sleep(0.05)
+
+        old_call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await old_call
+
+        # 시험 호출이 아닌 호출의 취소는 시험 슬롯을 해제하지 않음
+        with pytest.raises(CircuitOpenError):
+            await client.generate("rejected")
+        probe.cancel()
+
+    asyncio.run(scenario())
@@ -0,0 +1,38 @@
+import copy
+
+import pytest
+
+from utils.json_delta import apply_patch, make_patch
+
+STATE = {
+    "current_heritage_index": 0,
+    "chat_history": [{"role": "npc", "text": "Hello!"}],
+    "evaluation_logs": [],
+    "player_info": {"name": "Mina", "a/b": 1, "x~y": 2},
+}
+
+
+@pytest.mark.parametrize("new", [
+    # 채팅 기록 추가 (add .../-)
+    {**STATE, "chat_history": STATE["chat_history"] + [{"role": "user", "text": "1395"}]},
+    # 값 변경 + 키 삭제 + 이스케이프가 필요한 키
+    {**STATE, "current_heritage_index": 1, "player_info": {"name": "Mina", "a/b": 3}},
+    # 리스트 축소
+    {**STATE, "chat_history": []},
+    # 타입 변경
+    {**STATE, "evaluation_logs": None},
+    STATE,
+])
+def test_patch_round_trip(new):
+    old = copy.deepcopy(STATE)
+    ops = make_patch(old, new)
+    assert apply_patch(old, ops) == new
+
+
+def test_append_only_list_uses_add_ops():
+    new = {**STATE, "chat_history": STATE["chat_history"] + [{"role": "user", "text": "hi"}]}
+    assert make_patch(STATE, new) == [{"op": "add", "path": "/chat_history/-", "value": {"role": "user", "text": "hi"}}]
+
+
+def test_unchanged_document_has_no_ops():
+    assert make_patch(STATE, copy.deepcopy(STATE)) == []
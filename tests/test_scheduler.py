@@ -0,0 +1,35 @@
+import pytest
+
+from services import scheduler
+from services.scheduler import (ADMISSION_MAX_QUEUE_NEW_SESSION, ADMISSION_MAX_QUEUE_TURN, PRIORITY_NEW_SESSION,
+                                PRIORITY_TURN, AdmissionRejectedError, admit_request, request_priority)
+
+
+@pytest.fixture
+def queue_depth(monkeypatch):
+    depth = {"value": 0}
+    monkeypatch.setattr(scheduler, "_extra_queue_sources", [lambda: depth["value"]])
+    return depth
+
+
+def test_new_sessions_are_rejected_before_turns(queue_depth):
+    assert ADMISSION_MAX_QUEUE_NEW_SESSION < ADMISSION_MAX_QUEUE_TURN
+    queue_depth["value"] = ADMISSION_MAX_QUEUE_NEW_SESSION
+
+    with pytest.raises(AdmissionRejectedError) as rejected:
+        admit_request(PRIORITY_NEW_SESSION)
+    assert rejected.value.status_code == 429
+    assert rejected.value.retry_after >= 1
+
+    admit_request(PRIORITY_TURN)
+    assert request_priority.get() == PRIORITY_TURN
+
+
+def test_turns_are_rejected_at_turn_limit(queue_depth):
+    queue_depth["value"] = ADMISSION_MAX_QUEUE_TURN - 1
+    admit_request(PRIORITY_TURN)
+
+    queue_depth["value"] = ADMISSION_MAX_QUEUE_TURN
+    with pytest.raises(AdmissionRejectedError) as rejected:
+        admit_request(PRIORITY_TURN)
+    assert rejected.value.status_code == 503
@@ -0,0 +1,24 @@
+from utils.text_correction import AhoCorasick, CorrectionEngine
+
+CATALOG_TERMS = {"Gyeongbokgung": ["gyeong bok gung"], "GwangHwaMoon": ["gwanghwa mun"], "1395": []}
+SCOPES = {"Gyeongbokgung": ["Gyeongbokgung", "1395"], "GwangHwaMoon": ["GwangHwaMoon"]}
+
+
+def test_aho_corasick_finds_overlapping_patterns():
+    automaton = AhoCorasick({"he": "HE", "she": "SHE", "hers": "HERS"})
+    assert sorted(automaton.find_all("ushers")) == [(1, 4, "SHE"), (2, 4, "HE"), (2, 6, "HERS")]
+
+
+def test_known_variants_are_corrected_on_word_boundaries():
+    engine = CorrectionEngine(CATALOG_TERMS, SCOPES)
+    assert engine.correct("I visited Gyeong Bok Gung today") == "I visited Gyeongbokgung today"
+    # 단어 중간은 교정하지 않음
+    assert engine.correct("xgyeong bok gungx") == "xgyeong bok gungx"
+
+
+def test_fuzzy_correction_is_scoped_to_current_heritage():
+    engine = CorrectionEngine(CATALOG_TERMS, SCOPES)
+    assert engine.correct("Gyeongbokgoong is big", "Gyeongbokgung") == "Gyeongbokgung is big"
+    assert engine.correct("Gyeongbokgoong is big", "GwangHwaMoon") == "Gyeongbokgoong is big"
+    # 흔한 영어 단어는 퍼지 매칭하지 않음
+    assert engine.correct("what a grand mood", "GwangHwaMoon") == "what a grand mood"
@@ -0,0 +1,136 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+
+def audio_cache_key(text: str, lang: str, variant: str = "") -> str:
+    """
+    (text, lang) 조합의 내용 기반 키 (sha256)
+    variant: 음성 엔진/출력 형식 구분 ("" = 기존 gTTS MP3, 사전 생성 번들과 같은 키)
+    """
+    if variant:
+        return hashlib.sha256(f"{lang}\n{variant}\n{text}".encode("utf-8")).hexdigest()
+    return hashlib.sha256(f"{lang}\n{text}".encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    """
+    2단계 오디오 캐시
+    - 1단계: 메모리 LRU (전체 바이트 용량 제한)
+    - 2단계: 디스크 내용 주소 저장소 (cache_dir/ab/abcdef....mp3)
+    """
+
+    def __init__(self, cache_dir: Optional[str], max_memory_bytes: int, suffix: str = ".mp3"):
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.suffix = suffix
+
+        # 읽기 전용 추가 저장소 (예: 사전 생성 번들의 audio 폴더). 같은 디렉터리 구조를 사용
+        self.fallback_dirs = []
+
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "disk_writes": 0,
+        }
+
+    def _disk_path(self, key: str, root: Optional[str] = None) -> str:
+        return os.path.join(root or self.cache_dir, key[:2], key + self.suffix)
+
+    def add_fallback_dir(self, path: str):
+        if path not in self.fallback_dirs:
+            self.fallback_dirs.append(path)
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        roots = ([self.cache_dir] if self.cache_dir else []) + self.fallback_dirs
+        for root in roots:
+            try:
+                with open(self._disk_path(key, root), "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                print(f"[AudioCache] Disk read failed: {e}")
+                continue
+            if data:
+                return data
+        return None
+
+    def _remember(self, key: str, data: bytes):
+        """메모리 LRU에 저장하고 용량을 초과하면 오래된 항목부터 제거합니다. (lock 보유 상태에서 호출)"""
+        if len(data) > self.max_memory_bytes:
+            return
+
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old)
+
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.stats["evictions"] += 1
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return data
+
+        data = self._read_disk(key)
+        if data:
+            with self._lock:
+                self.stats["disk_hits"] += 1
+                self._remember(key, data)
+            return data
+
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def put(self, key: str, data: bytes, persist: bool = True):
+        if not data:
+            return
+
+        with self._lock:
+            self._remember(key, data)
+
+        if persist and self.cache_dir:
+            path = self._disk_path(key)
+            if os.path.exists(path):
+                return
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                # 다른 워커와 동시에 쓰더라도 깨진 파일이 보이지 않도록 임시 파일 후 교체
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+                with self._lock:
+                    self.stats["disk_writes"] += 1
+            except Exception as e:
+                print(f"[AudioCache] Disk write failed: {e}")
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+            total = hits + self.stats["misses"]
+            return {
+                **self.stats,
+                "memory_items": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "max_memory_bytes": self.max_memory_bytes,
+                "hit_rate": round(hits / total, 4) if total else 0.0,
+            }
@@ -0,0 +1,180 @@
+import io
+import subprocess
+import threading
+import wave
+from collections import OrderedDict
+from math import gcd
+
+import numpy as np
+
+# Whisper/Azure 공통 입력 형식: 16kHz, mono, float32 [-1, 1]
+SAMPLE_RATE = 16000
+
+# 파이썬에서 직접 리샘플링하는 입력 샘플링 레이트 (그 외는 ffmpeg 로 넘기거나 거절)
+# 필터 크기가 16000/gcd 에 비례하므로, 헤더에 임의 값(999983 등)을 적은 업로드가 메모리/CPU 를 쓰지 못하도록 제한
+SUPPORTED_SAMPLE_RATES = (8000, 11025, 16000, 22050, 24000, 32000, 44100, 48000)
+
+
+def is_supported_sample_rate(rate) -> bool:
+    return isinstance(rate, int) and not isinstance(rate, bool) and rate in SUPPORTED_SAMPLE_RATES
+
+
+def _decode_wav(data: bytes) -> np.ndarray:
+    with wave.open(io.BytesIO(data), "rb") as wav_file:
+        channels = wav_file.getnchannels()
+        sample_width = wav_file.getsampwidth()
+        frame_rate = wav_file.getframerate()
+        if not is_supported_sample_rate(frame_rate):
+            raise ValueError(f"Unsupported WAV sample rate: {frame_rate}")
+        frames = wav_file.readframes(wav_file.getnframes())
+
+    if sample_width == 1:
+        audio = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sample_width == 2:
+        audio = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    elif sample_width == 4:
+        audio = np.frombuffer(frames, dtype="<i4").astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {sample_width}")
+
+    if channels > 1:
+        audio = audio.reshape(-1, channels).mean(axis=1)
+
+    return resample(audio, frame_rate, SAMPLE_RATE)
+
+
+def _decode_with_ffmpeg(data: bytes) -> np.ndarray:
+    """WAV가 아닌 형식은 ffmpeg에 stdin으로 넘겨 디코딩합니다. (임시 파일 없음)"""
+    cmd = [
+        "ffmpeg", "-nostdin", "-threads", "0",
+        "-i", "pipe:0",
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE),
+        "pipe:1",
+    ]
+    out = subprocess.run(cmd, input=data, capture_output=True, check=True).stdout
+    return np.frombuffer(out, dtype="<i2").astype(np.float32) / 32768.0
+
+
+# 리샘플링 저역 통과 필터 (windowed-sinc, polyphase)
+# 44.1/48kHz → 16kHz 로 줄일 때 8kHz 이상 성분이 접혀 들어오지(aliasing) 않도록 먼저 걸러냄
+RESAMPLE_ZERO_CROSSINGS = 16    # 필터 반쪽 길이 (sinc 영점 수)
+RESAMPLE_ROLLOFF = 0.94         # 차단 주파수 = 나이퀴스트(낮은 쪽) x rolloff
+RESAMPLE_BLOCK = 16384          # 한 번에 계산할 출력 샘플 수 (메모리 제한)
+RESAMPLE_FILTER_CACHE_BYTES = 4 * 1024 * 1024   # 레이트 쌍별 필터 캐시 (바이트 기준 LRU)
+
+_filter_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_filter_cache_bytes = 0
+_filter_cache_lock = threading.Lock()
+
+
+def _resample_filter(src_rate: int, dst_rate: int) -> tuple:
+    """(up, down, half_taps, 위상별 필터 [up, 2*half_taps+1]). 지원하는 레이트만 (그 외 ValueError)"""
+    global _filter_cache_bytes
+    for rate in (src_rate, dst_rate):
+        if not is_supported_sample_rate(rate):
+            raise ValueError(f"Unsupported sample rate: {rate}")
+
+    key = (src_rate, dst_rate)
+    with _filter_cache_lock:
+        cached = _filter_cache.get(key)
+        if cached is not None:
+            _filter_cache.move_to_end(key)
+            return cached
+
+    result = _build_resample_filter(src_rate, dst_rate)
+    with _filter_cache_lock:
+        if key not in _filter_cache:
+            _filter_cache[key] = result
+            _filter_cache_bytes += result[3].nbytes
+            while _filter_cache_bytes > RESAMPLE_FILTER_CACHE_BYTES and len(_filter_cache) > 1:
+                _, (_, _, _, bank) = _filter_cache.popitem(last=False)
+                _filter_cache_bytes -= bank.nbytes
+    return result
+
+
+def _build_resample_filter(src_rate: int, dst_rate: int) -> tuple:
+    g = gcd(src_rate, dst_rate)
+    up, down = dst_rate // g, src_rate // g
+    cutoff = min(1.0, dst_rate / src_rate) * RESAMPLE_ROLLOFF   # 입력 샘플 단위 (1.0 = 입력 나이퀴스트)
+    half_taps = int(np.ceil(RESAMPLE_ZERO_CROSSINGS / cutoff))
+
+    # 출력 n 의 입력 위치 n*down/up 의 소수부는 p/up (p = n*down mod up) 중 하나이므로 위상별로 미리 계산
+    offsets = np.arange(up)[:, None] / up - np.arange(-half_taps, half_taps + 1)[None, :]
+    window = np.cos(0.5 * np.pi * np.clip(offsets / (half_taps + 1), -1.0, 1.0)) ** 2
+    bank = cutoff * np.sinc(cutoff * offsets) * window
+    bank /= bank.sum(axis=1, keepdims=True)
+    return up, down, half_taps, bank.astype(np.float32)
+
+
+class Resampler:
+    """
+    청크 단위로 입력을 받는 리샘플러. 필터 길이만큼 이전 입력을 보관하므로
+    청크 경계에서 잡음이 생기지 않고, 한 번에 처리한 결과와 같습니다. (마지막에 flush=True)
+    """
+
+    def __init__(self, src_rate: int, dst_rate: int):
+        self.up, self.down, self.half_taps, self.bank = _resample_filter(src_rate, dst_rate)
+        self._buffer = np.zeros(self.half_taps, dtype=np.float32)   # 시작 전 구간은 0
+        self._start = -self.half_taps   # _buffer[0] 의 입력 샘플 위치
+        self._received = 0
+        self._next = 0                  # 다음 출력 샘플 번호
+
+    def process(self, audio: np.ndarray, flush: bool = False) -> np.ndarray:
+        self._buffer = np.concatenate([self._buffer, audio.astype(np.float32, copy=False)])
+        self._received += len(audio)
+
+        if flush:
+            end = int(round(self._received * self.up / self.down))
+            self._buffer = np.concatenate([self._buffer, np.zeros(self.half_taps + 1, dtype=np.float32)])
+        else:
+            # 오른쪽 필터 구간까지 입력이 들어온 출력만 계산
+            available = self._start + len(self._buffer) - self.half_taps - 1
+            end = (available * self.up) // self.down + 1 if available >= 0 else 0
+        end = max(end, self._next)
+
+        outputs = []
+        taps = np.arange(2 * self.half_taps + 1)
+        for block_start in range(self._next, end, RESAMPLE_BLOCK):
+            n = np.arange(block_start, min(block_start + RESAMPLE_BLOCK, end))
+            base = (n * self.down) // self.up
+            index = (base - self.half_taps - self._start)[:, None] + taps[None, :]
+            weights = self.bank[(n * self.down) % self.up]
+            outputs.append(np.einsum("ij,ij->i", self._buffer[index], weights))
+        self._next = end
+
+        # 다음 출력에 필요 없는 앞부분 입력은 버림
+        keep_from = (self._next * self.down) // self.up - self.half_taps
+        if keep_from > self._start:
+            self._buffer = self._buffer[keep_from - self._start:]
+            self._start = keep_from
+
+        return np.concatenate(outputs).astype(np.float32) if outputs else np.zeros(0, dtype=np.float32)
+
+
+def resample(audio: np.ndarray, src_rate: int, dst_rate: int) -> np.ndarray:
+    if src_rate == dst_rate or len(audio) == 0:
+        return audio.astype(np.float32, copy=False)
+    return Resampler(src_rate, dst_rate).process(audio, flush=True)
+
+
+def decode_audio_bytes(data: bytes) -> np.ndarray:
+    """
+    업로드된 음성 바이트를 한 번만 디코딩하여 16kHz mono float32 PCM 으로 반환합니다.
+    PCM WAV는 파이썬에서 바로 처리하고, 그 외 형식(float WAV, 지원하지 않는 샘플링 레이트, mp3, ogg 등)만
+    ffmpeg를 사용합니다.
+    """
+    if not data:
+        return np.zeros(0, dtype=np.float32)
+
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        try:
+            return _decode_wav(data)
+        except (wave.Error, ValueError, EOFError) as e:
+            print(f"[AudioDecode] WAV fallback to ffmpeg: {e}")
+
+    return _decode_with_ffmpeg(data)
+
+
+def to_pcm16_bytes(audio: np.ndarray) -> bytes:
+    """float32 PCM 을 16-bit little-endian PCM 바이트로 변환합니다. (Azure push stream 입력용)"""
+    return (np.clip(audio, -1.0, 1.0) * 32767.0).astype("<i2").tobytes()
@@ -0,0 +1,137 @@
+# utils/bench_text_correction.py
+"""
+문화재 이름 교정 엔진 마이크로 벤치마크 (카탈로그 크기별 발화당 처리 시간)
++ 일반 영어 문장이 고유명사로 바뀌지 않는지 확인 (오교정이 있으면 종료 코드 1)
+
+    python -m utils.bench_text_correction --sizes 5 50 500 5000 --utterances 2000
+"""
+import argparse
+import random
+import sys
+import time
+
+from utils.text_correction import build_correction_engine
+
+SYLLABLES = ["gwang", "hwa", "moon", "gyeong", "heoi", "ru", "jo", "seon", "tong", "shin", "sa",
+             "so", "swae", "won", "nak", "an", "eup", "seong", "bul", "guk", "su", "won", "deok", "gung"]
+
+FILLER = ["I think", "this place", "was built", "in the", "by the king", "a long time ago",
+          "it is very", "beautiful", "and old", "people visit", "every year"]
+
+
+# 실제 카탈로그로 교정했을 때 바뀌면 안 되는 문장 (모든 문화재에서 확인)
+NEGATIVE_UTTERANCES = [
+    "I want to go back soon",
+    "Turtle Shipping",
+    "We will go back home soon",
+    "The gang went home",
+    "I think the king lived here a long time ago",
+    "They used boats and ships to trade",
+    "The garden is very quiet",
+    "It was a grand mood",
+    "I saw a turtle in the pond",
+    "Thank you so much",
+]
+
+
+def make_catalog(size: int, rng: random.Random) -> dict:
+    catalog = {}
+    while len(catalog) < size:
+        name = "".join(s.capitalize() for s in rng.sample(SYLLABLES, rng.randint(2, 4)))
+        catalog[name] = [(str(rng.randint(1000, 1900)), "When was this built?")]
+    return catalog
+
+
+def mangle(name: str, rng: random.Random) -> str:
+    """STT 오인식처럼 보이도록 띄어쓰기/철자를 흔듭니다."""
+    text = "".join(" " + c.lower() if c.isupper() else c for c in name).strip()
+    swaps = [("eo", "u"), ("oo", "u"), ("g", "k"), ("r", "l"), ("ae", "e")]
+    src, dst = rng.choice(swaps)
+    return text.replace(src, dst, 1)
+
+
+def make_utterances(catalog: dict, count: int, rng: random.Random) -> list:
+    """[(현재 문화재, 발화, 이름 포함 여부)]"""
+    names = list(catalog)
+    utterances = []
+    for _ in range(count):
+        heritage = rng.choice(names)
+        words = rng.sample(FILLER, 4)
+        has_name = rng.random() < 0.7
+        if has_name:
+            words.insert(rng.randint(0, len(words)), mangle(heritage, rng))
+        utterances.append((heritage, " ".join(words), has_name))
+    return utterances
+
+
+def legacy_correct(text: str, heritage_name: str, corrections: dict) -> str:
+    """기존 구현 (현재 문화재만, 첫 매치만, 대소문자 구분 치환)"""
+    text_lower = text.lower()
+    if heritage_name in corrections:
+        for wrong_word in corrections[heritage_name]:
+            if wrong_word in text_lower:
+                return text.replace(wrong_word, heritage_name)
+    return text
+
+
+def check_negatives() -> list:
+    """NEGATIVE_UTTERANCES 중 실제 카탈로그 엔진이 바꾼 것 [(문화재, 원문, 결과)]"""
+    engine = build_correction_engine()
+    heritages = list(engine.fuzzy_scopes) + [None]
+    failures = []
+    for text in NEGATIVE_UTTERANCES:
+        for heritage in heritages:
+            corrected = engine.correct(text, heritage)
+            if corrected != text:
+                failures.append((heritage, text, corrected))
+    return failures
+
+
+def run(sizes: list, utterance_count: int, seed: int):
+    print(f"{'catalog':>8} {'build ms':>10} {'engine us/utt':>14} {'legacy us/utt':>14} {'corrected':>10} "
+          f"{'false pos':>10}")
+    for size in sizes:
+        rng = random.Random(seed)
+        catalog = make_catalog(size, rng)
+        utterances = make_utterances(catalog, utterance_count, rng)
+
+        started = time.perf_counter()
+        engine = build_correction_engine(catalog)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        results = [(engine.correct(u, heritage) != u, has_name) for heritage, u, has_name in utterances]
+        engine_us = (time.perf_counter() - started) / len(utterances) * 1e6
+        corrected = sum(changed for changed, has_name in results if has_name)
+        false_positives = sum(changed for changed, has_name in results if not has_name)
+
+        corrections = {name: [mangle(name, rng)] for name in catalog}
+        heritage = next(iter(catalog))
+        started = time.perf_counter()
+        for _, u, _ in utterances:
+            legacy_correct(u, heritage, corrections)
+        legacy_us = (time.perf_counter() - started) / len(utterances) * 1e6
+
+        print(f"{size:>8} {build_ms:>10.1f} {engine_us:>14.1f} {legacy_us:>14.1f} {corrected:>10} "
+              f"{false_positives:>10}")
+
+    failures = check_negatives()
+    print(f"\nNegative cases: {len(NEGATIVE_UTTERANCES) - len({t for _, t, _ in failures})}/"
+          f"{len(NEGATIVE_UTTERANCES)} unchanged")
+    for heritage, text, corrected in failures:
+        print(f"  [{heritage}] {text!r} -> {corrected!r}")
+    return not failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark heritage-name correction.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 50, 500, 5000])
+    parser.add_argument("--utterances", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    if not run(args.sizes, args.utterances, args.seed):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
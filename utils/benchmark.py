@@ -0,0 +1,377 @@
+# utils/benchmark.py
+"""
+오프라인 부하 테스트 / 벤치마크
+
+앱을 프로세스 안에서 띄우고(httpx ASGITransport) Gemini / Azure / gTTS / Whisper 를
+지연·오류 설정이 가능한 가짜 구현으로 교체한 뒤, N명의 플레이어가 동시에
+여러 문화재 투어(오프닝 질문 → 키워드별 답변)를 진행하도록 합니다.
+
+    python -m utils.benchmark --players 20 --heritages 2 --out bench/baseline.json
+    python -m utils.benchmark --players 20 --baseline bench/baseline.json
+    python -m utils.benchmark --wav-dir recordings/ --real-stt
+
+결과: 처리량, 엔드포인트별 / 단계별(Server-Timing) p50·p95·p99 지연 시간 (JSON 저장 가능)
+"""
+import argparse
+import asyncio
+import io
+import json
+import math
+import os
+import random
+import struct
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+import httpx
+
+from models.data_models import GameState
+from utils.heritage_catalog import load_heritage_catalog
+from utils.json_delta import apply_patch
+
+RETRY_AFTER_CAP_SECONDS = 2.0
+
+
+# =================================================================
+# 입력 준비
+# =================================================================
+def make_tone_wav(seconds: float = 2.0, rate: int = 16000) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        frames = (int(6000 * math.sin(2 * math.pi * 220 * i / rate)) for i in range(int(rate * seconds)))
+        w.writeframes(b"".join(struct.pack("<h", v) for v in frames))
+    return buf.getvalue()
+
+
+def load_wavs(wav_dir: str = None) -> list:
+    if not wav_dir:
+        return [make_tone_wav()]
+    wavs = [p.read_bytes() for p in sorted(Path(wav_dir).glob("*.wav"))]
+    if not wavs:
+        raise SystemExit(f"No .wav files in {wav_dir}")
+    return wavs
+
+
+def build_tour_state(catalog: dict, heritage_names: list, player_name: str) -> dict:
+    # 기본값까지 채운 형태여야 세션 모드의 state_delta 를 그대로 적용할 수 있음
+    return GameState.model_validate({
+        "save_slot_name": f"bench_{player_name}",
+        "player_info": {"name": player_name, "gender": "unknown"},
+        "heritages": [
+            {
+                "name": name,
+                "keywords": [{"keyword": k, "sample_question": q} for k, q in catalog[name]],
+            }
+            for name in heritage_names
+        ],
+    }).model_dump()
+
+
+# =================================================================
+# 결과 수집
+# =================================================================
+def parse_server_timing(header: str) -> dict:
+    timings = {}
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if name and key == "dur":
+                timings[name] = float(value)
+    return timings
+
+
+def percentile(values: list, p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(values: list) -> dict:
+    return {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values), 1) if values else 0.0,
+        "p50_ms": round(percentile(values, 50), 1),
+        "p95_ms": round(percentile(values, 95), 1),
+        "p99_ms": round(percentile(values, 99), 1),
+        "max_ms": round(max(values), 1) if values else 0.0,
+    }
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = {}   # endpoint -> [ms]
+        self.statuses = {}    # endpoint -> {status: count}
+        self.stages = {}      # stage -> [ms]
+        self.turns = 0
+        self.tours = 0
+
+    def record(self, endpoint: str, response: httpx.Response, latency_ms: float):
+        self.latencies.setdefault(endpoint, []).append(latency_ms)
+        statuses = self.statuses.setdefault(endpoint, {})
+        statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+        for stage, ms in parse_server_timing(response.headers.get("server-timing")).items():
+            if stage != "total":
+                self.stages.setdefault(stage, []).append(ms)
+
+
+# =================================================================
+# 플레이어 시뮬레이션
+# =================================================================
+async def post(client: httpx.AsyncClient, recorder: Recorder, endpoint: str, **kwargs) -> httpx.Response:
+    """429/503 이면 Retry-After 만큼 기다렸다가 다시 보냅니다. (거절도 결과에 기록)"""
+    while True:
+        started = time.perf_counter()
+        response = await client.post(endpoint, **kwargs)
+        recorder.record(endpoint, response, (time.perf_counter() - started) * 1000)
+        if response.status_code not in (429, 503):
+            return response
+        retry_after = float(response.headers.get("retry-after", 1))
+        await asyncio.sleep(min(retry_after, RETRY_AFTER_CAP_SECONDS))
+
+
+def apply_state_fields(state: dict, body: dict) -> dict:
+    if "updated_game_state" in body:
+        return body["updated_game_state"]
+    return apply_patch(state, body.get("state_delta", []))
+
+
+async def run_player(client: httpx.AsyncClient, recorder: Recorder, player_id: int, tour: list,
+                     catalog: dict, wavs: list, args, rng: random.Random):
+    state = build_tour_state(catalog, tour, f"player{player_id}")
+    for index in range(len(tour)):
+        state["current_index"] = index
+        form = {"request_data": json.dumps(state), "audio_mode": args.audio_mode}
+        if args.use_session:
+            form["use_session"] = "true"
+
+        response = await post(client, recorder, "/start_conversation", data=form)
+        if response.status_code != 200:
+            return
+        body = response.json()
+        state = apply_state_fields(state, body)
+        session = {"session_id": body["session_id"]} if args.use_session else {}
+        await fetch_audio(client, recorder, body, args)
+
+        for _ in range(args.max_turns):
+            await asyncio.sleep(rng.uniform(0, args.think_time))
+            form = {"audio_mode": args.audio_mode, **session}
+            if not args.use_session:
+                form["request_data"] = json.dumps(state)
+            wav = rng.choice(wavs)
+            response = await post(client, recorder, "/interact", data=form,
+                                  files={"audio_file": ("answer.wav", wav, "audio/wav")})
+            if response.status_code != 200:
+                return
+            body = response.json()
+            state = apply_state_fields(state, body)
+            recorder.turns += 1
+            await fetch_audio(client, recorder, body, args)
+
+            if state["heritages"][index]["completed"]:
+                break
+    recorder.tours += 1
+
+
+async def fetch_audio(client: httpx.AsyncClient, recorder: Recorder, body: dict, args):
+    if args.audio_mode != "url" or not body.get("audio_url"):
+        return
+    started = time.perf_counter()
+    response = await client.get(body["audio_url"])
+    recorder.record("/audio/{audio_id}", response, (time.perf_counter() - started) * 1000)
+
+
+# =================================================================
+# 가짜 서비스 설치 / 실행
+# =================================================================
+def install_fakes(args, workdir: str):
+    from services import gemini_service, pronunciation_service, tts_service
+    from services.azure_service import AzurePronunciationClient, set_azure_client
+    from services.gemini_service import set_gemini_model
+    from services.stt_service import set_whisper_model
+    from services.tts_service import set_local_tts_synthesizer, set_tts_synthesizer
+    from utils import fake_speechsdk, logger, report_manager
+    from utils.audio_cache import AudioCache
+    from utils.fake_gemini import FakeGeminiModel
+    from utils.fake_tts import FakeTTS
+    from utils.fake_whisper import FakeWhisperModel
+
+    set_gemini_model(FakeGeminiModel(latency=args.gemini_latency, jitter=args.gemini_latency / 4,
+                                     error_rate=args.gemini_error_rate, pass_rate=args.pass_rate,
+                                     batch_drop_rate=args.gemini_batch_drop_rate, seed=args.seed))
+    gemini_service.COMBINED_EVAL_MODE = not args.no_combined_eval
+    gemini_service.EVAL_BATCH_ENABLED = args.eval_batch
+    gemini_service.EVAL_BATCHER.batch_window = args.eval_batch_window_ms / 1000
+    gemini_service.EVAL_BATCHER.max_batch_size = args.eval_batch_size
+    gemini_service.EVAL_CACHE_ENABLED = not args.no_eval_cache
+    gemini_service.EVAL_CACHE.path = os.path.join(workdir, "eval_cache.json")
+    fake_speechsdk.configure(latency=args.azure_latency, jitter=args.azure_latency / 4,
+                             failure_rate=args.azure_failure_rate)
+    set_azure_client(AzurePronunciationClient(key="bench", sdk=fake_speechsdk))
+    pronunciation_service.PRONUNCIATION_BACKEND = args.pronunciation_backend
+    set_tts_synthesizer(FakeTTS(latency=args.tts_latency, jitter=args.tts_latency / 4,
+                                failure_rate=args.tts_failure_rate, seed=args.seed))
+    set_local_tts_synthesizer(FakeTTS(latency=args.local_tts_latency, jitter=args.local_tts_latency / 4,
+                                      seed=args.seed + 1))
+    tts_service.TTS_BACKEND = args.tts_backend
+    tts_service.TTS_HEDGE_AFTER_MS = args.tts_hedge_ms
+    if not args.real_stt:
+        set_whisper_model(FakeWhisperModel(latency=args.stt_latency, jitter=args.stt_latency / 4, seed=args.seed))
+
+    # 캐시/리포트/로그는 임시 디렉터리로 (실제 데이터와 섞이지 않도록)
+    if args.tts_cache:
+        tts_service.TTS_CACHE = AudioCache(os.path.join(workdir, "tts"), tts_service.TTS_CACHE_MAX_MEMORY_BYTES,
+                                           suffix=tts_service.output_format().suffix)
+    else:
+        tts_service.TTS_CACHE_ENABLED = False
+    report_manager.REPORT_DIR = os.path.join(workdir, "reports")
+    report_manager.REPORT_SEGMENT_DIR = os.path.join(workdir, "reports", "segments")
+    logger.UTTERANCE_LOG.log_dir = os.path.join(workdir, "logs")
+
+
+async def run_benchmark(args) -> dict:
+    workdir = tempfile.mkdtemp(prefix="heritage_bench_")
+    install_fakes(args, workdir)
+    from main import app
+
+    catalog = {name: kws for name, kws in load_heritage_catalog().items() if kws}
+    names = sorted(catalog)
+    rng = random.Random(args.seed)
+    wavs = load_wavs(args.wav_dir)
+    recorder = Recorder()
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            started = time.perf_counter()
+            await asyncio.gather(*(
+                run_player(client, recorder, i, rng.sample(names, min(args.heritages, len(names))),
+                           catalog, wavs, args, random.Random(args.seed + i))
+                for i in range(args.players)
+            ))
+            elapsed = time.perf_counter() - started
+            server_stats = (await client.get("/stats")).json()
+
+    requests_total = sum(len(v) for v in recorder.latencies.values())
+    return {
+        "config": {k: v for k, v in vars(args).items() if k not in ("out", "baseline")},
+        "workdir": workdir,
+        "elapsed_s": round(elapsed, 2),
+        "throughput": {
+            "requests_per_s": round(requests_total / elapsed, 2),
+            "turns_per_s": round(recorder.turns / elapsed, 2),
+            "turns": recorder.turns,
+            "tours_completed": recorder.tours,
+        },
+        "endpoints": {
+            name: {**summarize(values), "status": recorder.statuses[name]}
+            for name, values in sorted(recorder.latencies.items())
+        },
+        "stages": {name: summarize(values) for name, values in sorted(recorder.stages.items())},
+        "server_stats": server_stats,
+    }
+
+
+# =================================================================
+# 출력
+# =================================================================
+def print_table(title: str, rows: dict, baseline: dict = None):
+    print(f"\n{title}")
+    print(f"  {'name':<22}{'count':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}  {'p95 vs base':>12}")
+    for name, row in rows.items():
+        delta = ""
+        if baseline and name in baseline and baseline[name]["p95_ms"]:
+            delta = f"{(row['p95_ms'] / baseline[name]['p95_ms'] - 1) * 100:+.1f}%"
+        print(f"  {name:<22}{row['count']:>7}{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}"
+              f"{row['p99_ms']:>9.1f}{row['max_ms']:>9.1f}  {delta:>12}")
+
+
+def print_report(results: dict, baseline: dict = None):
+    t = results["throughput"]
+    print(f"elapsed {results['elapsed_s']}s | {t['requests_per_s']} req/s | {t['turns_per_s']} turns/s | "
+          f"turns {t['turns']} | tours {t['tours_completed']}")
+    if baseline:
+        b = baseline["throughput"]
+        print(f"baseline: {b['requests_per_s']} req/s | {b['turns_per_s']} turns/s")
+    print_table("Endpoints (ms)", results["endpoints"], baseline and baseline.get("endpoints"))
+    for name, row in results["endpoints"].items():
+        print(f"  {name}: status {row['status']}")
+    print_table("Stages from Server-Timing (ms)", results["stages"], baseline and baseline.get("stages"))
+
+    pron = results["server_stats"]["pronunciation"]
+    print(f"\nPronunciation ({pron['backend']}): local {pron['local']} | azure {pron['azure']} | "
+          f"hybrid escalated {pron['hybrid_escalated']} | local unavailable {pron['local_unavailable']}")
+
+    tts = results["server_stats"]["tts"]
+    print(f"TTS ({tts['backend']}): primary {tts['primary']} | local {tts['local']} | hedged {tts['hedged']} "
+          f"(local wins {tts['hedge_local_wins']}, late primary cached {tts['late_primary_cached']}) | "
+          f"failures {tts['failures']}")
+
+    gemini = results["server_stats"]["gemini"]
+    batch = gemini["eval_batch"]
+    print(f"Gemini: {gemini['requests']} requests | eval batches {batch['batch_calls']} "
+          f"(avg size {batch['avg_batch_size']}, single fallbacks {batch['single_fallbacks']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test with fake Gemini/Azure/gTTS/Whisper.")
+    parser.add_argument("--players", type=int, default=10)
+    parser.add_argument("--heritages", type=int, default=2, help="heritages per player tour")
+    parser.add_argument("--max-turns", type=int, default=20, help="turn cap per heritage")
+    parser.add_argument("--think-time", type=float, default=0.0, help="max random pause between turns (s)")
+    parser.add_argument("--audio-mode", choices=["base64", "url"], default="base64")
+    parser.add_argument("--use-session", action="store_true")
+    parser.add_argument("--wav-dir", help="directory of recorded answer WAVs (default: generated tone)")
+    parser.add_argument("--real-stt", action="store_true", help="use the real Whisper model")
+    parser.add_argument("--tts-cache", action="store_true", help="enable the TTS cache (fresh temp dir)")
+    parser.add_argument("--no-combined-eval", action="store_true",
+                        help="generate the next question with a separate Gemini call")
+    parser.add_argument("--no-eval-cache", action="store_true", help="disable the answer-evaluation cache")
+    parser.add_argument("--pronunciation-backend", choices=["azure", "local", "hybrid"], default="azure")
+    parser.add_argument("--eval-batch", action="store_true", help="micro-batch Gemini evaluations across sessions")
+    parser.add_argument("--eval-batch-window-ms", type=int, default=50)
+    parser.add_argument("--eval-batch-size", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=1)
+
+    parser.add_argument("--stt-latency", type=float, default=0.4)
+    parser.add_argument("--azure-latency", type=float, default=0.3)
+    parser.add_argument("--azure-failure-rate", type=float, default=0.0)
+    parser.add_argument("--gemini-latency", type=float, default=0.8)
+    parser.add_argument("--gemini-error-rate", type=float, default=0.0)
+    parser.add_argument("--gemini-batch-drop-rate", type=float, default=0.0,
+                        help="chance that a batch response omits an item (forces single-call fallback)")
+    parser.add_argument("--pass-rate", type=float, default=0.7)
+    parser.add_argument("--tts-latency", type=float, default=0.3)
+    parser.add_argument("--tts-failure-rate", type=float, default=0.0)
+    parser.add_argument("--tts-backend", choices=["gtts", "local", "hedged"], default="gtts")
+    parser.add_argument("--tts-hedge-ms", type=int, default=800, help="start the local engine after this budget")
+    parser.add_argument("--local-tts-latency", type=float, default=0.1)
+
+    parser.add_argument("--out", help="write results JSON to this path")
+    parser.add_argument("--baseline", help="results JSON from an earlier run to compare against")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmark(args))
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\nResults saved: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
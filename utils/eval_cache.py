@@ -0,0 +1,210 @@
+# utils/eval_cache.py
+"""
+답변 평가 결과 캐시
+
+같은 카탈로그 질문에 대한 답("1395", "King Taejo" ...)은 정규화하면 거의 같으므로
+(키워드, 정규화된 답변, 발음 점수 구간, 재시도 횟수, 다음 키워드, 문화재) 가 같으면 Gemini 를 다시 부르지 않습니다.
+- TTL + LRU (항목 수 기준)
+- 완전 일치가 없으면 같은 그룹 안에서 difflib 유사도가 기준 이상인 답변을 사용
+- 프롬프트 버전이나 그룹 키 구성(CACHE_KEY_VERSION)이 바뀌면 이전 항목은 무시 (파일에서 읽을 때도 동일)
+- 선택적으로 JSON 파일에 저장/로드 (서버 시작/종료 시)
+"""
+import difflib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+FILLER_WORDS = {"um", "uh", "erm", "hmm", "the", "a", "an"}
+
+# group_key 구성을 바꾸면 올림 (저장된 파일의 이전 형식 항목을 읽지 않도록)
+CACHE_KEY_VERSION = 2
+
+
+def _versioned(version: str) -> str:
+    return f"{version}.k{CACHE_KEY_VERSION}"
+
+
+def normalize_answer(text: str) -> str:
+    """소문자, 문장부호 제거, 간투사/관사 제거, 공백 정리"""
+    words = _SPACES.sub(" ", _NON_WORD.sub(" ", (text or "").lower())).split()
+    return " ".join(w for w in words if w not in FILLER_WORDS)
+
+
+def answer_signature(answer: str, keyword: str) -> tuple:
+    """
+    유사 답변으로 인정하려면 같아야 하는 부분: 정답 키워드 포함 여부와 숫자 토큰
+    ("built in 1395" 와 "built in 1359" 는 문자열로는 비슷하지만 평가가 달라야 함)
+    """
+    return normalize_answer(keyword) in answer, tuple(sorted(w for w in answer.split() if any(c.isdigit() for c in w)))
+
+
+class EvaluationCache:
+    def __init__(self, max_entries: int = 20000, ttl_seconds: float = 7 * 24 * 3600,
+                 score_bucket: float = 10.0, similarity: float = 0.9, max_candidates: int = 64,
+                 path: Optional[str] = None, version: str = ""):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.score_bucket = score_bucket
+        self.similarity = similarity          # 1.0 이면 완전 일치만 사용
+        self.max_candidates = max_candidates  # 유사 답변 검색 시 그룹당 최근 항목 수
+        self.path = path
+        self.version = _versioned(version)
+
+        # (그룹 키, 정규화 답변) -> (저장 시각, 응답 dict). 순서 = LRU
+        self._entries = OrderedDict()
+        # 그룹 키 -> {정규화 답변: None} (유사 답변 검색용, 최근 순)
+        self._groups = {}
+        self._lock = threading.Lock()
+
+        self.stats = {"hits": 0, "similar_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0}
+
+    # -----------------------------------------------------------------
+    def group_key(self, req) -> tuple:
+        # 통합 모드 응답의 next_question 은 문화재 이름을 포함하므로 문화재별로 구분
+        return (
+            req.npc_persona,
+            req.target_keyword.lower(),
+            int(req.pronunciation_score // self.score_bucket),
+            req.retry_count,
+            (req.next_keyword or "").lower(),
+            req.heritage_name or "",
+        )
+
+    def _remove(self, key: tuple):
+        self._entries.pop(key, None)
+        group = self._groups.get(key[0])
+        if group is not None:
+            group.pop(key[1], None)
+            if not group:
+                del self._groups[key[0]]
+
+    def _lookup(self, key: tuple, now: float) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, response = entry
+        if now - stored_at > self.ttl_seconds:
+            self._remove(key)
+            self.stats["expired"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return response
+
+    def _find_similar(self, group: tuple, answer: str, now: float) -> Optional[dict]:
+        candidates = self._groups.get(group)
+        if not candidates or self.similarity >= 1.0:
+            return None
+
+        # 비교 대상(b)을 현재 답변으로 고정해 두면 difflib 이 b 의 색인을 한 번만 만듦
+        matcher = difflib.SequenceMatcher(None, "", answer, autojunk=False)
+        signature = answer_signature(answer, group[1])
+        best, best_ratio = None, self.similarity
+        for candidate in list(reversed(candidates))[:self.max_candidates]:
+            if answer_signature(candidate, group[1]) != signature:
+                continue
+            matcher.set_seq1(candidate)
+            # 상한값부터 확인하여 불필요한 전체 비교를 줄임
+            if matcher.real_quick_ratio() < best_ratio or matcher.quick_ratio() < best_ratio:
+                continue
+            ratio = matcher.ratio()
+            if ratio >= best_ratio:
+                best, best_ratio = candidate, ratio
+
+        if best is None:
+            return None
+        return self._lookup((group, best), now)
+
+    def get(self, req) -> Optional[dict]:
+        group, answer = self.group_key(req), normalize_answer(req.user_input)
+        now = time.time()
+        with self._lock:
+            response = self._lookup((group, answer), now)
+            if response is not None:
+                self.stats["hits"] += 1
+                return response
+
+            response = self._find_similar(group, answer, now)
+            if response is not None:
+                self.stats["similar_hits"] += 1
+                return response
+
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, req, response: dict):
+        self._store(self.group_key(req), normalize_answer(req.user_input), response, time.time())
+        self.stats["stores"] += 1
+
+    def _store(self, group: tuple, answer: str, response: dict, stored_at: float):
+        key = (group, answer)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (stored_at, response)
+            self._groups.setdefault(group, {})[answer] = None
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.stats["evictions"] += 1
+
+    def invalidate(self, version: Optional[str] = None):
+        """모든 항목을 버립니다. version 을 주면 이후 저장/로드에 새 버전을 사용합니다."""
+        with self._lock:
+            self._entries.clear()
+            self._groups.clear()
+            if version is not None:
+                self.version = _versioned(version)
+
+    # -----------------------------------------------------------------
+    # 파일 저장/로드 (블로킹, io 단계에서 호출)
+    # -----------------------------------------------------------------
+    def load(self) -> int:
+        if not self.path or not os.path.exists(self.path):
+            return 0
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[EvalCache] Failed to load {self.path}: {e}")
+            return 0
+
+        if data.get("version") != self.version:
+            print(f"[EvalCache] Prompt version changed. Ignoring {self.path}")
+            return 0
+
+        now = time.time()
+        loaded = 0
+        for item in data.get("entries", []):
+            if now - item["stored_at"] <= self.ttl_seconds:
+                self._store(tuple(item["group"]), item["answer"], item["response"], item["stored_at"])
+                loaded += 1
+        return loaded
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            entries = [
+                {"group": list(group), "answer": answer, "stored_at": stored_at, "response": response}
+                for (group, answer), (stored_at, response) in self._entries.items()
+            ]
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": self.version, "entries": entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def get_stats(self) -> dict:
+        hits = self.stats["hits"] + self.stats["similar_hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "size": len(self._entries),
+            "version": self.version,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+        }
@@ -0,0 +1,88 @@
+# utils/fake_gemini.py
+"""
+네트워크 없이 GeminiClient / gemini_service 를 실행하기 위한 가짜 모델
+
+    from services.gemini_service import set_gemini_model
+    from utils.fake_gemini import FakeGeminiModel
+
+    set_gemini_model(FakeGeminiModel(latency=0.8, error_rate=0.05))
+"""
+import asyncio
+import json
+import random
+import re
+import time
+from types import SimpleNamespace
+
+
+class FakeGeminiError(Exception):
+    pass
+
+
+class FakeGeminiModel:
+    def __init__(self, latency: float = 0.5, jitter: float = 0.1, error_rate: float = 0.0,
+                 hang_rate: float = 0.0, pass_rate: float = 0.7, batch_drop_rate: float = 0.0, seed: int = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate   # 예외를 발생시킬 확률
+        self.hang_rate = hang_rate     # 매우 느리게 응답할 확률 (타임아웃 확인용)
+        self.pass_rate = pass_rate     # 평가 요청에서 PASS 를 줄 확률
+        self.batch_drop_rate = batch_drop_rate   # 배치 응답에서 항목을 빠뜨릴 확률 (개별 호출 대체 확인용)
+        self.calls = 0
+        self._random = random.Random(seed)
+
+    def _delay(self) -> float:
+        if self._random.random() < self.hang_rate:
+            return 60.0
+        return max(0.0, self._random.gauss(self.latency, self.jitter))
+
+    def _respond(self, prompt: str) -> SimpleNamespace:
+        self.calls += 1
+        if self._random.random() < self.error_rate:
+            raise FakeGeminiError("Injected failure")
+        return SimpleNamespace(text=self.render(prompt))
+
+    def render(self, prompt: str) -> str:
+        if '"id"' in prompt and '"evaluation"' in prompt:
+            return json.dumps(self.render_batch_evaluation(prompt))
+        if '"evaluation"' in prompt:
+            return json.dumps(self.render_evaluation(prompt))
+
+        reference = re.search(r'Reference Question: "(.*)"', prompt)
+        keyword = re.search(r'about "(.*?)"', prompt)
+        if reference and reference.group(1):
+            return reference.group(1)
+        return f"Can you tell me about the {keyword.group(1) if keyword else 'place'}?"
+
+    def render_evaluation(self, prompt: str) -> dict:
+        passed = self._random.random() < self.pass_rate
+        # 통합 모드 프롬프트면 다음 키워드 질문도 채움
+        next_reference = re.search(r'Reference Question: "(.*)"', prompt)
+        return {
+            "evaluation": "PASS" if passed else "FAIL",
+            "reason": "fake model",
+            "reaction": "Exactly!" if passed else "Hmm...",
+            "next_question": next_reference.group(1) if next_reference else "",
+            "feedback_korean": "좋아요." if passed else "다시 한 번 말해 볼까요?",
+        }
+
+    def render_batch_evaluation(self, prompt: str) -> list:
+        """배치 평가 프롬프트: Request "ID": 블록마다 평가 하나 (drop_rate 만큼 항목 누락)"""
+        results = []
+        for request_id, block in re.findall(r'Request "(\w+)":(.*?)(?=Request "|Task \(for each)', prompt, re.S):
+            if self._random.random() < self.batch_drop_rate:
+                continue
+            next_reference = re.search(r'Next Reference Question: "(.*)"', block)
+            item = self.render_evaluation("")
+            item["id"] = request_id
+            item["next_question"] = next_reference.group(1) if next_reference else ""
+            results.append(item)
+        return results
+
+    def generate_content(self, prompt, **kwargs):
+        time.sleep(self._delay())
+        return self._respond(prompt)
+
+    async def generate_content_async(self, prompt, **kwargs):
+        await asyncio.sleep(self._delay())
+        return self._respond(prompt)
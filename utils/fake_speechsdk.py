@@ -0,0 +1,124 @@
+# utils/fake_speechsdk.py
+"""
+azure.cognitiveservices.speech 의 발음 평가에 쓰는 인터페이스만 흉내 낸 로컬 스텁
+
+    from services.azure_service import AzurePronunciationClient, set_azure_client
+    from utils import fake_speechsdk
+
+    fake_speechsdk.configure(latency=0.3, score=82.0, failure_rate=0.05)
+    set_azure_client(AzurePronunciationClient(key="stub", sdk=fake_speechsdk))
+"""
+import random
+import time
+from types import SimpleNamespace
+
+# 스텁 동작 설정 (configure 로 변경)
+PROFILE = {
+    "latency": 0.2,        # 평균 지연 (초)
+    "jitter": 0.05,        # 지연 편차 (초)
+    "score": 80.0,         # 평균 발음 점수
+    "score_spread": 10.0,  # 점수 편차
+    "failure_rate": 0.0,   # NoMatch 로 실패할 확률
+}
+
+
+def configure(**kwargs):
+    unknown = set(kwargs) - set(PROFILE)
+    if unknown:
+        raise ValueError(f"Unknown profile keys: {unknown}")
+    PROFILE.update(kwargs)
+
+
+class ResultReason:
+    RecognizedSpeech = "RecognizedSpeech"
+    NoMatch = "NoMatch"
+
+
+class PronunciationAssessmentGradingSystem:
+    HundredMark = "HundredMark"
+
+
+class PronunciationAssessmentGranularity:
+    Phoneme = "Phoneme"
+
+
+class SpeechConfig:
+    def __init__(self, subscription: str = "", region: str = ""):
+        self.subscription = subscription
+        self.region = region
+
+
+class _AudioStreamFormat:
+    def __init__(self, samples_per_second: int = 16000, bits_per_sample: int = 16, channels: int = 1):
+        self.samples_per_second = samples_per_second
+        self.bits_per_sample = bits_per_sample
+        self.channels = channels
+
+
+class _PushAudioInputStream:
+    def __init__(self, stream_format=None):
+        self.stream_format = stream_format
+        self.buffer = bytearray()
+        self.closed = False
+
+    def write(self, data: bytes):
+        self.buffer.extend(data)
+
+    def close(self):
+        self.closed = True
+
+
+class _AudioConfig:
+    def __init__(self, filename: str = None, stream=None):
+        self.filename = filename
+        self.stream = stream
+
+
+audio = SimpleNamespace(
+    AudioConfig=_AudioConfig,
+    AudioStreamFormat=_AudioStreamFormat,
+    PushAudioInputStream=_PushAudioInputStream,
+)
+
+
+class PronunciationAssessmentConfig:
+    def __init__(self, reference_text: str = "", grading_system=None, granularity=None):
+        self.reference_text = reference_text
+        self.grading_system = grading_system
+        self.granularity = granularity
+
+    def apply_to(self, recognizer):
+        recognizer.pronunciation_config = self
+
+
+class _RecognitionResult:
+    def __init__(self, reason, score: float, text: str):
+        self.reason = reason
+        self.text = text
+        self._score = score
+
+
+class SpeechRecognizer:
+    def __init__(self, speech_config=None, audio_config=None):
+        self.speech_config = speech_config
+        self.audio_config = audio_config
+        self.pronunciation_config = None
+
+    def recognize_once(self):
+        delay = max(0.0, random.gauss(PROFILE["latency"], PROFILE["jitter"]))
+        time.sleep(delay)
+
+        reference = self.pronunciation_config.reference_text if self.pronunciation_config else ""
+        if random.random() < PROFILE["failure_rate"]:
+            return _RecognitionResult(ResultReason.NoMatch, 0.0, "")
+
+        score = min(100.0, max(0.0, random.gauss(PROFILE["score"], PROFILE["score_spread"])))
+        return _RecognitionResult(ResultReason.RecognizedSpeech, round(score, 1), reference)
+
+
+class PronunciationAssessmentResult:
+    def __init__(self, result):
+        self.pronunciation_score = result._score
+        self.accuracy_score = result._score
+        self.fluency_score = result._score
+        self.completeness_score = 100.0
@@ -0,0 +1,40 @@
+# utils/fake_tts.py
+"""
+네트워크 없이 tts_service 를 실행하기 위한 가짜 합성기
+
+    from services.tts_service import set_tts_synthesizer
+    from utils.fake_tts import FakeTTS
+
+    set_tts_synthesizer(FakeTTS(latency=0.4, failure_rate=0.02))
+"""
+import hashlib
+import random
+import time
+
+
+class FakeTTSError(Exception):
+    pass
+
+
+class FakeTTS:
+    def __init__(self, latency: float = 0.3, jitter: float = 0.05, per_char: float = 0.002,
+                 failure_rate: float = 0.0, bytes_per_char: int = 120, seed: int = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.per_char = per_char               # 글자 수에 비례하는 추가 지연 (초)
+        self.failure_rate = failure_rate
+        self.bytes_per_char = bytes_per_char   # 실제 gTTS MP3 크기와 비슷하게 맞추기 위함
+        self.calls = 0
+        self._random = random.Random(seed)
+
+    def __call__(self, text: str, lang: str = "en") -> bytes:
+        self.calls += 1
+        delay = self._random.gauss(self.latency, self.jitter) + self.per_char * len(text)
+        time.sleep(max(0.0, delay))
+        if self._random.random() < self.failure_rate:
+            raise FakeTTSError("Injected failure")
+
+        # 내용에 따라 결정되는 더미 바이트 (MP3 프레임 헤더 흉내)
+        seed = hashlib.sha256(f"{lang}\n{text}".encode("utf-8")).digest()
+        size = max(len(seed), len(text) * self.bytes_per_char)
+        return b"\xff\xfb" + (seed * (size // len(seed) + 1))[:size]
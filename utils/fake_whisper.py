@@ -0,0 +1,50 @@
+# utils/fake_whisper.py
+"""
+Whisper 모델 로드/추론 없이 stt_service 를 실행하기 위한 가짜 모델
+
+    from services.stt_service import set_whisper_model
+    from utils.fake_whisper import FakeWhisperModel
+
+    set_whisper_model(FakeWhisperModel(latency=0.6, texts=["It was built in 1395."]))
+"""
+import math
+import random
+import time
+
+DEFAULT_TEXTS = [
+    "I think it was built in 1395.",
+    "King Taejo built it.",
+    "It is the main gate of the palace.",
+    "I don't know.",
+]
+
+
+class FakeWhisperModel:
+    def __init__(self, latency: float = 0.5, jitter: float = 0.1, per_second: float = 0.0,
+                 texts: list = None, seed: int = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.per_second = per_second   # 음성 길이(초)에 비례하는 추가 지연
+        self.texts = texts or DEFAULT_TEXTS
+        self.calls = 0
+        self._random = random.Random(seed)
+
+    def transcribe(self, audio, word_timestamps: bool = False, **kwargs) -> dict:
+        self.calls += 1
+        duration = len(audio) / 16000 if hasattr(audio, "__len__") and not isinstance(audio, str) else 0.0
+        time.sleep(max(0.0, self._random.gauss(self.latency, self.jitter) + self.per_second * duration))
+
+        # 발화마다 "또렷함"을 하나 뽑아 세그먼트/단어 신뢰도를 그 근처로 생성 (로컬 발음 점수 확인용)
+        text = self._random.choice(self.texts)
+        clarity = self._random.uniform(0.4, 1.0)
+        words = [
+            {"word": " " + w, "probability": min(1.0, max(0.0, self._random.gauss(clarity, 0.1)))}
+            for w in text.split()
+        ]
+        segment = {
+            "text": " " + text,
+            "avg_logprob": math.log(max(clarity - 0.05, 0.01)),
+            "no_speech_prob": self._random.uniform(0.0, 0.1),
+            "words": words if word_timestamps else [],
+        }
+        return {"text": " " + text, "segments": [segment]}
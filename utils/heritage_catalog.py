@@ -0,0 +1,29 @@
+import json
+from pathlib import Path
+
+file_path = Path(__file__).resolve()
+
+heritage_json_path = file_path.parent.parent / "models" / "heritage_data.json"
+
+
+def load_heritage_catalog(path=heritage_json_path) -> dict:
+    """
+    heritage_data.json 을 {문화재 이름: [(키워드, 예시 질문), ...]} 형태로 읽습니다.
+
+    키워드 항목은 {"era": "1395", "sample_question": "..."} 처럼
+    sample_question 외의 키 하나에 키워드 값이 들어 있습니다.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+
+    catalog = {}
+    for heritage_name, info in raw.items():
+        keywords = []
+        for item in info.get("keywords", []):
+            sample_q = item.get("sample_question", "")
+            for key, value in item.items():
+                if key != "sample_question" and value:
+                    keywords.append((str(value), sample_q))
+        catalog[heritage_name] = keywords
+
+    return catalog
@@ -0,0 +1,82 @@
+# utils/json_delta.py
+"""
+JSON Patch(RFC 6902) 형식의 간단한 차이(delta) 계산/적용
+
+GameState 응답에서 전체 상태 대신 바뀐 부분만 보내기 위해 사용합니다.
+chat_history 처럼 뒤에 추가만 되는 리스트는 "add .../-" 연산으로 표현됩니다.
+"""
+
+
+def _escape(key) -> str:
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def make_patch(old, new, path: str = "") -> list:
+    if type(old) is not type(new):
+        return [{"op": "replace", "path": path, "value": new}]
+
+    if isinstance(old, dict):
+        ops = []
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": child, "value": value})
+            else:
+                ops.extend(make_patch(old[key], value, child))
+        return ops
+
+    if isinstance(old, list):
+        common = min(len(old), len(new))
+        ops = []
+        for i in range(common):
+            ops.extend(make_patch(old[i], new[i], f"{path}/{i}"))
+
+        if len(new) > len(old):
+            ops.extend({"op": "add", "path": f"{path}/-", "value": v} for v in new[common:])
+        elif len(new) < len(old):
+            # 뒤에서부터 지워야 인덱스가 어긋나지 않음
+            ops.extend({"op": "remove", "path": f"{path}/{i}"} for i in range(len(old) - 1, common - 1, -1))
+
+        # 대부분 바뀐 리스트는 통째로 교체하는 편이 더 작음
+        if len(ops) > max(1, len(new)):
+            return [{"op": "replace", "path": path, "value": new}]
+        return ops
+
+    if old != new:
+        return [{"op": "replace", "path": path, "value": new}]
+    return []
+
+
+def apply_patch(doc, ops: list):
+    """make_patch 결과를 적용합니다. (클라이언트 구현 참고용 / 검증용)"""
+    for op in ops:
+        if op["path"] == "":
+            doc = op["value"]
+            continue
+
+        tokens = [_unescape(t) for t in op["path"].split("/")[1:]]
+        parent = doc
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+
+        last = tokens[-1]
+        if isinstance(parent, list):
+            if op["op"] == "add":
+                parent.insert(len(parent) if last == "-" else int(last), op["value"])
+            elif op["op"] == "replace":
+                parent[int(last)] = op["value"]
+            else:
+                del parent[int(last)]
+        else:
+            if op["op"] == "remove":
+                del parent[last]
+            else:
+                parent[last] = op["value"]
+    return doc
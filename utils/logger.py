@@ -1,27 +1,165 @@
+import json
 import os
+import queue
+import re
+import threading
+import time
 from datetime import datetime
 from models.data_models import GameState
 
-# 로그 저장 경로
+# 로그 저장 경로 (폴더는 처음 기록할 때 생성)
 LOG_DIR = "logs/user_speech"
 
-# 폴더가 없으면 생성
-if not os.path.exists(LOG_DIR):
-    os.makedirs(LOG_DIR)
+# 기록 형식: "text" (기존 한 줄 텍스트), "jsonl" (오프라인 분석용 구조화 로그)
+LOG_FORMATS = ("text", "jsonl")
+LOG_BATCH_SIZE = 100          # 이만큼 쌓이면 바로 기록
+LOG_FLUSH_INTERVAL = 2.0      # 초, 쌓인 게 적어도 이 간격마다 기록
+LOG_MAX_FILE_BYTES = 10 * 1024 * 1024  # 파일이 이 크기를 넘으면 같은 날짜 안에서 .1, .2 ... 로 교체
+LOG_QUEUE_MAX = 10000         # 큐가 가득 차면 기록을 버림 (요청 경로를 막지 않음)
+
+_FILE_SUFFIX = {"text": ".txt", "jsonl": ".jsonl"}
+
+
+def _safe_name(name: str) -> str:
+    return re.sub(r"[^\w.-]", "_", name) or "_"
+
+
+def format_text_line(record: dict) -> str:
+    return (
+        f"[{record['time']}] "
+        f"Heritage: {record['heritage']} | "
+        f"Target: {record['target_keyword']} | "
+        f"Score: {record['score']:.1f} | "
+        f"Say: \"{record['text']}\"\n"
+    )
+
+
+def format_jsonl_line(record: dict) -> str:
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+_FORMATTERS = {"text": format_text_line, "jsonl": format_jsonl_line}
+
+
+class UtteranceLogSink:
+    """
+    발화 로그를 메모리 큐에 모았다가 백그라운드 스레드에서 파일에 한꺼번에 기록합니다.
+    - 크기(LOG_BATCH_SIZE) 또는 시간(LOG_FLUSH_INTERVAL) 기준으로 flush
+    - 날짜별 파일 + 크기 초과 시 순번 파일로 교체
+    """
+
+    def __init__(self, log_dir: str = LOG_DIR, formats=LOG_FORMATS, batch_size: int = LOG_BATCH_SIZE,
+                 flush_interval: float = LOG_FLUSH_INTERVAL, max_file_bytes: int = LOG_MAX_FILE_BYTES,
+                 queue_max: int = LOG_QUEUE_MAX):
+        self.log_dir = log_dir
+        self.formats = tuple(formats)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_file_bytes = max_file_bytes
+        self._queue = queue.Queue(maxsize=queue_max)
+        self._thread = None
+        self._lock = threading.Lock()
+        # (player, date, format) -> 현재 파일 순번
+        self._part = {}
+
+        self.stats = {"enqueued": 0, "dropped": 0, "written": 0, "flushes": 0, "rotations": 0, "errors": 0}
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="utterance-log", daemon=True)
+                self._thread.start()
+
+    def write(self, record: dict):
+        """요청 경로에서 호출 (블로킹 없음)"""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(record)
+            self.stats["enqueued"] += 1
+        except queue.Full:
+            self.stats["dropped"] += 1
+
+    def _path_for(self, player: str, date: str, fmt: str, incoming: int) -> str:
+        key = (player, date, fmt)
+        part = self._part.get(key, 0)
+        while True:
+            suffix = f".{part}" if part else ""
+            path = os.path.join(self.log_dir, f"{player}_{date}{suffix}{_FILE_SUFFIX[fmt]}")
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            if size == 0 or size + incoming <= self.max_file_bytes:
+                break
+            part += 1
+            self.stats["rotations"] += 1
+        self._part[key] = part
+        return path
+
+    def _flush(self, batch: list):
+        grouped = {}
+        for record in batch:
+            for fmt in self.formats:
+                key = (_safe_name(record["player"]), record["date"], fmt)
+                grouped.setdefault(key, []).append(_FORMATTERS[fmt](record))
+
+        for (player, date, fmt), lines in grouped.items():
+            data = "".join(lines)
+            try:
+                os.makedirs(self.log_dir, exist_ok=True)
+                path = self._path_for(player, date, fmt, len(data.encode("utf-8")))
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write(data)
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"[Logger Error] Failed to save log: {e}")
+        self.stats["written"] += len(batch)
+        self.stats["flushes"] += 1
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1] is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            stop = batch[-1] is None
+            records = [r for r in batch if r is not None]
+            if records:
+                self._flush(records)
+            if stop:
+                return
+
+    def close(self, timeout: float = 5.0):
+        """남은 로그를 모두 기록하고 스레드를 종료합니다. (서버 종료 시 호출)"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(None)
+        thread.join(timeout)
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "queue_depth": self._queue.qsize()}
+
+
+UTTERANCE_LOG = UtteranceLogSink()
 
 
 def log_valid_utterance(game_state: GameState, user_text: str, score: float):
     """
-    유효한 유저 발화를 텍스트 파일에 기록합니다.
+    유효한 유저 발화를 로그 큐에 넣습니다. (파일 기록은 백그라운드 스레드에서 처리)
     """
-    # 1. 파일명 생성 (플레이어 이름_날짜.txt)
+    # 1. 플레이어 이름 (파일명: 플레이어 이름_날짜)
     player_name = "Player"
     if game_state.player_info and game_state.player_info.name:
         player_name = game_state.player_info.name
 
-    today = datetime.now().strftime("%Y-%m-%d")
-    filename = f"{LOG_DIR}/{player_name}_{today}.txt"
-
     # 2. 현재 문맥 정보 가져오기
     current_heritage_name = "Unknown"
     target_keyword = "None"
@@ -34,20 +172,21 @@ def log_valid_utterance(game_state: GameState, user_text: str, score: float):
         if target_obj:
             target_keyword = target_obj.keyword
 
-    # 3. 로그 내용 포맷팅
-    timestamp = datetime.now().strftime("%H:%M:%S")
-    log_line = (
-        f"[{timestamp}] "
-        f"Heritage: {current_heritage_name} | "
-        f"Target: {target_keyword} | "
-        f"Score: {score:.1f} | "
-        f"Say: \"{user_text}\"\n"
-    )
+    # 3. 로그 레코드 (형식별 변환은 sink 에서)
+    now = datetime.now()
+    UTTERANCE_LOG.write({
+        "ts": now.isoformat(timespec="milliseconds"),
+        "date": now.strftime("%Y-%m-%d"),
+        "time": now.strftime("%H:%M:%S"),
+        "player": player_name,
+        "save_slot": game_state.save_slot_name,
+        "heritage": current_heritage_name,
+        "target_keyword": target_keyword,
+        "retry_count": game_state.retry_count,
+        "score": float(score),
+        "text": user_text,
+    })
+
 
-    # 4. 파일에 추가 (Append 모드)
-    try:
-        with open(filename, "a", encoding="utf-8") as f:
-            f.write(log_line)
-        print(f"[Logger] Saved utterance: {user_text}")
-    except Exception as e:
-        print(f"[Logger Error] Failed to save log: {e}")
\ No newline at end of file
+def get_utterance_log_stats() -> dict:
+    return UTTERANCE_LOG.get_stats()
@@ -0,0 +1,229 @@
+# utils/metrics.py
+"""
+단계별 지연 시간 계측 (Prometheus 텍스트 형식 /metrics + Server-Timing 헤더)
+
+    from utils.metrics import span
+
+    with span("stt"):
+        text = await transcribe_audio(audio)
+
+span 은 다음을 기록합니다.
+- heritage_stage_duration_seconds{stage}  히스토그램
+- heritage_stage_errors_total{stage}      예외 또는 count_error() 로 보고된 실패 수
+- heritage_stage_in_flight{stage}         현재 실행 중인 수
+- 현재 요청의 Server-Timing 목록 (main 의 미들웨어가 응답 헤더로 변환)
+"""
+import contextvars
+import math
+import threading
+import time
+from functools import wraps
+
+# 초 단위 히스토그램 버킷 (STT/Gemini 처럼 수 초 걸리는 단계까지 포함)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# 현재 요청에서 측정된 (단계, ms) 목록. 미들웨어가 요청마다 새 리스트를 넣음
+_request_timings: contextvars.ContextVar = contextvars.ContextVar("request_timings", default=None)
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{str(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(n, "") for n in self.labelnames)
+
+    def header(self) -> list:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> list:
+        lines = self.header()
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), callback=None):
+        """callback 을 주면 값을 저장하지 않고 렌더링할 때 {labels 튜플: 값} 을 받아옴"""
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+        self._callback = callback
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def render(self) -> list:
+        lines = self.header()
+        values = self._callback() if self._callback is not None else self._values
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # key -> [버킷별 개수..., 합계, 개수]
+        self._values = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[i] += 1
+                    break
+            row[-2] += value
+            row[-1] += 1
+
+    def render(self) -> list:
+        lines = self.header()
+        for key, row in sorted(self._values.items()):
+            cumulative = 0
+            for i, bound in enumerate(self.buckets):
+                cumulative += row[i]
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(row[-2])}")
+            lines.append(f"{self.name}_count{labels} {row[-1]}")
+        return lines
+
+
+REGISTRY = []
+
+STAGE_DURATION = Histogram("heritage_stage_duration_seconds", "Time spent in each turn pipeline stage.", ("stage",))
+STAGE_ERRORS = Counter("heritage_stage_errors_total", "Failed or fallen-back stage calls.", ("stage",))
+STAGE_IN_FLIGHT = Gauge("heritage_stage_in_flight", "Stage calls currently running.", ("stage",))
+
+HTTP_DURATION = Histogram("heritage_http_request_duration_seconds", "HTTP request latency.", ("method", "path"))
+HTTP_REQUESTS = Counter("heritage_http_requests_total", "HTTP requests by status code.", ("method", "path", "status"))
+HTTP_IN_FLIGHT = Gauge("heritage_http_requests_in_flight", "HTTP requests currently being handled.")
+
+
+class span:
+    """
+    단계 하나의 실행 시간을 측정합니다. with 블록 또는 async 함수 데코레이터로 사용합니다.
+        with span("azure"): ...
+        @span("gemini_eval")
+        async def evaluate(...): ...
+    """
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self._started = None
+
+    def __enter__(self):
+        STAGE_IN_FLIGHT.inc(stage=self.stage)
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self._started
+        STAGE_IN_FLIGHT.dec(stage=self.stage)
+        STAGE_DURATION.observe(elapsed, stage=self.stage)
+        if exc_type is not None:
+            STAGE_ERRORS.inc(stage=self.stage)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((self.stage, elapsed * 1000))
+        return False
+
+    def __call__(self, fn):
+        stage = self.stage
+
+        @wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with span(stage):
+                return await fn(*args, **kwargs)
+
+        return wrapper
+
+
+def count_error(stage: str):
+    """예외를 삼키고 대체 값으로 넘어가는 단계에서 실패를 기록합니다."""
+    STAGE_ERRORS.inc(stage=stage)
+
+
+def begin_request_timings() -> list:
+    """요청 시작 시 호출 (미들웨어). 이후 span 들이 반환된 리스트에 기록됨"""
+    timings = []
+    _request_timings.set(timings)
+    return timings
+
+
+def current_request_timings() -> list:
+    """현재 요청의 단계 시간 목록 (스트리밍 응답처럼 헤더를 보낸 뒤에도 계속 기록하는 경우)"""
+    timings = _request_timings.get()
+    return timings if timings is not None else begin_request_timings()
+
+
+def format_server_timing(timings: list, total_ms: float = None) -> str:
+    """같은 단계가 여러 번 실행되면 합산하여 Server-Timing 헤더 값으로 만듭니다."""
+    merged = {}
+    for stage, ms in timings:
+        merged[stage] = merged.get(stage, 0.0) + ms
+    parts = [f"{stage};dur={ms:.1f}" for stage, ms in merged.items()]
+    if total_ms is not None:
+        parts.append(f"total;dur={total_ms:.1f}")
+    return ", ".join(parts)
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,158 @@
+# utils/pregenerate_openings.py
+"""
+오프닝 질문 사전 생성 작업 (오프라인 CLI)
+
+heritage_data.json 의 (문화재, 키워드, 예시 질문) 마다 질문 변형 N개를 Gemini로 만들고,
+문장 단위 MP3를 합성하여 버전별 번들로 저장합니다.
+
+    python -m utils.pregenerate_openings --variants 3 --out assets/opening_pack
+
+서버는 시작 시 OPENING_PACK_DIR/CURRENT 가 가리키는 번들을 읽어 사용합니다.
+생성에 실패한 키워드나 키워드가 없는 문화재가 있으면 번들은 저장하지만 CURRENT 는 바꾸지 않고
+종료 코드 1로 끝냅니다.
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+from datetime import datetime
+
+from services.gemini_service import build_opening_prompt, init_gemini
+from services.opening_pack import OPENING_PACK_DIR
+from services.tts_service import split_sentences, blocking_generate_mp3_bytes
+from utils.audio_cache import audio_cache_key
+from utils.heritage_catalog import load_heritage_catalog, heritage_json_path
+
+DEFAULT_PERSONA = "Foreign Friend"
+
+
+def generate_variants(persona, heritage, keyword, sample_q, count: int, max_attempts: int) -> list:
+    """
+    중복을 제외한 질문 변형을 최대 count개 생성합니다.
+    실시간 경로(blocking_generate_opening)와 달리 실패 시 예시 질문으로 대체하지 않고 예외를 그대로 올립니다.
+    """
+    model = init_gemini().model
+    prompt = build_opening_prompt(persona, heritage, keyword, sample_q)
+    variants = []
+    for _ in range(max_attempts):
+        if len(variants) >= count:
+            break
+        question = model.generate_content(prompt).text.strip()
+        if not question:
+            raise ValueError("Empty response from model")
+        if question not in variants:
+            variants.append(question)
+    return variants
+
+
+def synthesize_sentences(text: str, audio_dir: str, lang: str) -> int:
+    """질문의 각 문장을 TTS 캐시와 같은 키 구조로 저장합니다. 새로 저장한 파일 수를 반환합니다."""
+    written = 0
+    for sentence in split_sentences(text):
+        key = audio_cache_key(sentence, lang)
+        path = os.path.join(audio_dir, key[:2], key + ".mp3")
+        if os.path.exists(path):
+            continue
+
+        mp3_bytes = blocking_generate_mp3_bytes(sentence, lang)
+        if not mp3_bytes:
+            print(f"  [WARN] TTS failed: {sentence}")
+            continue
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(mp3_bytes)
+        written += 1
+    return written
+
+
+def build_pack(out_dir: str, variants: int, persona: str, lang: str, catalog_path) -> tuple:
+    """
+    번들을 만들고 (번들 경로, 문제 목록)을 반환합니다.
+    문제 목록이 비어 있을 때만 CURRENT 를 새 번들로 교체합니다.
+    """
+    catalog = load_heritage_catalog(catalog_path)
+
+    staging_dir = os.path.join(out_dir, f".staging_{os.getpid()}")
+    audio_dir = os.path.join(staging_dir, "audio")
+    os.makedirs(audio_dir, exist_ok=True)
+
+    entries = []
+    problems = []
+    for heritage, keywords in catalog.items():
+        if not keywords:
+            print(f"[{heritage}] [WARN] No keywords")
+            problems.append(f"{heritage}: no keywords")
+            continue
+
+        for keyword, sample_q in keywords:
+            print(f"[{heritage}] {keyword}")
+            try:
+                texts = generate_variants(persona, heritage, keyword, sample_q, variants, variants * 2)
+            except Exception as e:
+                print(f"  [ERROR] Generation failed: {e}")
+                problems.append(f"{heritage} / {keyword}: {e}")
+                continue
+            if len(texts) < variants:
+                print(f"  [WARN] Only {len(texts)}/{variants} distinct variants")
+            audio_count = sum(synthesize_sentences(t, audio_dir, lang) for t in texts)
+            print(f"  -> {len(texts)} variants, {audio_count} audio files")
+
+            entries.append({
+                "persona": persona,
+                "heritage": heritage,
+                "keyword": keyword,
+                "sample_question": sample_q,
+                "variants": texts,
+            })
+
+    content_hash = hashlib.sha256(json.dumps(entries, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+    version = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}-{content_hash[:8]}"
+
+    manifest = {
+        "version": version,
+        "created_at": str(datetime.now()),
+        "lang": lang,
+        "entries": entries,
+    }
+    with open(os.path.join(staging_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=4)
+
+    bundle_dir = os.path.join(out_dir, version)
+    shutil.move(staging_dir, bundle_dir)
+
+    # 빠진 항목이 있는 번들은 서버가 읽지 않도록 CURRENT 를 그대로 둠 (재생성 또는 수동 확인용으로만 보관)
+    if problems:
+        return bundle_dir, problems
+
+    # 번들 생성이 끝난 뒤에 CURRENT 를 교체하여 서버가 미완성 번들을 읽지 않도록 함
+    current_tmp = os.path.join(out_dir, "CURRENT.tmp")
+    with open(current_tmp, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(current_tmp, os.path.join(out_dir, "CURRENT"))
+
+    return bundle_dir, problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generate opening questions and their audio.")
+    parser.add_argument("--variants", type=int, default=3, help="질문 변형 개수 (키워드당)")
+    parser.add_argument("--out", default=OPENING_PACK_DIR, help="번들 저장 폴더")
+    parser.add_argument("--persona", default=DEFAULT_PERSONA)
+    parser.add_argument("--lang", default="en")
+    parser.add_argument("--catalog", default=str(heritage_json_path))
+    args = parser.parse_args()
+
+    bundle_dir, problems = build_pack(args.out, args.variants, args.persona, args.lang, args.catalog)
+    if problems:
+        print(f"Bundle incomplete ({len(problems)} problems). CURRENT not updated: {bundle_dir}")
+        for problem in problems:
+            print(f"  - {problem}")
+        sys.exit(1)
+    print(f"Bundle saved: {bundle_dir}")
+
+
+if __name__ == "__main__":
+    main()
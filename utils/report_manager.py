@@ -1,29 +1,334 @@
+import argparse
+import asyncio
+import gzip
 import json
 import os
+import re
+import shutil
+import time
 from datetime import datetime
+from functools import partial
 from models.data_models import GameState
+from services.scheduler import run_in_stage
 
-REPORT_DIR = "reports"
+REPORT_DIR = "reports"   # 폴더는 처음 기록할 때 생성
 
-if not os.path.exists(REPORT_DIR):
-    os.makedirs(REPORT_DIR)
+# 대화 이벤트를 세션/문화재별 JSONL 세그먼트로 이어 쓰는 백그라운드 리포트 설정
+REPORT_SEGMENT_DIR = os.path.join(REPORT_DIR, "segments")
+REPORT_COMPRESS = False          # True면 .jsonl.gz (gzip 멤버를 이어 붙이는 방식)
+REPORT_EXPORT_ON_COMPLETE = True  # 문화재 완료 시 기존 형식의 리포트도 자동 생성
+REPORT_BATCH_SIZE = 64
+REPORT_FLUSH_INTERVAL = 1.0
+# 완료되지 않은 채 남은 세그먼트 디렉터리 정리 (세션 만료/이탈 등)
+REPORT_SEGMENT_MAX_AGE_SECONDS = 7 * 24 * 3600
+REPORT_GC_INTERVAL = 3600.0
 
 
 def save_heritage_report(game_state: GameState, heritage_name: str):
     """
     문화재 투어가 종료되면 대화 기록과 평가 로그를 JSON으로 저장합니다.
     """
-    filename = f"{REPORT_DIR}/{heritage_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    return write_report(
+        heritage_name,
+        [msg.model_dump() for msg in game_state.chat_history],
+        [log.model_dump() for log in game_state.evaluation_logs]
+    )
 
+
+def _create_report_file(heritage_name: str, session_key: str = None):
+    """
+    같은 초에 같은 문화재를 끝낸 플레이어끼리 덮어쓰지 않도록 세션 키를 이름에 넣고,
+    그래도 겹치면 번호를 붙여 배타적으로 생성합니다.
+    """
+    stem = f"{REPORT_DIR}/{heritage_name}"
+    if session_key:
+        stem += f"_{_safe_name(session_key)}"
+    stem += f"_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    attempt = 0
+    while True:
+        filename = f"{stem}.json" if attempt == 0 else f"{stem}_{attempt}.json"
+        try:
+            return filename, open(filename, "x", encoding="utf-8")
+        except FileExistsError:
+            attempt += 1
+
+
+def write_report(heritage_name: str, chat_history: list, evaluations: list, completion_time: str = None,
+                 session_key: str = None):
     report_data = {
         "heritage_name": heritage_name,
-        "completion_time": str(datetime.now()),
-        "chat_history": [msg.model_dump() for msg in game_state.chat_history],
-        "evaluations": [log.model_dump() for log in game_state.evaluation_logs]
+        "completion_time": completion_time or str(datetime.now()),
+        "chat_history": chat_history,
+        "evaluations": evaluations
     }
 
-    with open(filename, "w", encoding="utf-8") as f:
+    filename, f = _create_report_file(heritage_name, session_key)
+    with f:
         json.dump(report_data, f, ensure_ascii=False, indent=4)
 
     print(f"Report saved: {filename}")
-    return filename
\ No newline at end of file
+    return filename
+
+
+# =================================================================
+# 세그먼트 경로 / 읽기 / 내보내기
+# =================================================================
+def _safe_name(name: str) -> str:
+    return re.sub(r"[^\w.-]", "_", name) or "_"
+
+
+def segment_path(session_key: str, heritage_name: str, compress: bool = REPORT_COMPRESS) -> str:
+    suffix = ".jsonl.gz" if compress else ".jsonl"
+    return os.path.join(REPORT_SEGMENT_DIR, _safe_name(session_key), _safe_name(heritage_name) + suffix)
+
+
+def _append_lines(path: str, lines: list):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    data = "".join(lines).encode("utf-8")
+    if path.endswith(".gz"):
+        with open(path, "ab") as f:
+            f.write(gzip.compress(data))
+    else:
+        with open(path, "ab") as f:
+            f.write(data)
+
+
+def read_segment_events(session_key: str, heritage_name: str) -> list:
+    events = []
+    for compress in (False, True):
+        path = segment_path(session_key, heritage_name, compress)
+        if not os.path.exists(path):
+            continue
+        opener = gzip.open if compress else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            events.extend(json.loads(line) for line in f if line.strip())
+    events.sort(key=lambda e: (e.get("ts", ""), e.get("seq", 0)))
+    return events
+
+
+def remove_segments(session_key: str, heritage_name: str):
+    for compress in (False, True):
+        path = segment_path(session_key, heritage_name, compress)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def gc_segments(max_age: float = REPORT_SEGMENT_MAX_AGE_SECONDS) -> int:
+    """마지막 기록 후 max_age 초가 지난 세션 세그먼트 디렉터리를 지웁니다. (지운 디렉터리 수)"""
+    if not os.path.isdir(REPORT_SEGMENT_DIR):
+        return 0
+    cutoff = time.time() - max_age
+    removed = 0
+    for name in os.listdir(REPORT_SEGMENT_DIR):
+        session_dir = os.path.join(REPORT_SEGMENT_DIR, name)
+        if not os.path.isdir(session_dir):
+            continue
+        paths = [os.path.join(session_dir, f) for f in os.listdir(session_dir)]
+        if max((os.path.getmtime(p) for p in paths), default=os.path.getmtime(session_dir)) < cutoff:
+            shutil.rmtree(session_dir, ignore_errors=True)
+            removed += 1
+    return removed
+
+
+def _write_models_report(heritage_name: str, chat_history: list, evaluations: list, completion_time: str,
+                         session_key: str) -> str:
+    # pydantic 모델 → dict 변환도 요청 처리 경로가 아닌 작성기에서
+    return write_report(heritage_name, [m.model_dump() for m in chat_history], [e.model_dump() for e in evaluations],
+                        completion_time, session_key)
+
+
+def export_report(session_key: str, heritage_name: str, rotate: bool = False) -> str:
+    """
+    세그먼트 이벤트로 기존 형식(save_heritage_report)의 리포트를 만듭니다.
+    rotate=True 면 내보낸 뒤 세그먼트를 지워, 같은 키로 다시 플레이할 때 이전 기록이 섞이지 않게 합니다.
+    """
+    chat_history, evaluations, completion_time = [], [], None
+    for event in read_segment_events(session_key, heritage_name):
+        chat_history.extend(event.get("messages", []))
+        if event.get("evaluation"):
+            evaluations.append(event["evaluation"])
+        if event.get("type") == "complete":
+            completion_time = event.get("ts")
+    filename = write_report(heritage_name, chat_history, evaluations, completion_time, session_key)
+    if rotate:
+        remove_segments(session_key, heritage_name)
+    return filename
+
+
+# =================================================================
+# 백그라운드 리포트 작성기
+# 핸들러는 enqueue 만 하고, 디스크 쓰기는 작성기 태스크가 모아서 처리
+# =================================================================
+class ReportWriter:
+    def __init__(self, compress: bool = REPORT_COMPRESS, batch_size: int = REPORT_BATCH_SIZE,
+                 flush_interval: float = REPORT_FLUSH_INTERVAL, run_blocking=None):
+        self.compress = compress
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # 블로킹 파일 쓰기를 실행할 함수 (기본: io 단계 스레드 풀)
+        self._run_blocking = run_blocking or partial(run_in_stage, "io")
+        self._queue: asyncio.Queue = None
+        self._task: asyncio.Task = None
+        self._seq = 0
+
+        self._last_gc = 0.0
+
+        self.stats = {"enqueued": 0, "written": 0, "flushes": 0, "exports": 0, "gc_removed": 0, "errors": 0}
+
+    def start(self):
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    def enqueue(self, session_key: str, heritage_name: str, event_type: str, **fields):
+        self.start()
+        self._seq += 1
+        event = {
+            "seq": self._seq,
+            "ts": str(datetime.now()),
+            "type": event_type,
+            "session": session_key,
+            "heritage": heritage_name,
+            **fields,
+        }
+        self._queue.put_nowait(event)
+        self.stats["enqueued"] += 1
+
+    def record_messages(self, session_key: str, heritage_name: str, messages: list, evaluation: dict = None):
+        fields = {"messages": messages}
+        if evaluation is not None:
+            fields["evaluation"] = evaluation
+        self.enqueue(session_key, heritage_name, "turn", **fields)
+
+    def record_complete(self, session_key: str, heritage_name: str):
+        self.enqueue(session_key, heritage_name, "complete")
+
+    def record_report(self, session_key: str, heritage_name: str, chat_history: list, evaluations: list):
+        """세그먼트 없이 전체 대화(ChatMessage/EvaluationLog 목록)로 바로 리포트 작성 (stateless 모드)"""
+        self.enqueue(session_key, heritage_name, "report", chat_history=chat_history, evaluations=evaluations)
+
+    async def _collect(self) -> list:
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.batch_size and batch[-1] is not None:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _flush(self, events: list):
+        grouped = {}
+        for event in events:
+            if event["type"] == "report":
+                continue
+            path = segment_path(event["session"], event["heritage"], self.compress)
+            grouped.setdefault(path, []).append(json.dumps(event, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+        for path, lines in grouped.items():
+            try:
+                await self._run_blocking(_append_lines, path, lines)
+                self.stats["written"] += len(lines)
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"[ReportWriter] Failed to write {path}: {e}")
+        self.stats["flushes"] += 1
+
+        for event in events:
+            if event["type"] != "report":
+                continue
+            try:
+                await self._run_blocking(_write_models_report, event["heritage"], event["chat_history"],
+                                         event["evaluations"], event["ts"], event["session"])
+                self.stats["exports"] += 1
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"[ReportWriter] Failed to write report: {e}")
+
+        if REPORT_EXPORT_ON_COMPLETE:
+            for event in events:
+                if event["type"] != "complete":
+                    continue
+                try:
+                    await self._run_blocking(export_report, event["session"], event["heritage"], True)
+                    self.stats["exports"] += 1
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    print(f"[ReportWriter] Failed to export report: {e}")
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            stop = batch[-1] is None
+            events = [e for e in batch if e is not None]
+            if events:
+                await self._flush(events)
+            if stop:
+                return
+            if time.monotonic() - self._last_gc >= REPORT_GC_INTERVAL:
+                self._last_gc = time.monotonic()
+                try:
+                    self.stats["gc_removed"] += await self._run_blocking(gc_segments)
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    print(f"[ReportWriter] Segment cleanup failed: {e}")
+
+    async def close(self):
+        """남은 이벤트를 모두 기록하고 종료합니다. (서버 종료 시 호출)"""
+        if self._task is None:
+            return
+        self._queue.put_nowait(None)
+        await self._task
+        self._task = None
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "queue_depth": self._queue.qsize() if self._queue is not None else 0}
+
+
+REPORT_WRITER = ReportWriter()
+
+
+# =================================================================
+# CLI: 세그먼트 → 기존 형식 리포트 내보내기
+#   python -m utils.report_manager export --session <세션> --heritage <문화재>
+#   python -m utils.report_manager export --all
+#   python -m utils.report_manager gc [--max-age-days 7]
+# =================================================================
+def main():
+    parser = argparse.ArgumentParser(description="Export heritage reports from JSONL segments.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export")
+    export.add_argument("--session")
+    export.add_argument("--heritage")
+    export.add_argument("--all", action="store_true")
+    gc = sub.add_parser("gc")
+    gc.add_argument("--max-age-days", type=float, default=REPORT_SEGMENT_MAX_AGE_SECONDS / 86400)
+    args = parser.parse_args()
+
+    if args.command == "gc":
+        print(f"Removed {gc_segments(args.max_age_days * 86400)} stale segment directories")
+    elif args.all:
+        if not os.path.exists(REPORT_SEGMENT_DIR):
+            return
+        # 디렉터리/파일 이름은 _safe_name 을 거친 값이지만, 내보내기에는 그대로 사용해도 같은 경로가 됨
+        for session_dir in sorted(os.listdir(REPORT_SEGMENT_DIR)):
+            heritages = {f.split(".jsonl")[0] for f in os.listdir(os.path.join(REPORT_SEGMENT_DIR, session_dir))}
+            for heritage in sorted(heritages):
+                export_report(session_dir, heritage)
+    elif args.session and args.heritage:
+        export_report(args.session, args.heritage)
+    else:
+        parser.error("--session and --heritage, or --all is required")
+
+
+if __name__ == "__main__":
+    main()
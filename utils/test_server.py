@@ -17,22 +17,25 @@ def create_dummy_wav(filename="test_audio.wav"):
 # 2. 테스트용 게임 상태 JSON (광화문 1395년 설명 시도)
 test_game_state = {
     "chat_history": [],
-    "current_heritage": {
-        "name": "GwangHwaMoon",
-        "completed": False,
-        "keywords": [
-            {
-                "keyword": "1395",
-                "sample_question": "When was it built?",
-                "isDone": False
-            },
-            {
-                "keyword": "King Taejo",
-                "sample_question": "Who built it?",
-                "isDone": False
-            }
-        ]
-    },
+    "heritages": [
+        {
+            "name": "GwangHwaMoon",
+            "completed": False,
+            "keywords": [
+                {
+                    "keyword": "1395",
+                    "sample_question": "When was it built?",
+                    "isDone": False
+                },
+                {
+                    "keyword": "King Taejo",
+                    "sample_question": "Who built it?",
+                    "isDone": False
+                }
+            ]
+        }
+    ],
+    "current_index": 0,
     "retry_count": 0
 }
 
@@ -56,9 +59,11 @@ try:
             print(f"Score: {res_json.get('pronunciation_score')}")
             print(f"NPC Response: {res_json.get('npc_response')}")
             print(f"Updated State: {res_json.get('updated_game_state')}")
+            print(f"Server-Timing: {response.headers.get('Server-Timing')}")
         else:
             print("Error:", response.text)
 
 except Exception as e:
     print(f"Connection Failed: {e}")
-    print("Make sure the server is running! (uvicorn main:app --reload)")
\ No newline at end of file
+    print("Make sure the server is running! (uvicorn main:app --reload)")
+    print("For an offline load test with fake services: python -m utils.benchmark")
\ No newline at end of file
@@ -1,21 +1,322 @@
 # utils/text_correction.py
-def correct_heritage_names(text: str, heritage_name: str) -> str:
+"""
+Whisper STT 결과에서 발음이 비슷한 단어를 올바른 문화재 고유명사/키워드로 치환합니다.
+
+서버 시작 시 문화재 카탈로그(이름 + 키워드)와 별칭 목록으로 교정 엔진을 한 번만 만들고,
+발화마다 아래 두 단계를 한 번의 순회로 처리합니다.
+1. 다중 패턴 오토마톤(Aho-Corasick)으로 알려진 표기/별칭을 대소문자 구분 없이 모두 치환 (카탈로그 전체)
+2. 남은 구간의 단어 n-gram 을 음성 키(phonetic key)와 편집 거리로 비교하여 처음 보는 변형도 치환
+   (현재 문화재의 이름/키워드만 대상. 흔한 영어 단어로만 된 구간은 치환하지 않음)
+"""
+import re
+from collections import defaultdict
+from typing import Optional
+
+from utils.heritage_catalog import load_heritage_catalog
+
+# 알려진 오인식 별칭 (실제로는 더 많은 데이터 필요)
+KNOWN_VARIANTS = {
+    "GwangHwaMoon": ["grand moon", "gwang hwa moon", "gang hwa mun"],
+    "GyeongHeoiRu": ["kyung he ru", "gyeong heoi ru"],
+    "Geobukseon": ["turtle ship", "go book sun"],
+}
+
+# 퍼지 매칭 설정
+FUZZY_ENABLED = True
+FUZZY_MIN_LENGTH = 5          # 공백 제외 글자 수가 이보다 짧은 후보는 퍼지 매칭하지 않음
+FUZZY_MAX_DISTANCE_RATIO = 0.15
+FUZZY_MAX_NGRAM = 6
+
+_WORD = re.compile(r"[A-Za-z0-9']+")
+
+# 고유명사의 시작/끝이 될 수 없는 흔한 단어 (퍼지 매칭 후보에서 제외)
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "it", "its", "this", "that", "these", "those",
+    "in", "on", "at", "of", "to", "by", "for", "from", "with", "and", "or", "but", "so", "very",
+    "i", "you", "he", "she", "we", "they", "my", "your", "his", "her", "our", "their",
+    "built", "made", "called", "named", "king", "year", "years", "ago", "old", "here", "there",
+}
+
+# 흔한 영어 단어. 이 단어들로만 이루어진 구간은 음성 키가 고유명사와 비슷해도 치환하지 않음
+# ("go back soon", "turtle shipping" → Geobukseon 같은 일반 문장 오교정 방지)
+COMMON_WORDS = STOPWORDS | {
+    "about", "after", "again", "all", "also", "always", "am", "any", "back", "bad", "because", "been", "before",
+    "best", "big", "book", "books", "boat", "boats", "both", "bring", "came", "can", "come", "could", "day", "days",
+    "did", "do", "does", "done", "down", "each", "even", "ever", "every", "far", "feel", "few", "find", "first",
+    "gate", "gates", "get", "give", "go", "goes", "going", "gone", "good", "got", "grand", "great", "had", "has",
+    "have", "home", "house", "how", "if", "into", "just", "keep", "know", "last", "late", "later", "like", "little",
+    "long", "look", "lot", "love", "many", "may", "me", "mood", "more", "most", "much", "must", "need", "never", "new",
+    "next", "nice", "no", "not", "now", "one", "only", "other", "out", "over", "people", "place",
+    "really", "right", "said", "same", "say", "see", "seen", "ship", "ships", "shipping", "should", "since",
+    "some", "soon", "still", "such", "sure", "take", "tell", "than", "thank", "thanks", "then", "thing",
+    "things", "think", "time", "too", "turtle", "turtles", "two", "up", "us", "use", "want", "way", "well",
+    "went", "what", "when", "where", "which", "while", "who", "why", "will", "would", "yes", "yet",
+}
+
+# 로마자 표기 차이를 흡수하기 위한 치환 규칙 (긴 것부터 적용)
+_PHONETIC_RULES = [
+    ("eo", "o"), ("eu", "u"), ("oo", "u"), ("ou", "u"), ("ae", "e"), ("ai", "e"), ("oe", "e"), ("ye", "e"),
+    ("ph", "f"), ("wh", "w"), ("ck", "k"), ("gh", "g"), ("ch", "c"), ("sh", "s"),
+    ("q", "k"), ("x", "ks"), ("z", "s"), ("j", "c"), ("g", "k"), ("b", "p"), ("d", "t"), ("r", "l"), ("v", "p"),
+    ("y", "i"), ("w", "u"),
+]
+
+
+def compact(text: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", text.lower())
+
+
+def phonetic_key(text: str) -> str:
+    """로마자 표기 흔들림(eo/o, g/k, r/l 등)을 무시하는 간단한 음성 키"""
+    key = compact(text)
+    for src, dst in _PHONETIC_RULES:
+        key = key.replace(src, dst)
+    # 연속된 같은 글자 제거 (moon → mun, hwa a → hwa)
+    return re.sub(r"(.)\1+", r"\1", key)
+
+
+def split_camel(name: str) -> str:
+    """GwangHwaMoon → gwang hwa moon"""
+    return re.sub(r"(?<=[a-z])(?=[A-Z])", " ", name).lower()
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein 거리. limit 을 넘으면 limit + 1 을 반환하고 일찍 종료합니다."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j, cb in enumerate(b, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            row_min = min(row_min, current[j])
+        if row_min > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def _lower_same_length(text: str) -> str:
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    # 일부 유니코드 문자는 소문자화하면 길이가 바뀌므로, 위치가 어긋나지 않게 한 글자씩 처리
+    return "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+
+class AhoCorasick:
+    """소문자 패턴들을 한 번의 순회로 모두 찾는 다중 패턴 오토마톤"""
+
+    def __init__(self, patterns: dict):
+        # patterns: {소문자 패턴: 교정 결과}
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [None]  # 해당 상태에서 끝나는 가장 긴 (패턴 길이, 교정 결과)
+        self.output_link = [0]
+
+        for pattern, replacement in patterns.items():
+            state = 0
+            for ch in pattern:
+                if ch not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(None)
+                    self.output_link.append(0)
+                    self.goto[state][ch] = len(self.goto) - 1
+                state = self.goto[state][ch]
+            self.output[state] = (len(pattern), replacement)
+
+        # BFS 로 실패 링크 구성
+        queue = list(self.goto[0].values())
+        while queue:
+            next_queue = []
+            for state in queue:
+                for ch, nxt in self.goto[state].items():
+                    f = self.fail[state]
+                    while f and ch not in self.goto[f]:
+                        f = self.fail[f]
+                    self.fail[nxt] = self.goto[f].get(ch, 0) if self.goto[f].get(ch, 0) != nxt else 0
+                    fl = self.fail[nxt]
+                    self.output_link[nxt] = fl if self.output[fl] is not None else self.output_link[fl]
+                    next_queue.append(nxt)
+            queue = next_queue
+
+    def find_all(self, text: str):
+        """(start, end, replacement) 를 모두 반환합니다. (겹치는 매치 포함)"""
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+
+            s = state if self.output[state] is not None else self.output_link[state]
+            while s:
+                length, replacement = self.output[s]
+                yield i - length + 1, i + 1, replacement
+                s = self.output_link[s]
+
+
+class CorrectionEngine:
+    def __init__(self, terms: dict, scopes: Optional[dict] = None):
+        """
+        terms: {교정 결과(정식 표기): [변형 표기, ...]}
+        scopes: {문화재 이름: [퍼지 매칭 대상 정식 표기, ...]} (없으면 퍼지 매칭 안 함)
+        """
+        patterns = {}
+        fuzzy_forms = {}                       # 정식 표기 -> [(음성 키, 정식 표기)]
+        self.max_words = 1
+
+        for canonical, variants in terms.items():
+            forms = {canonical.lower(), split_camel(canonical)} | {v.lower() for v in variants}
+            for form in forms:
+                patterns[form] = canonical
+                self.max_words = max(self.max_words, len(form.split()))
+
+            if FUZZY_ENABLED and compact(canonical).isalpha() and len(compact(canonical)) >= FUZZY_MIN_LENGTH:
+                keys = dict.fromkeys(phonetic_key(form) for form in forms)
+                fuzzy_forms[canonical] = [(key, canonical) for key in keys]
+
+        # 문화재별 퍼지 매칭 후보 (이름 + 키워드, 수 개 수준이라 전부 비교)
+        self.fuzzy_scopes = {
+            heritage_name: [form for canonical in dict.fromkeys(canonicals) for form in fuzzy_forms.get(canonical, ())]
+            for heritage_name, canonicals in (scopes or {}).items()
+        }
+
+        self.automaton = AhoCorasick(patterns)
+        self.max_words = min(self.max_words + 1, FUZZY_MAX_NGRAM)
+        self.max_key_length = max((len(k) for forms in fuzzy_forms.values() for k, _ in forms), default=0)
+        self.size = len(patterns)
+
+    @staticmethod
+    def _is_boundary(text: str, start: int, end: int) -> bool:
+        before = text[start - 1] if start > 0 else " "
+        after = text[end] if end < len(text) else " "
+        return not before.isalnum() and not after.isalnum()
+
+    def _exact_matches(self, lowered: str) -> list:
+        # 단어 경계에 맞는 매치 중, 왼쪽 우선 + 가장 긴 매치만 겹치지 않게 선택
+        candidates = sorted(
+            (m for m in self.automaton.find_all(lowered) if self._is_boundary(lowered, m[0], m[1])),
+            key=lambda m: (m[0], -(m[1] - m[0]))
+        )
+        selected, last_end = [], 0
+        for start, end, replacement in candidates:
+            if start >= last_end:
+                selected.append((start, end, replacement))
+                last_end = end
+        return selected
+
+    @staticmethod
+    def _fuzzy_lookup(phrase: str, fuzzy_forms: list) -> Optional[tuple]:
+        """(정식 표기, 정규화된 거리) 를 반환합니다. 음성 키가 같으면 거리 0"""
+        if len(compact(phrase)) < FUZZY_MIN_LENGTH or not compact(phrase).isalpha():
+            return None
+
+        key = phonetic_key(phrase)
+        limit = max(1, int(len(key) * FUZZY_MAX_DISTANCE_RATIO))
+        best, best_distance = None, limit + 1
+        for form, canonical in fuzzy_forms:
+            if best_distance == 0:
+                break
+            distance = edit_distance(key, form, min(limit, best_distance - 1))
+            if distance < best_distance:
+                best, best_distance = canonical, distance
+        if best is None:
+            return None
+        return best, best_distance / len(key)
+
+    def _fuzzy_matches(self, text: str, covered: list, fuzzy_forms: list) -> list:
+        words = [m for m in _WORD.finditer(text)
+                 if not any(s < m.end() and m.start() < e for s, e, _ in covered)]
+
+        # 모든 단어 n-gram 후보를 구한 뒤, 가장 가까운(같으면 긴) 후보부터 겹치지 않게 선택
+        candidates = []
+        for i in range(len(words)):
+            if words[i].group().lower() in STOPWORDS:
+                continue
+            for n in range(1, min(self.max_words, len(words) - i) + 1):
+                start, end = words[i].start(), words[i + n - 1].end()
+                if any(start < e and s < end for s, e, _ in covered):
+                    break  # 중간에 이미 교정된 구간이 끼어 있음
+                if end - start > self.max_key_length * 2:
+                    break
+                if words[i + n - 1].group().lower() in STOPWORDS:
+                    continue
+                if all(w.group().lower() in COMMON_WORDS for w in words[i:i + n]):
+                    continue
+                phrase = text[start:end]
+                found = self._fuzzy_lookup(phrase, fuzzy_forms)
+                if found is not None and phrase != found[0]:
+                    candidates.append((found[1], start - end, start, end, found[0]))
+
+        matches = []
+        for _, _, start, end, canonical in sorted(candidates):
+            if not any(start < e and s < end for s, e, _ in matches):
+                matches.append((start, end, canonical))
+        return matches
+
+    def correct(self, text: str, heritage_name: str = None) -> str:
+        """알려진 표기는 카탈로그 전체에서, 처음 보는 변형은 heritage_name 의 이름/키워드만 교정합니다."""
+        if not text:
+            return text
+
+        matches = self._exact_matches(_lower_same_length(text))
+        fuzzy_forms = self.fuzzy_scopes.get(heritage_name)
+        if FUZZY_ENABLED and fuzzy_forms:
+            matches = sorted(matches + self._fuzzy_matches(text, matches, fuzzy_forms))
+
+        if not matches:
+            return text
+
+        parts, last = [], 0
+        for start, end, replacement in matches:
+            parts.append(text[last:start])
+            parts.append(replacement)
+            last = end
+        parts.append(text[last:])
+        return "".join(parts)
+
+
+def build_correction_engine(catalog: Optional[dict] = None, extra_terms: Optional[dict] = None) -> CorrectionEngine:
+    """카탈로그(문화재 이름 + 키워드)와 별칭으로 교정 엔진을 만듭니다."""
+    if catalog is None:
+        try:
+            catalog = load_heritage_catalog()
+        except Exception as e:
+            print(f"[TextCorrection] Failed to load heritage catalog: {e}")
+            catalog = {}
+
+    terms = defaultdict(list)
+    scopes = {}
+    for heritage_name, keywords in catalog.items():
+        terms[heritage_name]
+        for keyword, _ in keywords:
+            terms[keyword]
+        scopes[heritage_name] = [heritage_name] + [keyword for keyword, _ in keywords]
+    for canonical, variants in KNOWN_VARIANTS.items():
+        terms[canonical].extend(variants)
+        scopes.setdefault(canonical, [canonical])
+    for canonical, variants in (extra_terms or {}).items():
+        terms[canonical].extend(variants)
+
+    return CorrectionEngine(terms, scopes)
+
+
+CORRECTION_ENGINE: Optional[CorrectionEngine] = None
+
+
+def init_text_correction(catalog: Optional[dict] = None):
+    global CORRECTION_ENGINE
+    CORRECTION_ENGINE = build_correction_engine(catalog)
+    print(f"[TextCorrection] Engine ready ({CORRECTION_ENGINE.size} patterns)")
+
+
+def correct_heritage_names(text: str, heritage_name: str = None) -> str:
     """
     Whisper STT 결과에서 발음이 비슷한 단어를 올바른 문화재 고유명사로 치환합니다.
+    알려진 표기/별칭은 카탈로그 전체, 편집 거리 기반 교정은 현재 문화재(heritage_name)의 이름/키워드만 대상입니다.
     """
-    text_lower = text.lower()
-
-    # 예시 매핑 (실제로는 더 많은 데이터 필요)
-    corrections = {
-        "GwangHwaMoon": ["grand moon", "gwang hwa moon", "gang hwa mun"],
-        "GyeongHeoiRu": ["kyung he ru", "gyeong heoi ru"],
-        "Geobukseon": ["turtle ship", "go book sun"]
-    }
-
-    if heritage_name in corrections:
-        for wrong_word in corrections[heritage_name]:
-            if wrong_word in text_lower:
-                # 대소문자 무시하고 치환 (간단한 구현)
-                return text.replace(wrong_word, heritage_name)  # 실제로는 정규식 사용 권장
-
-    return text
\ No newline at end of file
+    if CORRECTION_ENGINE is None:
+        init_text_correction()
+    return CORRECTION_ENGINE.correct(text, heritage_name)
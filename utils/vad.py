@@ -0,0 +1,100 @@
+# utils/vad.py
+"""
+에너지 기반 음성 구간 검출 (VAD)
+
+decode_audio_bytes 결과(16kHz mono float32)를 프레임 단위 RMS(dBFS)로 나누어
+- 앞뒤 무음을 잘라 STT/발음 평가 입력을 줄이고
+- 말소리가 거의 없으면 has_speech=False 로 알려 Whisper/Azure/Gemini 호출을 건너뛰게 합니다.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from utils.audio_decode import SAMPLE_RATE
+
+VAD_FRAME_MS = 30
+VAD_MIN_DBFS = -45.0          # 이보다 작은 프레임은 항상 무음
+VAD_NOISE_MARGIN_DB = 10.0    # 잡음 바닥(하위 10% 프레임)보다 이만큼 커야 말소리
+VAD_MIN_SPEECH_MS = 200       # 말소리 프레임 합계가 이보다 짧으면 발화 없음으로 판단
+VAD_PAD_MS = 150              # 잘라낼 때 앞뒤로 남겨 둘 여유
+VAD_ENABLED = True
+
+# 발화가 없을 때 건너뛰는 외부 호출 (STT, 발음 평가, Gemini 평가)
+SKIPPED_CALLS_PER_TURN = 3
+
+_stats = {
+    "checked": 0,
+    "no_speech": 0,
+    "skipped_calls": 0,
+    "trimmed_ms": 0.0,
+}
+
+
+@dataclass
+class VadResult:
+    audio: np.ndarray
+    has_speech: bool
+    speech_ms: float
+    trimmed_ms: float
+
+
+def frame_dbfs(audio: np.ndarray, frame_len: int) -> np.ndarray:
+    frame_count = len(audio) // frame_len
+    if frame_count == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = audio[:frame_count * frame_len].reshape(frame_count, frame_len)
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+    return 20.0 * np.log10(np.maximum(rms, 1e-10))
+
+
+def detect_speech(audio: np.ndarray, sample_rate: int = SAMPLE_RATE, frame_ms: int = VAD_FRAME_MS,
+                  min_dbfs: float = VAD_MIN_DBFS, noise_margin_db: float = VAD_NOISE_MARGIN_DB,
+                  min_speech_ms: float = VAD_MIN_SPEECH_MS, pad_ms: float = VAD_PAD_MS) -> VadResult:
+    frame_len = max(1, int(sample_rate * frame_ms / 1000))
+    levels = frame_dbfs(audio, frame_len)
+    total_ms = len(audio) / sample_rate * 1000
+    if len(levels) == 0:
+        return VadResult(audio, False, 0.0, 0.0)
+
+    noise_floor = float(np.percentile(levels, 10))
+    threshold = max(min_dbfs, noise_floor + noise_margin_db)
+    speech = levels > threshold
+
+    # 처음부터 끝까지 고르게 큰 소리(잡음 바닥 = 신호)도 말소리로 인정
+    if not speech.any() and noise_floor > min_dbfs:
+        speech = levels > min_dbfs
+
+    speech_ms = float(speech.sum()) * frame_ms
+    if speech_ms < min_speech_ms:
+        return VadResult(audio, False, speech_ms, 0.0)
+
+    indices = np.flatnonzero(speech)
+    pad = int(sample_rate * pad_ms / 1000)
+    start = max(0, indices[0] * frame_len - pad)
+    end = min(len(audio), (indices[-1] + 1) * frame_len + pad)
+    trimmed = audio[start:end]
+    return VadResult(trimmed, True, speech_ms, total_ms - len(trimmed) / sample_rate * 1000)
+
+
+def check_upload(audio: np.ndarray) -> VadResult:
+    """/interact 의 VAD 단계 (설정/통계 반영). 비활성화 시 입력을 그대로 통과"""
+    if not VAD_ENABLED:
+        return VadResult(audio, True, len(audio) / SAMPLE_RATE * 1000, 0.0)
+
+    result = detect_speech(audio)
+    _stats["checked"] += 1
+    if result.has_speech:
+        _stats["trimmed_ms"] += result.trimmed_ms
+    else:
+        _stats["no_speech"] += 1
+        _stats["skipped_calls"] += SKIPPED_CALLS_PER_TURN
+    return result
+
+
+def get_vad_stats() -> dict:
+    return {
+        **_stats,
+        "enabled": VAD_ENABLED,
+        "trimmed_ms": round(_stats["trimmed_ms"], 1),
+        "no_speech_rate": round(_stats["no_speech"] / _stats["checked"], 3) if _stats["checked"] else 0.0,
+    }